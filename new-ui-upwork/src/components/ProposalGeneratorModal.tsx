@@ -54,7 +54,8 @@ const ProposalGeneratorModal = ({ job, trigger }: ProposalGeneratorModalProps) =
     setIsGenerating(true);
     setTemplateError("");
     try {
-      const endpoint = `http://localhost:8001/api/agentic-proposals/agentic-generate-proposal/${job.id}?overwrite=${overwrite}`;
+      // Server-Sent Events: "token" events while the proposal is written, then "done" or "error".
+      const endpoint = `http://localhost:8001/api/agentic-proposals/agentic-generate-proposal/${job.id}/stream?overwrite=${overwrite}`;
       
       console.log("Attempting to generate proposal with endpoint:", endpoint);
       console.log("Job ID:", job.id);
@@ -63,18 +64,44 @@ const ProposalGeneratorModal = ({ job, trigger }: ProposalGeneratorModalProps) =
       const response = await fetch(endpoint, {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json',
+          'Accept': 'text/event-stream',
         },
-        body: JSON.stringify({})
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         const errorText = await response.text();
         setTemplateError(`Failed to generate proposal: ${response.status} ${errorText}`);
         throw new Error(`Failed to generate proposal: ${response.status} ${errorText}`);
       }
 
-      const data = await response.json();
+      setProposalContent("");
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = "";
+      let data: { proposal?: string; exists?: boolean } | null = null;
+      while (!data) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+        let boundary;
+        while (!data && (boundary = buffer.indexOf("\n\n")) !== -1) {
+          const block = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          const event = block.match(/^event: (.*)$/m)?.[1];
+          const payload = JSON.parse(block.match(/^data: (.*)$/m)?.[1] ?? "{}");
+          if (event === "token") {
+            setProposalContent((current) => current + payload.text);
+          } else if (event === "error") {
+            setTemplateError(payload.detail);
+            throw new Error(payload.detail);
+          } else if (event === "done") {
+            data = payload;
+          }
+        }
+      }
+      if (!data) {
+        throw new Error("The proposal stream ended before the proposal was saved.");
+      }
+
       setProposalContent(data.proposal || "");
       setProposalExists(data.exists || false);
       setExistingProposal(data.proposal || "");
@@ -125,6 +125,8 @@ const JobsPage: React.FC<JobsPageProps> = ({ apiUrl }) => {
   const [apiError, setApiError] = useState(false);
   const previousStrongMatchJobIds = useRef<Set<string>>(new Set());
   const isInitialRelevantJobsLoad = useRef(true);
+  const strongJobsEtag = useRef<string | null>(null);
+  const [searchResults, setSearchResults] = useState<any[] | null>(null);
   const [notificationsEnabled, setNotificationsEnabled] = useState(() => {
     return localStorage.getItem('notificationsEnabled') === 'true';
   });
@@ -247,10 +249,17 @@ const JobsPage: React.FC<JobsPageProps> = ({ apiUrl }) => {
         }
         fetchedData = await response.json();
       } else if (relevance === 'strong') {
-        const response = await fetch(`${apiUrlToUse}/api/job-listings/relevance/strong`);
+        // Polls revalidate with the last ETag; 304 means nothing was added or re-scored.
+        const response = await fetch(`${apiUrlToUse}/api/job-listings/relevance/strong`, {
+          headers: isPolling && strongJobsEtag.current ? { 'If-None-Match': strongJobsEtag.current } : {},
+        });
+        if (response.status === 304) {
+          return;
+        }
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
+        strongJobsEtag.current = response.headers.get('ETag');
         fetchedData = await response.json();
         
         // Process notifications for new strong match jobs
@@ -333,6 +342,53 @@ const JobsPage: React.FC<JobsPageProps> = ({ apiUrl }) => {
     }
   }, [showNotification, toast, notificationsEnabled, apiUrlToUse]);
 
+  // List endpoints return compact job summaries; the full record is fetched when a job is opened.
+  const loadJobDetails = useCallback(async (jobId: string) => {
+    if (apiError) return;
+    try {
+      const response = await fetch(`${apiUrlToUse}/api/job-listings/${jobId}`);
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      const details = await response.json();
+      const withDetails = (job: any) => String(job.id) === String(jobId) ? { ...job, ...details, detailsLoaded: true } : job;
+      setJobs(prevJobs => prevJobs.map(withDetails));
+      setSearchResults(prevResults => prevResults && prevResults.map(withDetails));
+    } catch (error) {
+      console.error('Failed to load job details:', error);
+    }
+  }, [apiUrlToUse, apiError]);
+
+  useEffect(() => {
+    const query = searchTerm.trim();
+    if (apiError || query.length < 2) {
+      setSearchResults(null);
+      return;
+    }
+    const controller = new AbortController();
+    const timeout = setTimeout(async () => {
+      const params = new URLSearchParams({ q: query });
+      if (relevanceFilter === 'strong') {
+        params.append('relevance', 'strong');
+      }
+      try {
+        const response = await fetch(`${apiUrlToUse}/api/job-listings/search?${params}`, { signal: controller.signal });
+        if (!response.ok) {
+          throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        setSearchResults(await response.json());
+      } catch (error) {
+        if ((error as Error).name !== 'AbortError') {
+          console.error('Job search failed:', error);
+        }
+      }
+    }, 300);
+    return () => {
+      clearTimeout(timeout);
+      controller.abort();
+    };
+  }, [searchTerm, relevanceFilter, apiError, apiUrlToUse]);
+
   const toggleNotifications = async () => {
     if (!notificationsEnabled) {
       const currentPermission = Notification.permission;
@@ -548,10 +604,10 @@ const JobsPage: React.FC<JobsPageProps> = ({ apiUrl }) => {
     });
   };
 
-  const filteredJobs = jobs.filter(job => {
-    const matchesSearch = job.title?.toLowerCase().includes(searchTerm.toLowerCase());
-    return matchesSearch;
-  });
+  // Searching is done by the API (ranked full-text search); sample data is filtered locally.
+  const filteredJobs = searchResults !== null
+    ? searchResults
+    : jobs.filter(job => job.title?.toLowerCase().includes(searchTerm.toLowerCase()));
 
   let sortedJobs = filteredJobs;
 
@@ -853,6 +909,12 @@ const JobsPage: React.FC<JobsPageProps> = ({ apiUrl }) => {
                     </td>
                     <td className="p-4 pr-0">
                       <div className="font-bold text-base mb-2 text-gray-900 group-hover:text-blue-900 transition-colors">{job.title}</div>
+                      {job.proposal_ready && (
+                        <Badge className="mb-2 bg-emerald-100 text-emerald-800 border-emerald-200 flex items-center gap-1 w-fit">
+                          <FileText className="w-3 h-3" />
+                          Proposal ready
+                        </Badge>
+                      )}
                       <div className="text-sm text-gray-600 mb-3 leading-relaxed">
                         {job.description
                           ? job.description.split(" ").slice(0, 15).join(" ") + (job.description.split(" ").length > 15 ? "..." : "")
@@ -938,7 +1000,7 @@ const JobsPage: React.FC<JobsPageProps> = ({ apiUrl }) => {
                     </td>
                     <td className="p-4 whitespace-normal break-words">
                       <div className="flex items-center gap-3">
-                        <Dialog>
+                        <Dialog onOpenChange={(open) => { if (open && !job.detailsLoaded) loadJobDetails(job.id); }}>
                           <DialogTrigger asChild>
                             <Button 
                               variant="ghost" 
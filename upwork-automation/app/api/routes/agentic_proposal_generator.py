@@ -1,21 +1,42 @@
 import os
 import re
+import time
+import asyncio
+import inspect
+import operator
 import json
 import hashlib
 import logging
-from typing import TypedDict, List, Dict, Any, Optional
+import threading
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
 
 import faiss
 import numpy as np
 import yaml  
 from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from langchain_core.runnables import RunnableConfig
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from langgraph.graph import StateGraph, END
+from langgraph.config import get_stream_writer
+from langgraph.graph import StateGraph, START, END
 
-from app.db.database import get_db
+from app.db.database import AsyncSessionLocal, get_async_db, get_db
 from app.models.jobs import Job, Proposal, JobRelevance
-from openai import OpenAI
+from app.core.config import settings
+from app.utils.contractor_selection import screening_questions
+from app.utils.embeddings import EmbeddingService, get_embedding_service
+from app.utils.job_embeddings import get_job_embedding_store
+from app.utils.node_timings import PROPOSAL_NODE_TIMINGS
+from app.utils.proposal_pregeneration import PREGENERATED_STATUS, PROPOSAL_PREGENERATOR
+from app.utils.rag_index import (
+    RAGIndexSnapshot, EMPTY_SNAPSHOT, RAG_WATCHER, atomic_write_index, atomic_write_json, embed_with_reuse,
+    SnapshotReloadMixin, build_faiss_index, index_config_key
+)
+from app.utils.response_cache import invalidate_job_listings
+from openai import AsyncOpenAI, OpenAI
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -33,9 +54,8 @@ FAISS_INDEX_FILE_NAME = "vector_store.faiss"
 FAISS_METADATA_FILE_NAME = "metadata.json"
 FILE_HASHES_FILE_NAME = "file_hashes.json"
 
-OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
 OPENAI_GENERATION_MODEL = "gpt-5-2025-08-07"
-EMBEDDING_DIM = 1536
+EMBEDDING_DIM = settings.EMBEDDING_DIMENSIONS
 NUM_RETRIEVED_CHUNKS = 8 
 
 router = APIRouter()
@@ -47,6 +67,18 @@ def get_openai_client() -> OpenAI:
         raise ValueError("No OpenAI API key found in environment variables (OPEN_AI_KEY).")
     return OpenAI(api_key=api_key)
 
+_async_openai_client: Optional[AsyncOpenAI] = None
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Shared async client for streamed generations, created on first use."""
+    global _async_openai_client
+    if _async_openai_client is None:
+        api_key = os.getenv("OPEN_AI_KEY")
+        if not api_key:
+            raise ValueError("No OpenAI API key found in environment variables (OPEN_AI_KEY).")
+        _async_openai_client = AsyncOpenAI(api_key=api_key)
+    return _async_openai_client
+
 def load_proposal_template(file_path: str) -> str:
     """Load content from the proposal template markdown file."""
     try:
@@ -59,19 +91,21 @@ def load_proposal_template(file_path: str) -> str:
         logger.error(f"Error reading proposal template file {file_path}: {str(e)}")
         return ""
 
-class FAISSIndexManager:
+class FAISSIndexManager(SnapshotReloadMixin):
     """
     Manages the creation, loading, and querying of a unified FAISS index
     from structured markdown files (profiles and projects).
     """
-    def __init__(self, openai_client: OpenAI,
+    name = "proposals"
+
+    def __init__(self, embedding_service: EmbeddingService,
                  profiles_md_path: str,
                  projects_md_path: str,
                  rag_data_dir: str,
                  index_file_name: str,
                  metadata_file_name: str,
                  hashes_file_name: str):
-        self.openai_client = openai_client
+        self.embedding_service = embedding_service
         self.profiles_md_path = profiles_md_path
         self.projects_md_path = projects_md_path
 
@@ -80,11 +114,21 @@ class FAISSIndexManager:
         self.metadata_path = os.path.join(rag_data_dir, metadata_file_name)
         self.hashes_path = os.path.join(rag_data_dir, hashes_file_name)
 
-        self.index: Optional[faiss.Index] = None
-        self.chunks_metadata: List[Dict[str, Any]] = []
+        # Index and metadata are published together as one immutable snapshot
+        # so a hot reload never exposes a half-built pair to queries.
+        self._snapshot: RAGIndexSnapshot = EMPTY_SNAPSHOT
+        self._reload_lock = threading.Lock()
 
         self._load_or_build_index()
 
+    @property
+    def index(self) -> Optional[faiss.Index]:
+        return self._snapshot.index
+
+    @property
+    def chunks_metadata(self) -> List[Dict[str, Any]]:
+        return self._snapshot.chunks_metadata
+
     def _get_file_hash(self, file_path: str) -> Optional[str]:
         if not os.path.exists(file_path):
             return None
@@ -105,8 +149,14 @@ class FAISSIndexManager:
             return {}
 
     def _save_current_hashes(self, current_hashes: Dict[str, Optional[str]]):
-        with open(self.hashes_path, 'w') as f:
-            json.dump(current_hashes, f)
+        atomic_write_json(self.hashes_path, current_hashes)
+
+    def _current_hashes(self) -> Dict[str, Optional[str]]:
+        return {
+            "profiles": self._get_file_hash(self.profiles_md_path),
+            "projects": self._get_file_hash(self.projects_md_path),
+            "index_config": index_config_key(),
+        }
 
     def _check_if_rebuild_needed(self) -> bool:
         if not all(os.path.exists(p) for p in [self.index_path, self.metadata_path, self.hashes_path]):
@@ -114,17 +164,18 @@ class FAISSIndexManager:
             return True
 
         stored_hashes = self._load_stored_hashes()
-        current_hashes = {
-            "profiles": self._get_file_hash(self.profiles_md_path),
-            "projects": self._get_file_hash(self.projects_md_path),
-        }
+        current_hashes = self._current_hashes()
 
         if stored_hashes.get("profiles") != current_hashes["profiles"] or \
            stored_hashes.get("projects") != current_hashes["projects"]:
             logger.info("A markdown data file has changed. Rebuilding index.")
             return True
 
-        logger.info("Data files are unchanged. No rebuild needed.")
+        if stored_hashes.get("index_config") != current_hashes["index_config"]:
+            logger.info(f"Embedding dimensions/storage changed to {current_hashes['index_config']}. Rebuilding index.")
+            return True
+
+        logger.debug("Data files are unchanged. No rebuild needed.")
         return False
 
     def _parse_and_chunk_files(self) -> List[Dict[str, Any]]:
@@ -176,81 +227,92 @@ class FAISSIndexManager:
 
     def _get_embeddings(self, texts: List[str]) -> np.ndarray:
         try:
-            response = self.openai_client.embeddings.create(input=texts, model=OPENAI_EMBEDDING_MODEL)
-            return np.array([item.embedding for item in response.data]).astype('float32')
+            return self.embedding_service.embed(texts)
         except Exception as e:
             logger.error(f"Error getting embeddings from OpenAI: {e}", exc_info=True)
             raise
 
-    def _build_index(self):
+    def _build_index(self, previous: RAGIndexSnapshot = EMPTY_SNAPSHOT) -> Optional[RAGIndexSnapshot]:
+        """Build a fresh snapshot off to the side, reusing embeddings of unchanged chunks from `previous`."""
         logger.info("Building new unified FAISS index from structured data...")
-        self.chunks_metadata = self._parse_and_chunk_files()
+        current_hashes = self._current_hashes()
+        chunks_metadata = self._parse_and_chunk_files()
         
-        if not self.chunks_metadata:
+        if not chunks_metadata:
             logger.error("No chunks were created from source files. Aborting index build.")
-            self.index = None
-            return
+            return None
 
-        texts_for_embedding = [chunk["text_for_embedding"] for chunk in self.chunks_metadata]
+        texts_for_embedding = [chunk["text_for_embedding"] for chunk in chunks_metadata]
 
         try:
-            embeddings_np = self._get_embeddings(texts_for_embedding)
-            self.index = faiss.IndexFlatL2(EMBEDDING_DIM)
-            self.index.add(embeddings_np)
+            embeddings_np = embed_with_reuse(previous, "text_for_embedding", texts_for_embedding, self._get_embeddings)
+            index = build_faiss_index(embeddings_np, EMBEDDING_DIM)
 
-            faiss.write_index(self.index, self.index_path)
-            with open(self.metadata_path, 'w') as f:
-                json.dump(self.chunks_metadata, f, indent=2)
+            atomic_write_index(index, self.index_path)
+            atomic_write_json(self.metadata_path, chunks_metadata, indent=2)
             
-            num_profiles = len([c for c in self.chunks_metadata if c['doc_type'] == 'profile'])
-            num_projects = len([c for c in self.chunks_metadata if c['doc_type'] == 'project'])
-            logger.info(f"FAISS index built and saved successfully with {self.index.ntotal} total chunks ({num_profiles} profiles, {num_projects} projects).")
+            num_profiles = len([c for c in chunks_metadata if c['doc_type'] == 'profile'])
+            num_projects = len([c for c in chunks_metadata if c['doc_type'] == 'project'])
+            logger.info(f"FAISS index built and saved successfully with {index.ntotal} total chunks ({num_profiles} profiles, {num_projects} projects).")
 
         except Exception as e:
             logger.error(f"Failed to build and save index: {e}", exc_info=True)
-            self.index = None
-            return
+            return None
 
-        current_hashes = {
-            "profiles": self._get_file_hash(self.profiles_md_path),
-            "projects": self._get_file_hash(self.projects_md_path),
-        }
         self._save_current_hashes(current_hashes)
+        return RAGIndexSnapshot(index=index, chunks_metadata=chunks_metadata)
 
-    def _load_index(self) -> bool:
+    def _load_index(self) -> Optional[RAGIndexSnapshot]:
         try:
-            self.index = faiss.read_index(self.index_path)
+            index = faiss.read_index(self.index_path)
             with open(self.metadata_path, 'r') as f:
-                self.chunks_metadata = json.load(f)
-            logger.info(f"Unified FAISS index and metadata loaded successfully with {len(self.chunks_metadata)} chunks.")
-            return True
+                chunks_metadata = json.load(f)
+            logger.info(f"Unified FAISS index and metadata loaded successfully with {len(chunks_metadata)} chunks.")
+            return RAGIndexSnapshot(index=index, chunks_metadata=chunks_metadata)
         except Exception as e:
             logger.error(f"Failed to load FAISS index or metadata: {e}", exc_info=True)
-            return False
+            return None
 
     def _load_or_build_index(self):
         if self._check_if_rebuild_needed():
-            self._build_index()
-        elif not self._load_index():
-            logger.warning("Failed to load existing index. Attempting rebuild.")
-            self._build_index()
-
-        if self.index is None:
+            snapshot = self._build_index()
+        else:
+            snapshot = self._load_index()
+            if snapshot is None:
+                logger.warning("Failed to load existing index. Attempting rebuild.")
+                snapshot = self._build_index()
+
+        if snapshot is None:
             logger.critical("CRITICAL: FAISS index is not available. RAG queries will fail.")
+            return
+        self._snapshot = snapshot
 
     def query(self, query_text: str, k: int) -> List[Dict[str, Any]]:
-        if self.index is None or self.index.ntotal == 0:
+        if self._snapshot.index is None or self._snapshot.index.ntotal == 0:
             logger.warning("FAISS index is not initialized or empty. Cannot perform query.")
             return []
-        
         try:
             query_embedding = self._get_embeddings([query_text])
-            distances, indices = self.index.search(query_embedding, k=min(k, self.index.ntotal))
+        except Exception:
+            return []
+        return self.query_by_vector(query_embedding, k)
+
+    def query_by_vector(self, query_embedding: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        """query() with an embedding from the same model/dimensions, e.g. a stored job vector."""
+        snapshot = self._snapshot
+        index, chunks_metadata = snapshot.index, snapshot.chunks_metadata
+        if index is None or index.ntotal == 0:
+            logger.warning("FAISS index is not initialized or empty. Cannot perform query.")
+            return []
+        
+        try:
+            query_embedding = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+            distances, indices = index.search(query_embedding, k=min(k, index.ntotal))
 
             results = []
             for i, idx in enumerate(indices[0]):
-                if 0 <= idx < len(self.chunks_metadata):
-                    result_metadata = self.chunks_metadata[idx].copy()
+                if 0 <= idx < len(chunks_metadata):
+                    result_metadata = chunks_metadata[idx].copy()
                     result_metadata["distance"] = float(distances[0][i])
                     results.append(result_metadata)
             
@@ -263,9 +325,9 @@ class FAISSIndexManager:
 GLOBAL_FAISS_MANAGER: Optional[FAISSIndexManager] = None
 try:
     logger.info("Initializing FAISSIndexManager with structured data sources...")
-    _openai_client = get_openai_client()
+    get_openai_client() # fails fast without OPEN_AI_KEY
     GLOBAL_FAISS_MANAGER = FAISSIndexManager(
-        openai_client=_openai_client,
+        embedding_service=get_embedding_service(),
         profiles_md_path=TEAM_PROFILES_MD_PATH,
         projects_md_path=PROJECTS_MD_PATH,
         rag_data_dir=RAG_DATA_DIR,
@@ -273,6 +335,7 @@ try:
         metadata_file_name=FAISS_METADATA_FILE_NAME,
         hashes_file_name=FILE_HASHES_FILE_NAME
     )
+    RAG_WATCHER.register(GLOBAL_FAISS_MANAGER)
 except ValueError as ve:
     logger.critical(f"CRITICAL: {ve}")
     GLOBAL_FAISS_MANAGER = None
@@ -281,7 +344,10 @@ except Exception as e:
     GLOBAL_FAISS_MANAGER = None
 
 
-class ProposalState(TypedDict):
+class ProposalState(TypedDict, total=False):
+    # The database session is not part of the state: nodes get it from
+    # config["configurable"]["db"], scoped by the caller. get_job_details ends its
+    # transaction, so no connection sits idle in transaction during the LLM call.
     job_id: str
     client_name: str
     job_title: str
@@ -289,63 +355,68 @@ class ProposalState(TypedDict):
     final_proposal: str
     retrieved_context: str
     proposal_template: str
-    db: Session
     relevance_score: Optional[float] 
     closest_profile_name: Optional[str] 
+    screening_questions: List[str]
+    # Seconds per node of this run; parallel branches merge their entries.
+    timings: Annotated[Dict[str, float], operator.or_]
 
-def execute_openai_call(prompt: str) -> str:
-    """Executes the Chat Completion call to OpenAI."""
-    try:
-        completion = _openai_client.chat.completions.create(
-            model=OPENAI_GENERATION_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.5,
-            max_tokens=2048, 
-        )
-        return completion.choices[0].message.content or ""
-    except Exception as e:
-        logger.error(f"OpenAI call failed: {e}", exc_info=True)
-        return "Error: Could not generate proposal content."
-
-def get_job_details(state: ProposalState) -> ProposalState:
-    db = state['db']
-    job_id = state['job_id']
-    logger.info(f"Fetching job details for job_id: {job_id}")
-    job = db.query(Job).options(joinedload(Job.relevance)).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
+def timed_node(name: str, node):
+    """
+    Wrap an async node so its wall-clock time lands in state["timings"] and in
+    PROPOSAL_NODE_TIMINGS. Nodes return partial updates, as parallel branches must.
+    """
+    pass_config = "config" in inspect.signature(node).parameters
 
-    state['client_name'] = "Client" 
-    state['job_title'] = job.title
-    state['job_description'] = job.description
-    state['relevance_score'] = job.relevance.score if job.relevance else None
-    state['closest_profile_name'] = job.relevance.closest_profile_name if job.relevance else None
-    logger.info(f"Job details loaded for '{job.title}'.")
-    return state
+    async def run(state: ProposalState, config: RunnableConfig) -> Dict[str, Any]:
+        started = time.perf_counter()
+        update = await (node(state, config) if pass_config else node(state))
+        seconds = time.perf_counter() - started
+        PROPOSAL_NODE_TIMINGS.record(name, seconds)
+        return {**update, "timings": {name: seconds}}
+    return run
 
-def load_template_node(state: ProposalState) -> ProposalState:
-    state['proposal_template'] = load_proposal_template(PROPOSAL_TEMPLATE_MD_PATH)
-    logger.info("Proposal template loaded into state.")
-    return state
-
-def retrieve_context(state: ProposalState) -> ProposalState:
+async def get_job_details(state: ProposalState, config: RunnableConfig) -> Dict[str, Any]:
     """
-    <<< REWRITTEN & ENHANCED: Performs a single, unified search and builds a
-    clean, structured context string using the rich metadata from the index.
+    Load the job; the AsyncSession comes in config["configurable"]["db"]. The read
+    transaction is rolled back once the details are copied out, returning the
+    connection to the pool before generation starts.
     """
-    if GLOBAL_FAISS_MANAGER is None:
-        logger.error("RAG system not initialized. Cannot retrieve context.")
-        state['retrieved_context'] = "Error: RAG system is offline."
-        return state
+    db: AsyncSession = config["configurable"]["db"]
+    job_id = state['job_id']
+    logger.info(f"Fetching job details for job_id: {job_id}")
+    try:
+        result = await db.execute(select(Job).options(joinedload(Job.relevance)).where(Job.id == job_id).limit(1))
+        job = result.scalars().first()
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
+        details = job_details(job)
+    finally:
+        await db.rollback()
+    logger.info(f"Job details loaded for '{details['job_title']}'.")
+    return details
+
+def job_details(job: Job) -> Dict[str, Any]:
+    return {
+        'client_name': "Client",
+        'job_title': job.title,
+        'job_description': job.description,
+        'relevance_score': job.relevance.score if job.relevance else None,
+        'closest_profile_name': job.relevance.closest_profile_name if job.relevance else None,
+        # contractor_selection is stored parsed; no JSON decoding per request
+        'screening_questions': screening_questions(job.contractor_selection),
+    }
+
+async def load_template_node(state: ProposalState) -> Dict[str, Any]:
+    proposal_template = await asyncio.to_thread(load_proposal_template, PROPOSAL_TEMPLATE_MD_PATH)
+    logger.info("Proposal template loaded into state.")
+    return {'proposal_template': proposal_template}
 
-    query_text = f"Job Title: {state['job_title']}. Description: {state['job_description']}"
-    logger.info(f"Retrieving context for query: '{query_text[:150]}...'")
-    
-    retrieved_docs = GLOBAL_FAISS_MANAGER.query(query_text, k=NUM_RETRIEVED_CHUNKS)
+def context_from_docs(retrieved_docs: List[Dict[str, Any]]) -> str:
+    """Clean, structured context string built from the rich metadata of the retrieved chunks."""
     if not retrieved_docs:
         logger.warning("RAG query returned no documents.")
-        state['retrieved_context'] = "No specifically relevant profiles or projects were found in our knowledge base."
-        return state
+        return "No specifically relevant profiles or projects were found in our knowledge base."
 
     relevant_profiles = [d for d in retrieved_docs if d.get("doc_type") == "profile"]
     relevant_projects = [d for d in retrieved_docs if d.get("doc_type") == "project"]
@@ -374,12 +445,43 @@ def retrieve_context(state: ProposalState) -> ProposalState:
                 f"  Tech Stack Used: {', '.join(project.get('tech_stack', []))}\n"
                 f"  Key AI Capabilities: {', '.join(project.get('ai_capabilities', []))}\n"
             )
-
     logger.info("Successfully built structured context for the agent.")
-    state['retrieved_context'] = context_str.strip()
-    return state
+    return context_str.strip()
+
+async def retrieve_context(state: ProposalState) -> Dict[str, Any]:
+    """
+    Search profiles and projects with the job's vector from the job embedding
+    store, which the relevance cron filled when it scored the job. Needs only the
+    job id, so it runs alongside the DB and template loads; jobs without a stored
+    vector are left to retrieve_context_by_text.
+    """
+    if GLOBAL_FAISS_MANAGER is None:
+        logger.error("RAG system not initialized. Cannot retrieve context.")
+        return {'retrieved_context': "Error: RAG system is offline."}
+
+    vector = await asyncio.to_thread(get_job_embedding_store().get_vector, state['job_id'])
+    if vector is None:
+        logger.info(f"No stored vector for job {state['job_id']}; retrieving context by job text.")
+        return {}
+    logger.info(f"Retrieving context with the stored vector of job {state['job_id']}.")
+    retrieved_docs = await asyncio.to_thread(GLOBAL_FAISS_MANAGER.query_by_vector, vector, NUM_RETRIEVED_CHUNKS)
+    return {'retrieved_context': context_from_docs(retrieved_docs)}
 
-def generate_proposal_from_template(state: ProposalState) -> ProposalState:
+async def retrieve_context_by_text(state: ProposalState) -> Dict[str, Any]:
+    """
+    Fallback once the job is loaded: embed its title and description and search.
+    The embedding call and FAISS search block, so they run in a worker thread.
+    """
+    if state.get('retrieved_context'):
+        return {}
+
+    query_text = f"Job Title: {state['job_title']}. Description: {state['job_description']}"
+    logger.info(f"Retrieving context for query: '{query_text[:150]}...'")
+    
+    retrieved_docs = await asyncio.to_thread(GLOBAL_FAISS_MANAGER.query, query_text, NUM_RETRIEVED_CHUNKS)
+    return {'retrieved_context': context_from_docs(retrieved_docs)}
+
+def build_proposal_prompt(state: ProposalState) -> str:
     """
     <<< PROMPT ENHANCED: The prompt is now much more powerful because it receives
     structured, reliable context and has clearer instructions.
@@ -395,6 +497,11 @@ def generate_proposal_from_template(state: ProposalState) -> ProposalState:
                     f"Tailor the proposal to feature the expertise of {profile_name} as the key expert."
         relevance_info += f"Guideline: {guideline}\n"
 
+    questions_info = ""
+    if state.get('screening_questions'):
+        questions_info = "\n**4. SCREENING QUESTIONS:**\nAfter the proposal, answer each of the client's screening questions briefly, under its own heading:\n"
+        questions_info += "\n".join(f"{i}. {question}" for i, question in enumerate(state['screening_questions'], 1)) + "\n"
+
     prompt = f"""
 You are an expert proposal writer for a tech consultancy. Your task is to generate a compelling, human-like proposal for a job by seamlessly integrating our company's relevant experience.
 
@@ -420,57 +527,188 @@ Write the final proposal text. Use the provided template structure for flow, but
 
 **Proposal Template Structure (for flow):**
 {state['proposal_template']}
-
+{questions_info}
 Generate the final, human-like proposal text now:
 """
-    
+    return prompt
+
+async def generate_proposal_from_template(state: ProposalState) -> Dict[str, Any]:
+    """
+    Generate the proposal with a streamed completion: every token is handed to
+    the graph's stream writer as it arrives (stream_mode="custom"; a no-op for
+    ainvoke). Errors propagate instead of becoming the proposal text.
+    """
+    write = get_stream_writer()
+    prompt = build_proposal_prompt(state)
     logger.info("Generating final proposal with enhanced structured context and prompt.")
     logger.debug(f"Final prompt sent to LLM:\n{prompt}")
-    final_proposal_text = execute_openai_call(prompt)
-    state['final_proposal'] = final_proposal_text
-    return state
-
-builder = StateGraph(ProposalState)
-builder.add_node("get_job_details", get_job_details)
-builder.add_node("load_template", load_template_node) 
-builder.add_node("retrieve_context", retrieve_context)
-builder.add_node("generate_proposal", generate_proposal_from_template) 
+    stream = await get_async_openai_client().chat.completions.create(
+        model=OPENAI_GENERATION_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.5,
+        max_tokens=2048,
+        stream=True,
+    )
+    parts = []
+    async for chunk in stream:
+        token = chunk.choices[0].delta.content if chunk.choices else None
+        if token:
+            parts.append(token)
+            write({"token": token})
+    return {'final_proposal': "".join(parts)}
+
+def build_proposal_graph():
+    """
+    get_job_details, load_template and retrieve_context start together. The
+    text fallback of retrieval waits for the job, and generation waits for
+    everything. Only get_job_details touches the AsyncSession, so branches never
+    share it concurrently.
+    """
+    builder = StateGraph(ProposalState)
+    for name, node in (
+        ("get_job_details", get_job_details),
+        ("load_template", load_template_node),
+        ("retrieve_context", retrieve_context),
+        ("retrieve_context_by_text", retrieve_context_by_text),
+        ("generate_proposal", generate_proposal_from_template),
+    ):
+        builder.add_node(name, timed_node(name, node))
+
+    builder.add_edge(START, "get_job_details")
+    builder.add_edge(START, "load_template")
+    builder.add_edge(START, "retrieve_context")
+    builder.add_edge(["get_job_details", "retrieve_context"], "retrieve_context_by_text")
+    builder.add_edge(["load_template", "retrieve_context_by_text"], "generate_proposal")
+    builder.add_edge("generate_proposal", END)
+    return builder.compile()
+
+graph = build_proposal_graph()
+
+def log_timings(job_id: str, final_state: Dict[str, Any]):
+    timings = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in final_state.get("timings", {}).items())
+    logger.info(f"Proposal pipeline timings for job_id {job_id}: {timings}")
+
+async def run_proposal_graph(job_id: str, db: AsyncSession) -> str:
+    """Run the graph for a job with `db` as its session; returns the proposal text."""
+    final_state = await graph.ainvoke({"job_id": job_id}, config={"configurable": {"db": db}})
+    log_timings(job_id, final_state)
+    proposal_text = final_state.get("final_proposal")
+    if not proposal_text:
+        raise RuntimeError("The model returned an empty proposal.")
+    return proposal_text
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events) -> StreamingResponse:
+    # X-Accel-Buffering: nginx would otherwise hold tokens back until its buffer fills
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def save_generated_proposal(db: AsyncSession, job_id: str, proposal_text: str) -> bool:
+    """Store the proposal of a job, replacing an existing one; returns whether one was replaced."""
+    existing = (await db.execute(select(Proposal).where(Proposal.job_id == job_id).limit(1))).scalars().first()
+    if existing:
+        existing.proposal_text = proposal_text
+    else:
+        db.add(Proposal(proposal_text=proposal_text, job_id=job_id))
+    await db.commit()
+    if existing is None:
+        invalidate_job_listings() # proposal_ready changed
+    return existing is not None
 
-builder.set_entry_point("get_job_details")
-builder.add_edge("get_job_details", "load_template")
-builder.add_edge("load_template", "retrieve_context")
-builder.add_edge("retrieve_context", "generate_proposal")
-builder.add_edge("generate_proposal", END)
+async def pregenerate_proposal(job_id: str) -> bool:
+    """
+    Run the proposal graph for a job and store the result as a pre-generated
+    proposal, unless someone stored a proposal for it in the meantime.
+    """
+    if GLOBAL_FAISS_MANAGER is None:
+        raise RuntimeError("RAG system is offline; not pre-generating without context.")
+    async with AsyncSessionLocal() as db:
+        proposal_text = await run_proposal_graph(job_id, db)
+        if (await db.execute(select(Proposal.id).where(Proposal.job_id == job_id).limit(1))).first() is not None:
+            return False
+        db.add(Proposal(proposal_text=proposal_text, job_id=job_id, status=PREGENERATED_STATUS))
+        await db.commit()
+        return True
 
-graph = builder.compile()
+PROPOSAL_PREGENERATOR.register(pregenerate_proposal)
 
 @router.post("/agentic-generate-proposal/{job_id}")
-def agentic_generate_proposal(job_id: str, overwrite: bool = False, db: Session = Depends(get_db)):
+async def agentic_generate_proposal(job_id: str, overwrite: bool = False, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"Received request to generate proposal for job_id: {job_id} with overwrite: {overwrite}")
-    existing_proposal = db.query(Proposal).filter(Proposal.job_id == job_id).first() 
-    if existing_proposal and not overwrite:
+    existing_text = (await db.execute(
+        select(Proposal.proposal_text).where(Proposal.job_id == job_id).limit(1)
+    )).scalar_one_or_none()
+    if existing_text is not None and not overwrite:
         logger.info(f"Existing proposal found for job_id: {job_id}. Returning existing.")
-        return {"job_id": job_id, "proposal": existing_proposal.proposal_text, "exists": True}
+        return {"job_id": job_id, "proposal": existing_text, "exists": True}
 
     logger.info(f"Generating new proposal for job_id: {job_id} (overwrite: {overwrite})")
-    initial_state = {"job_id": job_id, "db": db}
-    final_state = graph.invoke(initial_state)
-    proposal_text = final_state.get("final_proposal", "Error: Proposal generation failed.")
+    try:
+        # Background pre-generation waits while a user is waiting on a proposal.
+        with PROPOSAL_PREGENERATOR.interactive(job_id):
+            proposal_text = await run_proposal_graph(job_id, db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Proposal generation failed for job_id {job_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=502, detail=f"Proposal generation failed: {str(e)}")
+
+    overwritten = await save_generated_proposal(db, job_id, proposal_text)
+    if overwritten:
+        logger.info(f"Overwrote existing proposal for job_id: {job_id}")
+        return {"job_id": job_id, "proposal": proposal_text, "exists": True, "overwritten": True}
+    logger.info(f"Created new proposal for job_id: {job_id}")
+    return {"job_id": job_id, "proposal": proposal_text}
+
+@router.post("/agentic-generate-proposal/{job_id}/stream")
+async def agentic_generate_proposal_stream(job_id: str, overwrite: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """
+    /agentic-generate-proposal/{job_id} as Server-Sent Events: `token` events carry
+    the proposal text as it is generated, then `done` carries the whole proposal once
+    it is saved, or `error`. An existing proposal is sent as a lone `done` event
+    unless overwrite is set. A client that disconnects early cancels the generation.
+    """
+    logger.info(f"Received request to stream proposal for job_id: {job_id} with overwrite: {overwrite}")
+    existing_text = (await db.execute(
+        select(Proposal.proposal_text).where(Proposal.job_id == job_id).limit(1)
+    )).scalar_one_or_none()
+    if existing_text is not None and not overwrite:
+        async def existing_events():
+            yield sse_event("done", {"job_id": job_id, "proposal": existing_text, "exists": True})
+        return sse_response(existing_events())
+    # Checked before the stream starts so a missing job is still a 404.
+    job_exists = (await db.execute(select(Job.id).where(Job.id == job_id).limit(1))).first() is not None
+    await db.rollback() # nothing stays open while the response streams
+    if not job_exists:
+        raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
 
-    if existing_proposal:
-        logger.info(f"Overwriting existing proposal for job_id: {job_id}")
-        existing_proposal.proposal_text = proposal_text
-    else:
-        logger.info(f"Creating new proposal for job_id: {job_id}")
-        new_proposal = Proposal(proposal_text=proposal_text, job_id=job_id)
-        db.add(new_proposal)
-    
-    db.commit()
-    if existing_proposal:
-        db.refresh(existing_proposal)
-        return {"job_id": job_id, "proposal": existing_proposal.proposal_text, "exists": True, "overwritten": True}
-    else:
-        return {"job_id": job_id, "proposal": proposal_text}
+    async def events():
+        final_state: Dict[str, Any] = {}
+        try:
+            with PROPOSAL_PREGENERATOR.interactive(job_id):
+                async for mode, chunk in graph.astream(
+                    {"job_id": job_id}, config={"configurable": {"db": db}}, stream_mode=["custom", "values"]
+                ):
+                    if mode == "custom":
+                        yield sse_event("token", {"text": chunk["token"]})
+                    else:
+                        final_state = chunk
+            log_timings(job_id, final_state)
+            proposal_text = final_state.get("final_proposal")
+            if not proposal_text:
+                raise RuntimeError("The model returned an empty proposal.")
+            overwritten = await save_generated_proposal(db, job_id, proposal_text)
+        except Exception as e:
+            logger.error(f"Streaming proposal generation failed for job_id {job_id}: {e}", exc_info=True)
+            yield sse_event("error", {"detail": f"Proposal generation failed: {str(e)}"})
+            return
+        logger.info(f"Streamed and saved proposal for job_id: {job_id}")
+        yield sse_event("done", {"job_id": job_id, "proposal": proposal_text, "exists": overwritten,
+                                 "overwritten": overwritten})
+
+    return sse_response(events())
 
 @router.put("/save-proposal/{job_id}")
 def save_proposal(job_id: str, proposal_data: Dict[str, str], db: Session = Depends(get_db)):
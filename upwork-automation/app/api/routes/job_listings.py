@@ -1,70 +1,539 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from sqlalchemy import func
+import json
+import base64
+import hashlib
+from dataclasses import astuple, dataclass
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, case, exists, func, or_, select, true, tuple_
 from datetime import datetime, timedelta
-from app.db.database import get_db
-from app.models.jobs import Job, JobRelevance # Import necessary models, updated Relevance, removed Question and Proposal
-from app.schemas.jobs import JobResponse as JobSchema, JobRelevanceResponse # Import necessary schemas, updated RelevanceSchema, removed QuestionSchema and ProposalSchema
+from app.db.database import get_async_db
+from app.models.jobs import JOB_RELEVANCE_JOIN, SEARCH_CONFIG, Job, JobRelevance, Proposal # Import necessary models, updated Relevance, removed Question
+from app.schemas.jobs import JobResponse as JobSchema, JobRelevanceResponse, JobChangesResponse, JobSearchResult, JobSummary, SimilarJobResponse, SkillFrequency # Import necessary schemas, updated RelevanceSchema, removed QuestionSchema and ProposalSchema
+from pydantic_core import to_json
+from app.utils.job_embeddings import get_job_embedding_store
+from app.utils.response_cache import LISTINGS_CACHE, CachedResponse
+from app.utils.skills import normalize_skill
 
 router = APIRouter()
 
 
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_CHANGES_PER_CALL = 500
+# Rows committed slightly out of timestamp order could fall behind a watermark,
+# so the changes query looks back this far; clients merge results by job id.
+CHANGE_TOKEN_OVERLAP = timedelta(seconds=5)
+RELEVANCE_CATEGORIES = ["strong", "medium", "low", "irrelevant"]
+AGENCIES_DISALLOWED_TAG = "Agencies disallowed"
+# The table shows the first 15 words of the description; the full text is loaded with the job details.
+DESCRIPTION_EXCERPT_CHARS = 200
+
+# Columns shown by the jobs table in the dashboard (see JobSummary).
+JOB_SUMMARY_COLUMNS = (
+    Job.id,
+    Job.title,
+    Job.publishedDateTime,
+    Job.engagement,
+    Job.experienceLevel,
+    Job.durationLabel,
+    Job.status,
+    Job.amount,
+    Job.currency,
+    Job.client_country,
+    Job.client_total_hires,
+    Job.client_total_spent,
+    Job.client_verification_status,
+    Job.has_questions,
+    Job.question_count,
+    Job.required_connects,
+)
+JOB_SUMMARY_KEYS = tuple(column.key for column in JOB_SUMMARY_COLUMNS)
+
+MAX_SKILLS = 500
+MAX_SKILL_STATS_DAYS = 365
+MAX_SEARCH_RESULTS = 100
+MAX_SEARCH_OFFSET = 1000
+SEARCH_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8, FragmentDelimiter= … "
+
+
+def encode_cursor(published: Optional[datetime], job_id: str) -> str:
+    """Opaque keyset cursor for the (publishedDateTime, id) position of the last row of a page."""
+    payload = json.dumps([published.isoformat() if published else None, job_id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published_iso, job_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(published_iso), str(job_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+@dataclass(frozen=True)
+class JobFilters:
+    """Optional filters shared by the listing endpoints; empty fields are not applied."""
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    categories: Tuple[str, ...] = ()
+    exclude_agencies_disallowed: bool = False
+    country: Optional[str] = None
+    engagement: Optional[str] = None
+    min_client_spent: Optional[float] = None
+    skills: Tuple[str, ...] = () # normalized; jobs must have all of them
+    has_questions: Optional[bool] = None
+    max_connects: Optional[int] = None
+
+    def apply(self, stmt, job=Job):
+        """Add the filters to a job_summary_select() statement; `job` is the jobs entity it selects from."""
+        if self.min_score is not None:
+            stmt = stmt.where(JobRelevance.score >= self.min_score)
+        if self.max_score is not None:
+            stmt = stmt.where(JobRelevance.score <= self.max_score)
+        if self.categories:
+            stmt = stmt.where(JobRelevance.category.in_(self.categories))
+        if self.exclude_agencies_disallowed:
+            # tags is a JSON list stored as text
+            stmt = stmt.where(or_(JobRelevance.tags.is_(None), ~JobRelevance.tags.contains(AGENCIES_DISALLOWED_TAG)))
+        if self.country:
+            stmt = stmt.where(job.client_country == self.country)
+        if self.engagement:
+            stmt = stmt.where(job.engagement == self.engagement)
+        if self.min_client_spent is not None:
+            stmt = stmt.where(job.client_total_spent >= self.min_client_spent)
+        if self.skills:
+            stmt = stmt.where(job.skill_list.contains(list(self.skills)))
+        if self.has_questions is not None:
+            stmt = stmt.where(job.has_questions.is_(self.has_questions))
+        if self.max_connects is not None:
+            stmt = stmt.where(job.required_connects <= self.max_connects)
+        return stmt
+
+
+def job_filters(
+    min_score: Optional[float] = Query(None, ge=0, le=1),
+    max_score: Optional[float] = Query(None, ge=0, le=1),
+    category: Optional[List[str]] = Query(None),
+    exclude_agencies_disallowed: bool = False,
+    country: Optional[str] = None,
+    engagement: Optional[str] = None,
+    min_client_spent: Optional[float] = Query(None, ge=0),
+    skill: Optional[List[str]] = Query(None, description="Jobs requiring all of these skills"),
+    has_questions: Optional[bool] = Query(None, description="Jobs with (true) or without (false) screening questions"),
+    max_connects: Optional[int] = Query(None, ge=0, description="Jobs costing at most this many Connects to apply")
+) -> JobFilters:
+    categories = ()
+    if category:
+        if any(value.lower() not in RELEVANCE_CATEGORIES for value in category):
+            raise HTTPException(status_code=400, detail="Invalid category value. Must be strong, medium, low, or irrelevant.")
+        categories = tuple(sorted({value.capitalize() for value in category}))
+    skills = tuple(sorted({normalize_skill(value) for value in skill or ()} - {""}))
+    return JobFilters(min_score, max_score, categories, exclude_agencies_disallowed, country, engagement,
+                      min_client_spent, skills, has_questions, max_connects)
+
+
+def job_summary_columns(job=Job):
+    return (
+        *(getattr(job, key) for key in JOB_SUMMARY_KEYS),
+        func.substr(job.description, 1, DESCRIPTION_EXCERPT_CHARS).label("description"),
+        JobRelevance.score.label("relevance_score"),
+        JobRelevance.category.label("relevance_category"),
+        exists().where(Proposal.job_id == job.id).label("proposal_ready"),
+    )
+
+
+def job_summary_select():
+    """
+    Core select of only the JobSummary columns: the description is cut down in SQL
+    and the relevance row contributes just score and category, so the large text
+    and JSON columns are never read for list views. proposal_ready is an EXISTS
+    on idx_proposals_job_id per row of the page.
+    """
+    return select(*job_summary_columns()).outerjoin(JobRelevance, JOB_RELEVANCE_JOIN)
+
+
+def relevance_summary_select(dialect_name: str):
+    """
+    job_summary_select() for listings driven by job_relevance; returns the statement
+    and the jobs entity to filter on (see JobFilters.apply). Postgres multiplies the
+    selectivities of the two JOB_RELEVANCE_JOIN columns, expects a single row, and
+    hash-joins every job instead of walking idx_job_relevance_category_published.
+    On Postgres each relevance row therefore looks up its job in a LATERAL subquery
+    (the LIMIT keeps it from being flattened back into that join), which keeps the
+    row estimate and prunes jobs to one partition per lookup.
+    """
+    if dialect_name != "postgresql":
+        return job_summary_select(), Job
+    job = aliased(Job, select(Job).where(JOB_RELEVANCE_JOIN).limit(1).lateral("job"))
+    return select(*job_summary_columns(job)).select_from(JobRelevance).join(job, true()), job
+
+
+def job_summary_dict(row) -> Dict[str, Any]:
+    """
+    Shape a job_summary_select() row like JobSummary without building a model:
+    list responses go straight from Core rows to JSON bytes (see render_job_page).
+    """
+    summary = {key: row[key] for key in JOB_SUMMARY_KEYS}
+    summary["description"] = row["description"]
+    summary["proposal_ready"] = bool(row["proposal_ready"])
+    if row["relevance_score"] is not None or row["relevance_category"] is not None:
+        summary["relevance"] = {"score": row["relevance_score"], "category": row["relevance_category"]}
+    else:
+        summary["relevance"] = None
+    return summary
+
+
+def page_select(stmt, limit: int, cursor: Optional[str], order_columns=(Job.publishedDateTime, Job.id)):
+    """
+    Apply keyset pagination on (publishedDateTime DESC, id DESC), served by the
+    idx_jobs_published_id index, so every page costs the same as the first.
+    `order_columns` may name an equivalent (published, id) pair from another
+    table, e.g. the denormalized job_relevance columns for category listings.
+    The pair is also selected as page_published/page_id for the next cursor.
+    One extra row is selected to tell whether another page follows.
+    """
+    published_column, id_column = order_columns
+    if cursor:
+        published, job_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(published_column, id_column) < tuple_(published, job_id))
+    stmt = stmt.add_columns(published_column.label("page_published"), id_column.label("page_id"))
+    return stmt.order_by(published_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+async def paginate_jobs(db: AsyncSession, stmt, limit: int, cursor: Optional[str], order_columns=(Job.publishedDateTime, Job.id)):
+    """Run page_select(); returns the page rows and the cursor of the following page, if any."""
+    rows = (await db.execute(page_select(stmt, limit, cursor, order_columns))).mappings().all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last["page_published"], last["page_id"])
+
+
+async def render_job_page(db: AsyncSession, stmt, etag_parts: tuple, limit: int, cursor: Optional[str], order_columns) -> CachedResponse:
+    etag = await listing_etag(db, *etag_parts)
+    rows, next_cursor = await paginate_jobs(db, stmt, limit, cursor, order_columns)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return CachedResponse(body=to_json([job_summary_dict(row) for row in rows]), headers=headers)
+
+
+async def cached_job_page(request: Request, db: AsyncSession, cache_key: tuple, etag_parts: tuple, stmt,
+                          limit: int, cursor: Optional[str], order_columns=(Job.publishedDateTime, Job.id)) -> Response:
+    """
+    Serve a listing page from LISTINGS_CACHE. Concurrent pollers of the same page
+    share one query; a cached page is answered (or 304'd) without touching the DB.
+    """
+    page = await LISTINGS_CACHE.aget_or_compute(
+        cache_key, lambda: render_job_page(db, stmt, etag_parts, limit, cursor, order_columns)
+    )
+    if is_not_modified(request, page.etag):
+        return not_modified_response(page.etag)
+    return Response(content=page.body, media_type="application/json", headers=page.headers)
+
+
+async def listing_watermark(db: AsyncSession, include_proposals: bool = False) -> Optional[datetime]:
+    """
+    Latest insert/update/re-score time across the listings. The max() lookups are
+    answered from the idx_jobs_first_fetched / idx_jobs_updated_at /
+    idx_job_relevance_updated_at indexes, so this is cheap enough to run on every poll. With
+    `include_proposals` the newest proposal counts too (idx_proposals_applied_at),
+    for the proposal_ready flag; the delta sync does not report proposals.
+    """
+    newest = [
+        select(func.max(Job.JobFirstFetchedDateTime)).scalar_subquery(),
+        select(func.max(Job.updated_at)).scalar_subquery(),
+        select(func.max(JobRelevance.updated_at)).scalar_subquery(),
+    ]
+    if include_proposals:
+        newest.append(select(func.max(Proposal.applied_at)).scalar_subquery())
+    timestamps = (await db.execute(select(*newest))).one()
+    return max((ts for ts in timestamps if ts is not None), default=None)
+
+
+async def listing_etag(db: AsyncSession, *parts) -> str:
+    watermark = await listing_watermark(db, include_proposals=True)
+    key = "|".join([watermark.isoformat() if watermark else ""] + [str(part) for part in parts])
+    return 'W/"' + hashlib.sha1(key.encode("utf-8")).hexdigest() + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def encode_change_token(watermark: Optional[datetime], after: Optional[Tuple[datetime, str]] = None) -> str:
+    """
+    Opaque delta-sync token: the watermark the client is caught up to and, while
+    a burst of changes is paged through, the (changed_at, id) of the last row sent.
+    """
+    payload = json.dumps([
+        watermark.isoformat() if watermark else None,
+        after[0].isoformat() if after else None,
+        after[1] if after else None,
+    ])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_change_token(token: str) -> Tuple[Optional[datetime], Optional[Tuple[datetime, str]]]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        watermark_iso, after_iso, after_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        watermark = datetime.fromisoformat(watermark_iso) if watermark_iso else None
+        after = (datetime.fromisoformat(after_iso), str(after_id)) if after_iso else None
+        return watermark, after
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid change token.")
+
+
 # List all jobs saved in postgres database
-@router.get("/", response_model=List[JobSchema])
-def list_all_jobs(db: Session = Depends(get_db), limit: Optional[int] = 200):
-    # Query Job and eagerly load relevance
-    # Query Job and eagerly load relevance
-    # Query Job and eagerly load relevance
-    # Removed joinedload for questions and proposals as they are not in the new Job model
+@router.get("/", response_model=List[JobSummary])
+async def list_all_jobs(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    filters: JobFilters = Depends(job_filters),
+    limit: int = Query(200, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    # Optimized order_by: Removed func.coalesce as an index exists on publishedDateTime.
-    # This allows the database to potentially use the index more efficiently for sorting.
-    jobs_query = db.query(Job).options(
-        joinedload(Job.relevance)
-    ).filter(Job.publishedDateTime >= thirty_days_ago).order_by(Job.publishedDateTime.desc()) # Use publishedDateTime as per new schema
-
-    if limit:
-        jobs_orm = jobs_query.limit(limit).all()
-    else:
-        jobs_orm = jobs_query.all()
+    # The hour bucket lets the page (and its ETag) change as old jobs age out of the 30-day window.
+    window = thirty_days_ago.strftime("%Y%m%d%H")
+    stmt = filters.apply(job_summary_select().where(Job.publishedDateTime >= thirty_days_ago))
 
-    # The JobSchema should handle mapping ORM objects to the desired response structure
-    # including flattening client details and handling relationships.
-    # We can directly pass the ORM objects to model_validate.
-    validated_jobs = [JobSchema.model_validate(job) for job in jobs_orm]
-    return validated_jobs
+    key = ("all", window, astuple(filters), limit, cursor)
+    return await cached_job_page(request, db, key, key, stmt, limit, cursor)
 
 
-@router.get("/relevance/{relevance}", response_model=List[JobSchema])
-def list_jobs_by_relevance(relevance: str, db: Session = Depends(get_db), limit: Optional[int] = 150):
-    # Ensure relevance value matches the category column in the relevance table
-    if relevance.lower() not in ["strong", "medium", "low", "irrelevant"]:
+def changes_response(jobs: List[Dict[str, Any]], token: str, has_more: bool = False) -> Response:
+    return Response(content=to_json({"jobs": jobs, "token": token, "has_more": has_more}), media_type="application/json")
+
+
+# Jobs inserted, updated by a re-ingest or re-scored since a token from a previous call; an empty `since` just returns the current token
+@router.get("/changes", response_model=JobChangesResponse)
+async def list_job_changes(
+    db: AsyncSession = Depends(get_async_db),
+    since: Optional[str] = None,
+    relevance: Optional[str] = None,
+    limit: int = Query(MAX_CHANGES_PER_CALL, ge=1, le=MAX_CHANGES_PER_CALL)
+):
+    if relevance and relevance.lower() not in RELEVANCE_CATEGORIES:
         raise HTTPException(status_code=400, detail="Invalid relevance value. Must be strong, medium, low, or irrelevant.")
 
-    # Join with the JobRelevance table and filter by category
-    # Removed joinedload for questions and proposals as they are not in the new Job model
-    jobs_query = db.query(Job).join(JobRelevance).filter(JobRelevance.category == relevance.capitalize()).options( # Capitalize for consistency with enum/string values, updated join and filter
-        joinedload(Job.relevance)
-    ).order_by(Job.publishedDateTime.desc()) # Use publishedDateTime
+    watermark, after = decode_change_token(since) if since else (None, None)
+    if watermark is None:
+        return changes_response([], encode_change_token(await listing_watermark(db)))
 
-    if limit:
-        jobs_orm = jobs_query.limit(limit).all()
-    else:
-        jobs_orm = jobs_query.all()
+    # updated_at is null on rows written before the column existed
+    job_changed_at = case(
+        (Job.updated_at > Job.JobFirstFetchedDateTime, Job.updated_at),
+        else_=Job.JobFirstFetchedDateTime
+    )
+    changed_at = case(
+        (JobRelevance.updated_at > job_changed_at, JobRelevance.updated_at),
+        else_=job_changed_at
+    )
+    window_start = watermark - CHANGE_TOKEN_OVERLAP
+    stmt = job_summary_select().add_columns(changed_at.label("changed_at")).where(
+        or_(Job.JobFirstFetchedDateTime > window_start, Job.updated_at > window_start,
+            JobRelevance.updated_at > window_start)
+    )
+    if after:
+        stmt = stmt.where(tuple_(changed_at, Job.id) > tuple_(after[0], after[1]))
+    if relevance:
+        stmt = stmt.where(JobRelevance.category == relevance.capitalize())
+
+    rows = (await db.execute(stmt.order_by(changed_at, Job.id).limit(limit + 1))).mappings().all()
+    jobs = [job_summary_dict(row) for row in rows[:limit]]
+
+    if len(rows) > limit:
+        # More changes than fit in one response: continue right after the last row sent.
+        last = rows[limit - 1]
+        token = encode_change_token(watermark, (last["changed_at"], last["id"]))
+        return changes_response(jobs, token, has_more=True)
+
+    newest = max((row["changed_at"] for row in rows if row["changed_at"] is not None), default=watermark)
+    return changes_response(jobs, encode_change_token(max(newest, watermark)))
+
+
+def job_search_select(q: str, categories: Optional[List[str]] = None, country: Optional[str] = None,
+                      published_from: Optional[datetime] = None, published_to: Optional[datetime] = None,
+                      limit: int = 50, offset: int = 0):
+    """
+    Full-text search over the generated jobs.search_vector column (GIN indexed).
+    Matching and ranking run on the index alone; ts_headline, which re-parses the
+    description, is only evaluated for the page of results that is returned.
+    """
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(Job.search_vector, ts_query)
+
+    matches = select(Job.id, Job.publishedDateTime, rank.label("rank")).where(Job.search_vector.bool_op("@@")(ts_query))
+    if categories:
+        matches = matches.join(JobRelevance, JOB_RELEVANCE_JOIN).where(JobRelevance.category.in_(categories))
+    if country:
+        matches = matches.where(Job.client_country == country)
+    if published_from:
+        matches = matches.where(Job.publishedDateTime >= published_from)
+    if published_to:
+        matches = matches.where(Job.publishedDateTime < published_to)
+    matches = matches.order_by(rank.desc(), Job.publishedDateTime.desc()).limit(limit).offset(offset).subquery()
+
+    return (
+        job_summary_select()
+        .add_columns(
+            matches.c.rank,
+            func.ts_headline(SEARCH_CONFIG, func.coalesce(Job.description, ""), ts_query, SEARCH_HEADLINE_OPTIONS).label("headline"),
+        )
+        .join(matches, and_(matches.c.id == Job.id, matches.c.publishedDateTime == Job.publishedDateTime))
+        .order_by(matches.c.rank.desc(), matches.c.publishedDateTime.desc())
+    )
 
-    validated_jobs = [JobSchema.model_validate(job) for job in jobs_orm]
-    return validated_jobs
+
+# Ranked full-text search with highlighting; `relevance` may be repeated to search several categories
+@router.get("/search", response_model=List[JobSearchResult])
+async def search_jobs(
+    q: str = Query(..., min_length=2, max_length=200),
+    relevance: Optional[List[str]] = Query(None),
+    country: Optional[str] = None,
+    published_from: Optional[datetime] = None,
+    published_to: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=MAX_SEARCH_RESULTS),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+    db: AsyncSession = Depends(get_async_db)
+):
+    categories = None
+    if relevance:
+        if any(value.lower() not in RELEVANCE_CATEGORIES for value in relevance):
+            raise HTTPException(status_code=400, detail="Invalid relevance value. Must be strong, medium, low, or irrelevant.")
+        categories = [value.capitalize() for value in relevance]
+
+    stmt = job_search_select(q, categories, country, published_from, published_to, limit, offset)
+    results = []
+    for row in (await db.execute(stmt)).mappings():
+        result = job_summary_dict(row)
+        result["rank"] = float(row["rank"] or 0.0)
+        result["headline"] = row["headline"]
+        results.append(result)
+    return Response(content=to_json(results), media_type="application/json")
+
+
+def skill_frequency_select(categories: Optional[List[str]], skills: List[str], country: Optional[str],
+                           published_from: datetime, limit: int):
+    """
+    Most common skills among jobs published since `published_from`. Candidate
+    jobs come from the published/category indexes, or from idx_jobs_skill_list
+    when co-occurring skills are asked for; only their skill_list arrays are unnested.
+    """
+    skill = func.unnest(Job.skill_list).table_valued("skill").render_derived(name="job_skill")
+    jobs = func.count().label("jobs")
+    stmt = (
+        select(skill.c.skill, jobs)
+        .select_from(Job)
+        .join(skill, true())
+        .where(Job.publishedDateTime >= published_from)
+        .group_by(skill.c.skill)
+        .order_by(jobs.desc(), skill.c.skill)
+        .limit(limit)
+    )
+    if categories:
+        stmt = stmt.join(JobRelevance, JOB_RELEVANCE_JOIN).where(JobRelevance.category.in_(categories))
+    if skills:
+        stmt = stmt.where(Job.skill_list.contains(skills), skill.c.skill.not_in(skills))
+    if country:
+        stmt = stmt.where(Job.client_country == country)
+    return stmt
+
+
+# Skill counts; with `skill`, the skills that most often appear together with it
+@router.get("/skills", response_model=List[SkillFrequency])
+async def skill_frequency(
+    relevance: Optional[List[str]] = Query(None),
+    skill: Optional[List[str]] = Query(None),
+    country: Optional[str] = None,
+    days: int = Query(30, ge=1, le=MAX_SKILL_STATS_DAYS),
+    limit: int = Query(50, ge=1, le=MAX_SKILLS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    categories = None
+    if relevance:
+        if any(value.lower() not in RELEVANCE_CATEGORIES for value in relevance):
+            raise HTTPException(status_code=400, detail="Invalid relevance value. Must be strong, medium, low, or irrelevant.")
+        categories = [value.capitalize() for value in relevance]
+    skills = sorted({normalize_skill(value) for value in skill or ()} - {""})
+
+    stmt = skill_frequency_select(categories, skills, country, datetime.utcnow() - timedelta(days=days), limit)
+    return [{"skill": row.skill, "jobs": row.jobs} for row in await db.execute(stmt)]
+
+
+@router.get("/relevance/{relevance}", response_model=List[JobSummary])
+async def list_jobs_by_relevance(
+    relevance: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    filters: JobFilters = Depends(job_filters),
+    limit: int = Query(150, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    # Ensure relevance value matches the category column in the relevance table
+    if relevance.lower() not in RELEVANCE_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Invalid relevance value. Must be strong, medium, low, or irrelevant.")
+
+    # Capitalize for consistency with the stored category values. Ordering on the
+    # denormalized job_relevance.published_at lets idx_job_relevance_category_published
+    # return the page in order instead of sorting every job of the category.
+    stmt, job = relevance_summary_select(db.get_bind().dialect.name)
+    stmt = filters.apply(stmt.where(JobRelevance.category == relevance.capitalize()), job)
+
+    key = ("relevance", relevance.lower(), astuple(filters), limit, cursor)
+    return await cached_job_page(request, db, key, key, stmt, limit, cursor,
+                                 order_columns=(JobRelevance.published_at, JobRelevance.id))
 
 
 # Get a specific job by ID
 @router.get("/{job_id}", response_model=JobSchema)
-def get_job(job_id: str, db: Session = Depends(get_db)):
-    job = db.query(Job).options(
-        joinedload(Job.relevance)
-    ).filter(Job.id == job_id).first() 
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(Job).options(joinedload(Job.relevance)).where(Job.id == job_id)
+    )
+    job = result.scalars().first()
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return JobSchema.model_validate(job)
+
+
+# Find previously scored jobs similar to this one, using the stored job embeddings (no LLM/embedding calls)
+@router.get("/{job_id}/similar", response_model=List[SimilarJobResponse])
+async def get_similar_jobs(job_id: str, db: AsyncSession = Depends(get_async_db), k: int = Query(10, ge=1, le=50)):
+    matches = get_job_embedding_store().similar(job_id, k)
+    if matches is None:
+        raise HTTPException(status_code=404, detail="No stored embedding for this job yet. It is added when the job is scored.")
+    if not matches:
+        return []
+
+    matched_ids = [matched_id for matched_id, _ in matches]
+    jobs_result = await db.execute(select(Job).options(joinedload(Job.relevance)).where(Job.id.in_(matched_ids)))
+    jobs_by_id = {job.id: job for job in jobs_result.scalars().all()}
+    proposals_result = await db.execute(select(Proposal.job_id, Proposal.status).where(Proposal.job_id.in_(matched_ids)))
+    proposal_status_by_job = dict(proposals_result.all())
+
+    similar_jobs = []
+    for matched_id, similarity in matches:
+        job = jobs_by_id.get(matched_id)
+        if job is None:
+            continue
+        similar_jobs.append(SimilarJobResponse(
+            similarity=similarity,
+            proposal_status=proposal_status_by_job.get(matched_id),
+            job=JobSchema.model_validate(job)
+        ))
+    return similar_jobs
@@ -1,67 +1,67 @@
-# from fastapi import APIRouter, Depends, HTTPException, Query
-# from sqlalchemy.orm import Session
-# import pandas as pd
-# from datetime import datetime
-# import requests
-# import xml.etree.ElementTree as ET
-# import os
-# import urllib.parse
-# from dotenv import load_dotenv
-# from app.db.database import get_db
-# from app.models.jobs import Job # Removed Skill import
-# from app.schemas.jobs import JobCreate # Keep JobCreate schema
+import asyncio
+import logging
 
-# load_dotenv()
+import aiohttp
+from fastapi import APIRouter, Depends, HTTPException, Query
+from lxml import etree
+from sqlalchemy.ext.asyncio import AsyncSession
 
-# RSS_FEED_BASE_URL = os.getenv("RSS_FEED_URL")
-# if not RSS_FEED_BASE_URL:
-#     raise ValueError("RSS_FEED_URL environment variable is not set")
+from app.core.config import settings
+from app.db.database import engine, get_async_db
+from app.utils.feed_fetcher import get_feed_fetcher
+from app.utils.job_utils import IngestResult, ingest_items
+from app.utils.response_cache import invalidate_job_listings
 
-# router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# def fetch_rss_feed(page: int = 1, limit: int = 100) -> pd.DataFrame:
-#     """Fetch RSS feed from the configured URL with pagination parameters."""
-#     parsed_url = urllib.parse.urlparse(RSS_FEED_BASE_URL)
-#     query_params = urllib.parse.parse_qs(parsed_url.query)
-    
-#     query_params['page'] = [str(page)]
-#     query_params['limit'] = [str(limit)]
-    
-#     updated_query = urllib.parse.urlencode(query_params, doseq=True)
-#     updated_url = urllib.parse.urlunparse(
-#         (parsed_url.scheme, parsed_url.netloc, parsed_url.path, 
-#          parsed_url.params, updated_query, parsed_url.fragment)
-#     )
-    
-#     print(f"Fetching RSS feed from: {updated_url}")
-#     response = requests.get(updated_url)
-#     root = ET.fromstring(response.content)
-#     items = root.findall('.//channel/item')
+router = APIRouter()
 
-#     records = []
-#     for item in items:
-#         record = {}
-#         for child in item:
-#             tag = child.tag.split('}')[-1]
-#             record[tag] = child.text.strip() if child.text else ''
-#         records.append(record)
 
-#     # Return list of dictionaries directly, process_and_save_jobs expects this
-#     return records
+@router.post("/fetch-and-save/")
+async def fetch_and_save(
+    page: int = Query(1, ge=1, description="First page to fetch"),
+    limit: int = Query(100, ge=1, le=500, description="Number of results per page"),
+    max_pages: int = Query(settings.FEED_MAX_PAGES, ge=1, le=100,
+                           description="Pages to fetch at most; stops earlier at the first already seen job"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if not settings.RSS_FEED_URL:
+        raise HTTPException(status_code=500, detail="RSS_FEED_URL environment variable is not set")
+    fetcher = get_feed_fetcher()
+    await fetcher.seed_seen_ids(db)
 
-# @router.post("/fetch-and-save/")
-# async def fetch_and_save(
-#     page: int = Query(1, ge=1, description="Page number to fetch"),
-#     limit: int = Query(100, ge=1, le=500, description="Number of results per page"),
-#     db: Session = Depends(get_db)
-# ):
-#     try:
-#         # fetch_rss_feed now returns a list of dicts
-#         jobs_data = fetch_rss_feed(page=page, limit=limit)
-#         jobs_added, jobs_skipped = await process_and_save_jobs(db, jobs_data)
-#         return {
-#             "message": f"Processed {len(jobs_data)} job posts. Added {jobs_added}, skipped {jobs_skipped} (already existed).",
-#             "url_used": f"{RSS_FEED_BASE_URL}?page={page}&limit={limit}"
-#         }
-#     except Exception as e:
-#         raise HTTPException(status_code=500, detail=f"Error processing RSS feed: {str(e)}")
+    result = IngestResult()
+    pages_saved, new_items, not_modified = [], 0, True
+    try:
+        async for feed_page in fetcher.iter_new_pages(page, limit, max_pages):
+            not_modified = False
+            # Conversion and the bulk upsert are CPU-bound/blocking; keep them off the event loop.
+            result.add(await asyncio.to_thread(ingest_items, feed_page.items, engine))
+            fetcher.mark_ingested(feed_page)
+            pages_saved.append(feed_page.page)
+            new_items += feed_page.new_items
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise HTTPException(status_code=502, detail=f"Error fetching RSS feed: {str(e)}")
+    except etree.XMLSyntaxError as e:
+        raise HTTPException(status_code=502, detail=f"Error parsing RSS feed: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error processing RSS feed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing RSS feed: {str(e)}")
+    finally:
+        # Pages saved before a failure are visible too.
+        if pages_saved:
+            invalidate_job_listings()
+
+    return {
+        "message": f"Processed {result.parsed} job posts from {len(pages_saved)} page(s). "
+                   f"Added {result.inserted}, updated {result.updated}, unchanged {result.unchanged}, skipped {result.skipped}.",
+        "url_used": fetcher.page_url(page, limit),
+        "pages": pages_saved,
+        "not_modified": not_modified,
+        "new_items": new_items,
+        "parsed": result.parsed,
+        "inserted": result.inserted,
+        "updated": result.updated,
+        "unchanged": result.unchanged,
+        "skipped": result.skipped,
+    }
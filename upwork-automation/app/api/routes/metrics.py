@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+
+from app.db.database import database_metrics
+from app.utils.embeddings import get_embedding_service_if_ready
+from app.utils.feed_fetcher import get_feed_fetcher
+from app.utils.node_timings import PROPOSAL_NODE_TIMINGS
+from app.utils.proposal_pregeneration import PROPOSAL_PREGENERATOR
+from app.utils.response_cache import LISTINGS_CACHE
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_metrics():
+    """
+    Live pool state, checkout wait times, per-statement timings and recent slow
+    queries of both database engines, plus listing cache, embedding batching, feed fetcher
+    and proposal pre-generation stats, and per-node timings of the proposal pipeline.
+    """
+    embedding_service = get_embedding_service_if_ready()
+    return {
+        "database": database_metrics(),
+        "listings_cache": LISTINGS_CACHE.metrics(),
+        "embeddings": embedding_service.metrics() if embedding_service else None,
+        "feed": get_feed_fetcher().metrics(),
+        "proposal_pregeneration": PROPOSAL_PREGENERATOR.metrics(),
+        "proposal_pipeline": PROPOSAL_NODE_TIMINGS.snapshot(),
+    }
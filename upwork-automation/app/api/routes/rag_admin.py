@@ -0,0 +1,34 @@
+import logging
+from fastapi import APIRouter, BackgroundTasks
+
+from app.utils.embeddings import get_embedding_service_if_ready
+from app.utils.rag_index import RAG_WATCHER
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/reload")
+async def reload_rag_indexes(background_tasks: BackgroundTasks, force: bool = False):
+    """
+    Rebuild the RAG indexes in the background if their markdown sources changed
+    (or unconditionally with force=true). Live queries keep using the current index
+    until the rebuilt one is swapped in.
+    """
+    if not RAG_WATCHER.managers:
+        return {"status": "unavailable", "message": "No RAG indexes are initialized."}
+    background_tasks.add_task(RAG_WATCHER.reload_all, force)
+    logger.info(f"Scheduled RAG index reload (force={force}).")
+    return {"status": "scheduled", "indexes": [manager.name for manager in RAG_WATCHER.managers]}
+
+
+@router.get("/status")
+async def get_rag_status():
+    """Report chunk counts and source hashes of the live RAG indexes and embedding batching stats."""
+    embedding_service = get_embedding_service_if_ready()
+    return {
+        "watch_interval_seconds": RAG_WATCHER.interval_seconds,
+        "indexes": [manager.status() for manager in RAG_WATCHER.managers],
+        "embeddings": embedding_service.metrics() if embedding_service else None,
+    }
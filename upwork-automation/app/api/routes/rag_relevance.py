@@ -3,17 +3,19 @@ import json
 import time
 import asyncio
 import logging
+import threading
 import random
 from typing import List, Dict, Any, Tuple, Optional, Literal
 from enum import Enum
 import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import Field, BaseModel
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker, Session, joinedload
 from .agents.structures import JobData, MatchScore, CompanyProfile, RelevanceCategory # Ensure this path is correct
 from sqlalchemy.orm import Session
-from app.db.database import get_db # Ensure this path is correct
+from app.db.database import AsyncSessionLocal, get_async_db
 from app.models.jobs import Job, JobRelevance # Ensure this path is correct
 from app.schemas.jobs import JobResponse as JobSchema # Ensure this path is correct
 import re
@@ -23,6 +25,17 @@ import faiss
 import numpy as np
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pydantic import BaseModel
+from app.utils.bm25 import BM25Index, reciprocal_rank_fusion
+from app.core.config import settings
+from app.utils.embeddings import EmbeddingService, get_embedding_service
+from app.utils.job_embeddings import get_job_embedding_store
+from app.utils.proposal_pregeneration import PREGENERATE_CATEGORY, PROPOSAL_PREGENERATOR
+from app.utils.response_cache import invalidate_job_listings
+from app.utils.relevance_rollup import rollup_change_statements, rollup_contribution
+from app.utils.rag_index import (
+    RAGIndexSnapshot, EMPTY_SNAPSHOT, RAG_WATCHER, atomic_write_index, atomic_write_json, embed_with_reuse,
+    SnapshotReloadMixin, build_faiss_index, create_faiss_index, index_config_key
+)
 
 class ToggleRequest(BaseModel):
     enabled: bool
@@ -45,13 +58,19 @@ RAG_DATA_DIR = os.path.join(BASE_DIR, "rag_data")
 FAISS_INDEX_FILE_NAME = "vector_store.faiss"
 FAISS_METADATA_FILE_NAME = "metadata.json"
 FILE_HASHES_FILE_NAME = "file_hashes.json"
-OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
-EMBEDDING_DIM = 1536
-NUM_RETRIEVED_CHUNKS = 9
+EMBEDDING_DIM = settings.EMBEDDING_DIMENSIONS
+# Hybrid (dense + BM25) retrieval surfaces exact tech-name matches that pure
+# dense search missed, so fewer chunks give the same recall as the old 9.
+NUM_RETRIEVED_CHUNKS = 6
+# Number of candidates each retriever contributes before Reciprocal Rank Fusion.
+HYBRID_CANDIDATE_POOL = 30
+RRF_K = 60
 
 # Global variable to store the ISO formatted string of the publishedDateTime
 # of the most recent job processed by the cron.
 LAST_CRON_PROCESSED_PUBLISHED_DATETIME_ISO: Optional[str] = None
+# Jobs flagged for re-scoring (changed title/description on re-ingest) taken per cron run.
+RESCORE_QUEUE_LIMIT = 30
 
 
 def is_within_schedule() -> bool:
@@ -101,14 +120,16 @@ def load_markdown_content(file_path: str) -> str:
         logger.error(f"Error reading markdown file {file_path}: {str(e)}")
         return ""
 
-class FAISSIndexManager:
-    def __init__(self, openai_client: openai.OpenAI,
+class FAISSIndexManager(SnapshotReloadMixin):
+    name = "relevance"
+
+    def __init__(self, embedding_service: EmbeddingService,
                  profile_md_path: str, details_md_path: str,
                  rag_data_dir: str = RAG_DATA_DIR,
                  index_file_name: str = FAISS_INDEX_FILE_NAME,
                  metadata_file_name: str = FAISS_METADATA_FILE_NAME,
                  hashes_file_name: str = FILE_HASHES_FILE_NAME):
-        self.openai_client = openai_client
+        self.embedding_service = embedding_service
         self.profile_md_path = profile_md_path
         self.details_md_path = details_md_path
 
@@ -117,11 +138,25 @@ class FAISSIndexManager:
         self.metadata_path = os.path.join(rag_data_dir, metadata_file_name)
         self.hashes_path = os.path.join(rag_data_dir, hashes_file_name)
 
-        self.index: Optional[faiss.Index] = None
-        self.chunks_metadata: List[Dict[str, str]] = []
+        # All index state lives in one immutable snapshot that is swapped
+        # atomically on reload; see RAGIndexSnapshot.
+        self._snapshot: RAGIndexSnapshot = EMPTY_SNAPSHOT
+        self._reload_lock = threading.Lock()
 
         self._load_or_build_index()
 
+    @property
+    def index(self) -> Optional[faiss.Index]:
+        return self._snapshot.index
+
+    @property
+    def chunks_metadata(self) -> List[Dict[str, str]]:
+        return self._snapshot.chunks_metadata
+
+    @property
+    def bm25(self) -> Optional[BM25Index]:
+        return self._snapshot.bm25
+
     def _get_file_hash(self, file_path: str) -> Optional[str]:
         if not os.path.exists(file_path):
             return None
@@ -142,8 +177,7 @@ class FAISSIndexManager:
         return {}
 
     def _save_current_hashes(self, current_hashes: Dict[str, str]):
-        with open(self.hashes_path, 'w') as f:
-            json.dump(current_hashes, f)
+        atomic_write_json(self.hashes_path, current_hashes)
 
     def _check_if_rebuild_needed(self) -> bool:
         if not os.path.exists(self.index_path) or \
@@ -153,16 +187,17 @@ class FAISSIndexManager:
             return True
 
         stored_hashes = self._load_stored_hashes()
-        current_hashes = {
-            "profile": self._get_file_hash(self.profile_md_path),
-            "details": self._get_file_hash(self.details_md_path)
-        }
+        current_hashes = self._current_hashes()
 
         if stored_hashes.get("profile") != current_hashes["profile"] or \
            stored_hashes.get("details") != current_hashes["details"]:
             logger.info("Markdown file content has changed. Rebuilding index.")
             return True
 
+        if stored_hashes.get("index_config") != current_hashes["index_config"]:
+            logger.info(f"Embedding dimensions/storage changed to {current_hashes['index_config']}. Rebuilding index.")
+            return True
+
         if current_hashes["profile"] is None and stored_hashes.get("profile") is not None:
             logger.info(f"{self.profile_md_path} removed. Rebuilding index.")
             return True
@@ -229,22 +264,33 @@ class FAISSIndexManager:
                 })
         return chunks
 
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embed texts with the same model/dimensions as the index, e.g. to query it by vector."""
+        return self._get_embeddings(texts)
+
     def _get_embeddings(self, texts: List[str]) -> np.ndarray:
-        embeddings_list = []
+        # Goes through the shared coalescing service so concurrent analyses share API calls.
         try:
-            response = self.openai_client.embeddings.create(
-                input=texts,
-                model=OPENAI_EMBEDDING_MODEL
-            )
-            embeddings_list = [item.embedding for item in response.data]
+            return self.embedding_service.embed(texts)
         except Exception as e:
             logger.error(f"Error getting embeddings from OpenAI: {e}")
             raise
-        return np.array(embeddings_list).astype('float32')
 
+    def _current_hashes(self) -> Dict[str, Optional[str]]:
+        return {
+            "profile": self._get_file_hash(self.profile_md_path),
+            "details": self._get_file_hash(self.details_md_path),
+            "index_config": index_config_key()
+        }
 
-    def _build_index(self):
+    def _build_index(self, previous: RAGIndexSnapshot = EMPTY_SNAPSHOT) -> Optional[RAGIndexSnapshot]:
+        """
+        Build a new snapshot from the markdown sources without touching the live one.
+        Embeddings of chunks that also exist in `previous` are reused. Returns None
+        if the build failed, in which case the caller keeps serving the old snapshot.
+        """
         logger.info("Building new FAISS index...")
+        current_hashes = self._current_hashes()
         all_raw_chunks: List[Dict[str, str]] = []
 
         company_profile_content = load_markdown_content(self.profile_md_path)
@@ -262,90 +308,103 @@ class FAISSIndexManager:
 
         if not all_raw_chunks:
             logger.error("No content to index. FAISS index will be empty.")
-            self.chunks_metadata = []
-            self.index = None
-            # Create an empty index file if one doesn't exist to prevent errors on load
-            if not os.path.exists(self.index_path):
-                empty_index = faiss.IndexFlatL2(EMBEDDING_DIM)
-                faiss.write_index(empty_index, self.index_path)
-            with open(self.metadata_path, 'w') as f: json.dump([], f)
-            self._save_current_hashes({
-                "profile": self._get_file_hash(self.profile_md_path),
-                "details": self._get_file_hash(self.details_md_path)
-            })
-            return
+            empty_index = create_faiss_index(EMBEDDING_DIM)
+            atomic_write_index(empty_index, self.index_path)
+            atomic_write_json(self.metadata_path, [])
+            self._save_current_hashes(current_hashes)
+            return RAGIndexSnapshot(index=empty_index, chunks_metadata=[], bm25=None)
 
-        self.chunks_metadata = all_raw_chunks
-        chunk_texts = [chunk["text"] for chunk in self.chunks_metadata]
+        chunk_texts = [chunk["text"] for chunk in all_raw_chunks]
 
         try:
-            embeddings_np = self._get_embeddings(chunk_texts)
+            embeddings_np = embed_with_reuse(previous, "text", chunk_texts, self._get_embeddings)
         except Exception as e:
             logger.error(f"Failed to generate embeddings during index build: {e}")
-            if os.path.exists(self.index_path): os.remove(self.index_path)
-            if os.path.exists(self.metadata_path): os.remove(self.metadata_path)
-            if os.path.exists(self.hashes_path): os.remove(self.hashes_path)
-            self.index = None
-            return
-
-
-        self.index = faiss.IndexFlatL2(EMBEDDING_DIM)
-        self.index.add(embeddings_np)
+            return None
 
-        faiss.write_index(self.index, self.index_path)
-        with open(self.metadata_path, 'w') as f:
-            json.dump(self.chunks_metadata, f)
+        index = build_faiss_index(embeddings_np, EMBEDDING_DIM)
 
-        current_hashes = {
-            "profile": self._get_file_hash(self.profile_md_path),
-            "details": self._get_file_hash(self.details_md_path)
-        }
+        # Files are replaced one by one; the hashes file goes last so a crash
+        # in between leaves stale hashes and triggers a rebuild on next check.
+        atomic_write_index(index, self.index_path)
+        atomic_write_json(self.metadata_path, all_raw_chunks)
         self._save_current_hashes(current_hashes)
-        logger.info(f"FAISS index built and saved with {len(self.chunks_metadata)} chunks.")
+        logger.info(f"FAISS index built and saved with {len(all_raw_chunks)} chunks.")
+        return RAGIndexSnapshot(index=index, chunks_metadata=all_raw_chunks, bm25=BM25Index(chunk_texts))
 
-    def _load_index(self) -> bool:
+    def _load_index(self) -> Optional[RAGIndexSnapshot]:
         try:
-            self.index = faiss.read_index(self.index_path)
+            index = faiss.read_index(self.index_path)
             with open(self.metadata_path, 'r') as f:
-                self.chunks_metadata = json.load(f)
-            logger.info(f"FAISS index and metadata loaded successfully with {len(self.chunks_metadata)} chunks.")
-            return True
+                chunks_metadata = json.load(f)
+            # The keyword index is cheap to rebuild from the stored chunk texts,
+            # so it is not persisted alongside the FAISS file.
+            bm25 = BM25Index([chunk["text"] for chunk in chunks_metadata])
+            logger.info(f"FAISS index and metadata loaded successfully with {len(chunks_metadata)} chunks.")
+            return RAGIndexSnapshot(index=index, chunks_metadata=chunks_metadata, bm25=bm25)
         except Exception as e:
             logger.error(f"Failed to load FAISS index or metadata: {e}")
-            return False
+            return None
 
     def _load_or_build_index(self):
+        snapshot = None
         if self._check_if_rebuild_needed():
-            self._build_index()
-        elif not self._load_index():
-            logger.warning("Failed to load existing index. Attempting rebuild.")
-            self._build_index()
+            snapshot = self._build_index()
+        else:
+            snapshot = self._load_index()
+            if snapshot is None:
+                logger.warning("Failed to load existing index. Attempting rebuild.")
+                snapshot = self._build_index()
 
-        if self.index is None and not self.chunks_metadata :
+        if snapshot is None:
              logger.warning("Index is not available and no content was found to build it. RAG queries will return empty.")
              # Ensure a dummy index exists if building failed or no data was found
-             self.index = faiss.IndexFlatL2(EMBEDDING_DIM)
-             self.chunks_metadata = []
-
-
-    def query(self, query_text: str, k: int = NUM_RETRIEVED_CHUNKS) -> List[Dict[str, Any]]:
-        if not self.index or self.index.ntotal == 0 or not self.chunks_metadata:
+             snapshot = RAGIndexSnapshot(index=create_faiss_index(EMBEDDING_DIM), chunks_metadata=[])
+        self._snapshot = snapshot
+
+    def query(self, query_text: str, k: int = NUM_RETRIEVED_CHUNKS,
+              query_embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Hybrid retrieval: dense FAISS search and BM25 keyword search each return a
+        candidate list, which are fused with Reciprocal Rank Fusion into the top k.
+        Pass query_embedding (shape (1, dim)) to skip embedding query_text again.
+        """
+        snapshot = self._snapshot
+        index, chunks_metadata = snapshot.index, snapshot.chunks_metadata
+        if not index or index.ntotal == 0 or not chunks_metadata:
             logger.warning("FAISS index is not initialized or empty. Cannot perform query.")
             return []
         try:
-            query_embedding = self._get_embeddings([query_text])
-            distances, indices = self.index.search(query_embedding, k=min(k, self.index.ntotal))
+            if query_embedding is None:
+                query_embedding = self._get_embeddings([query_text])
+            pool_size = min(max(k, HYBRID_CANDIDATE_POOL), index.ntotal)
+            distances, indices = index.search(query_embedding, k=pool_size)
 
-            results = []
+            dense_distances: Dict[int, float] = {}
+            dense_ranking: List[int] = []
             for i in range(len(indices[0])):
-                idx = indices[0][i]
-                if 0 <= idx < len(self.chunks_metadata):
-                    results.append({
-                        "text": self.chunks_metadata[idx]["text"],
-                        "source": self.chunks_metadata[idx]["source"],
-                        "id": self.chunks_metadata[idx]["id"],
-                        "distance": float(distances[0][i])
-                    })
+                idx = int(indices[0][i])
+                if 0 <= idx < len(chunks_metadata):
+                    dense_ranking.append(idx)
+                    dense_distances[idx] = float(distances[0][i])
+
+            bm25_scores: Dict[int, float] = {}
+            if snapshot.bm25 is not None:
+                bm25_scores = dict(snapshot.bm25.search(query_text, k=pool_size))
+            keyword_ranking = [idx for idx in bm25_scores if idx < len(chunks_metadata)]
+
+            fused = reciprocal_rank_fusion([dense_ranking, keyword_ranking], k=k, rrf_k=RRF_K)
+
+            results = []
+            for idx, rrf_score in fused:
+                results.append({
+                    "text": chunks_metadata[idx]["text"],
+                    "source": chunks_metadata[idx]["source"],
+                    "id": chunks_metadata[idx]["id"],
+                    "distance": dense_distances.get(idx),
+                    "bm25_score": bm25_scores.get(idx, 0.0),
+                    "rrf_score": rrf_score
+                })
             return results
         except Exception as e:
             logger.error(f"Error during FAISS query: {e}")
@@ -359,13 +418,13 @@ try:
     logger.info(f"Company Details MD Path: {COMPANY_DETAILS_MD_PATH}")
 
     os.makedirs(RAG_DATA_DIR, exist_ok=True)
-    _openai_client_for_rag = get_openai_client()
     GLOBAL_FAISS_MANAGER = FAISSIndexManager(
-        openai_client=_openai_client_for_rag,
+        embedding_service=get_embedding_service(),
         profile_md_path=COMPANY_PROFILE_MD_PATH,
         details_md_path=COMPANY_DETAILS_MD_PATH
     )
     logger.info("FAISSIndexManager initialized successfully.")
+    RAG_WATCHER.register(GLOBAL_FAISS_MANAGER)
 except ValueError as ve:
     logger.critical(f"CRITICAL: Failed to initialize FAISSIndexManager due to missing OpenAI key: {ve}")
     GLOBAL_FAISS_MANAGER = None
@@ -374,11 +433,11 @@ except Exception as e:
     GLOBAL_FAISS_MANAGER = None
 
 
-def load_job_by_id(job_id: str, db: Session) -> Optional[JobData]:
+async def load_job_by_id(job_id: str, db: AsyncSession) -> Optional[JobData]:
     """Load a single job from the database by ID and map to JobData Pydantic model."""
     try:
         # Query using the primary key 'id' (which is Text type in Job model)
-        job = db.query(Job).filter(Job.id == job_id).first()
+        job = (await db.execute(select(Job).where(Job.id == job_id))).scalars().first()
         if not job:
             logger.warning(f"Job with ID {job_id} not found in database.")
             return None
@@ -423,7 +482,7 @@ def load_job_by_id(job_id: str, db: Session) -> Optional[JobData]:
         logger.error(f"Error loading job {job_id} from database: {e}", exc_info=True)
         return None
 
-def update_database_for_single_job(db: Session, match_data: MatchScore):
+async def update_database_for_single_job(db: AsyncSession, match_data: MatchScore):
     """Update the job record in the database with the relevance score and reasoning for a single job."""
     try:
         match_score_dict = match_data.model_dump()
@@ -432,13 +491,15 @@ def update_database_for_single_job(db: Session, match_data: MatchScore):
     logger.debug(f"Attempting DB update for job {match_data.job_id} with data: {match_score_dict}")
     try:
         # Job.id is Text, match_data.job_id is str, direct comparison is fine.
-        job = db.query(Job).options(joinedload(Job.relevance)).filter(Job.id == match_data.job_id).first()
+        result = await db.execute(select(Job).options(joinedload(Job.relevance)).where(Job.id == match_data.job_id))
+        job = result.scalars().first()
 
         if not job:
             logger.error(f"Job with ID {match_data.job_id} not found in database during update.")
             return
 
         relevance_obj = job.relevance
+        rollup_before = rollup_contribution(relevance_obj)
 
         if relevance_obj:
             logger.debug(f"Updating existing JobRelevance for job {job.id}")
@@ -451,6 +512,9 @@ def update_database_for_single_job(db: Session, match_data: MatchScore):
             relevance_obj.location_match = match_data.location_match
             relevance_obj.closest_profile_name = match_data.closest_profile_name
             relevance_obj.tags = json.dumps(match_data.tags) if match_data.tags is not None else None # Store list as JSON string
+            relevance_obj.published_at = job.publishedDateTime
+            relevance_obj.client_country = job.client_country
+            relevance_obj.subcategory_label = job.subcategory_label
         else:
             logger.debug(f"Creating new JobRelevance for job {job.id}")
             relevance_obj = JobRelevance(
@@ -463,17 +527,29 @@ def update_database_for_single_job(db: Session, match_data: MatchScore):
                 project_match=match_data.project_match,
                 location_match=match_data.location_match,
                 closest_profile_name=match_data.closest_profile_name,
-                tags=json.dumps(match_data.tags) if match_data.tags is not None else None # Store list as JSON string
+                tags=json.dumps(match_data.tags) if match_data.tags is not None else None, # Store list as JSON string
+                published_at=job.publishedDateTime,
+                client_country=job.client_country, # rollup bucket, see JobRelevance
+                subcategory_label=job.subcategory_label
             )
             job.relevance = relevance_obj
-
-        db.commit()
+        if job.rescore_requested_at is not None:
+            job.rescore_requested_at = None # scored on the current title/description
+
+        # Keep the analytics rollup in step within the same transaction.
+        for rollup_stmt in rollup_change_statements(db.get_bind().dialect.name, rollup_before,
+                                                    rollup_contribution(relevance_obj)):
+            await db.execute(rollup_stmt)
+        await db.commit()
+        invalidate_job_listings()
+        if relevance_obj.category == PREGENERATE_CATEGORY:
+            PROPOSAL_PREGENERATOR.notify()
         logger.debug(f"Successfully committed update for job {job.id}")
 
     except Exception as e:
         logger.error(f"Database ORM error during update for job {match_data.job_id}: {e}", exc_info=True)
         logger.info(f"Rolling back transaction for job {match_data.job_id} due to error.")
-        db.rollback()
+        await db.rollback()
         raise
 
 def analyze_jobs_in_batch(jobs: List[JobData], openai_client: openai.OpenAI) -> List[Dict[str, Any]]:
@@ -540,10 +616,23 @@ def analyze_jobs_in_batch(jobs: List[JobData], openai_client: openai.OpenAI) ->
     STRICTLY RETURN ONLY THE JSON ARRAY (LIST) OF OBJECTS WITH NO OTHER TEXT.
     """
 
+    # Embed all jobs of the batch in one call; the vectors serve the RAG lookups
+    # below and are kept in the job embedding store for similar-job search.
+    job_query_texts = [f"{job_data_item.job_title}\n{job_data_item.job_description}" for job_data_item in jobs]
+    job_vectors: Optional[np.ndarray] = None
+    try:
+        job_vectors = GLOBAL_FAISS_MANAGER.embed_texts(job_query_texts)
+        get_job_embedding_store().upsert([job_data_item.job_id for job_data_item in jobs], job_vectors)
+    except Exception as e:
+        logger.error(f"Failed to embed or store job vectors for batch: {e}", exc_info=True)
+
     human_prompt_parts = ["Based on the following information, analyze the jobs:\n"]
     for i, job_data_item in enumerate(jobs): # Renamed 'job' to 'job_data_item' to avoid confusion with SQLAlchemy Job model
-        job_query_text = f"{job_data_item.job_title}\n{job_data_item.job_description}"
-        retrieved_chunks = GLOBAL_FAISS_MANAGER.query(job_query_text, k=NUM_RETRIEVED_CHUNKS)
+        job_query_text = job_query_texts[i]
+        retrieved_chunks = GLOBAL_FAISS_MANAGER.query(
+            job_query_text, k=NUM_RETRIEVED_CHUNKS,
+            query_embedding=job_vectors[i:i + 1] if job_vectors is not None else None
+        )
 
         context_for_job_str = f"--- Retrieved Context for Job {job_data_item.job_id} ---\n"
         if retrieved_chunks:
@@ -633,7 +722,7 @@ def analyze_jobs_in_batch(jobs: List[JobData], openai_client: openai.OpenAI) ->
 
 
 @router.post("/analyze_batch_rag")
-async def analyze_job_batch_rag(job_ids: List[str], db: Session = Depends(get_db)):
+async def analyze_job_batch_rag(job_ids: List[str], db: AsyncSession = Depends(get_async_db)):
     """Analyze a batch of jobs by their IDs using RAG and return relevance scores."""
 
     if not is_relevance_check_enabled():
@@ -656,7 +745,7 @@ async def analyze_job_batch_rag(job_ids: List[str], db: Session = Depends(get_db
 
         jobs_data_pydantic: List[JobData] = [] # Changed name to avoid confusion with SQLAlchemy Job
         for job_id_str in job_ids:
-            job_pydantic = load_job_by_id(str(job_id_str), db) # load_job_by_id now returns JobData or None
+            job_pydantic = await load_job_by_id(str(job_id_str), db) # load_job_by_id now returns JobData or None
             if job_pydantic:
                 jobs_data_pydantic.append(job_pydantic)
             else:
@@ -674,7 +763,8 @@ async def analyze_job_batch_rag(job_ids: List[str], db: Session = Depends(get_db
                  results_for_client.append({"id": j_id, "status": "Load Failed", "detail": "Job ID not found in database or failed Pydantic model creation."})
             return results_for_client
 
-        batch_analysis_results = analyze_jobs_in_batch(jobs_data_pydantic, llm_openai_client)
+        # The OpenAI calls are blocking; keep them off the event loop.
+        batch_analysis_results = await asyncio.to_thread(analyze_jobs_in_batch, jobs_data_pydantic, llm_openai_client)
 
         processed_results = []
         successful_analyses = 0
@@ -723,7 +813,7 @@ async def analyze_job_batch_rag(job_ids: List[str], db: Session = Depends(get_db
                     tags=analysis_result_item.get("tags")
                 )
 
-                update_database_for_single_job(db, match_score)
+                await update_database_for_single_job(db, match_score)
                 analysis_result_item["status"] = "Success"
                 processed_results.append(analysis_result_item)
                 successful_analyses +=1
@@ -778,8 +868,22 @@ async def get_relevance_status():
         logger.error(f"Error getting relevance status: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+async def load_rescore_queue(db: AsyncSession, limit: int = RESCORE_QUEUE_LIMIT) -> List[str]:
+    """Ids of jobs whose title or description changed since they were scored, oldest request first."""
+    result = await db.execute(
+        select(Job.id).where(Job.rescore_requested_at.is_not(None)).order_by(Job.rescore_requested_at).limit(limit)
+    )
+    return [str(job_id) for job_id in result.scalars()]
+
+
+async def analyze_job_batch_in_own_session(job_ids: List[str]):
+    """Run one cron batch with its own session; an AsyncSession must not be shared by concurrent tasks."""
+    async with AsyncSessionLocal() as session:
+        return await analyze_job_batch_rag(job_ids=job_ids, db=session)
+
+
 @router.post("/process_new_jobs_cron")
-async def process_new_jobs_cron(db: Session = Depends(get_db)):
+async def process_new_jobs_cron(db: AsyncSession = Depends(get_async_db)):
     """
     Cron job endpoint to fetch latest jobs by publishedDateTime,
     identify new ones, batch them, and send for relevance analysis IN PARALLEL.
@@ -793,7 +897,9 @@ async def process_new_jobs_cron(db: Session = Depends(get_db)):
 
     try:
         try:
-            latest_jobs_from_db = db.query(Job).order_by(Job.publishedDateTime.desc()).limit(30).all()
+            latest_jobs_from_db = (await db.execute(
+                select(Job.id, Job.publishedDateTime).order_by(Job.publishedDateTime.desc()).limit(30)
+            )).all()
         except AttributeError:
             logger.error("Job model does not have 'publishedDateTime' attribute. Cannot process cron.")
             raise HTTPException(status_code=500, detail="Server configuration error: Job model missing 'publishedDateTime'.")
@@ -842,27 +948,30 @@ async def process_new_jobs_cron(db: Session = Depends(get_db)):
                 else:
                     break
 
+        rescore_job_ids = [job_id for job_id in await load_rescore_queue(db) if job_id not in new_job_ids_to_process]
+        if rescore_job_ids:
+            logger.info(f"Found {len(rescore_job_ids)} changed job(s) to re-score. IDs: {rescore_job_ids}")
+
         if not new_job_ids_to_process:
             logger.info("No new jobs found to process based on publishedDateTime.")
             if LAST_CRON_PROCESSED_PUBLISHED_DATETIME_ISO is None and latest_jobs_from_db and latest_jobs_from_db[0].publishedDateTime:
                 LAST_CRON_PROCESSED_PUBLISHED_DATETIME_ISO = latest_jobs_from_db[0].publishedDateTime.isoformat()
                 logger.info(f"Initial cron run with existing DB jobs. Set baseline datetime to: {LAST_CRON_PROCESSED_PUBLISHED_DATETIME_ISO}")
-            return {"status": "success", "message": "No new jobs to process."}
-
-        logger.info(f"Found {len(new_job_ids_to_process)} new job(s) to process. IDs: {new_job_ids_to_process}")
+            if not rescore_job_ids:
+                return {"status": "success", "message": "No new jobs to process."}
+        else:
+            logger.info(f"Found {len(new_job_ids_to_process)} new job(s) to process. IDs: {new_job_ids_to_process}")
+        job_ids_to_process = new_job_ids_to_process + rescore_job_ids
 
         batch_size = 3
         tasks = []
         batched_job_ids_for_reporting = [] # To keep track of which jobs were in which task
 
-        for i in range(0, len(new_job_ids_to_process), batch_size):
-            batch_job_ids = new_job_ids_to_process[i:i + batch_size]
+        for i in range(0, len(job_ids_to_process), batch_size):
+            batch_job_ids = job_ids_to_process[i:i + batch_size]
             batched_job_ids_for_reporting.append(batch_job_ids)
-            # Create a task for each batch.
-            # WARNING: All these tasks will share the same 'db' session from Depends(get_db)
-            # This can lead to issues if not handled carefully within analyze_job_batch_rag
-            # or if the DB operations are complex/conflicting.
-            tasks.append(analyze_job_batch_rag(job_ids=batch_job_ids, db=db))
+            # Create a task for each batch, each with its own session.
+            tasks.append(analyze_job_batch_in_own_session(batch_job_ids))
 
         analysis_outcomes = []
         total_jobs_submitted_for_analysis = 0
@@ -892,7 +1001,7 @@ async def process_new_jobs_cron(db: Session = Depends(get_db)):
 
         return {
             "status": "success",
-            "message": f"Identified {len(new_job_ids_to_process)} new job(s). Created {len(tasks)} batch(es) for parallel processing. Submitted {total_jobs_submitted_for_analysis} job(s) for analysis.",
+            "message": f"Identified {len(new_job_ids_to_process)} new job(s) and {len(rescore_job_ids)} changed job(s) to re-score. Created {len(tasks)} batch(es) for parallel processing. Submitted {total_jobs_submitted_for_analysis} job(s) for analysis.",
             "newest_job_datetime_processed_this_run": newest_job_datetime_in_this_run.isoformat() if newest_job_datetime_in_this_run else None,
             "last_processed_datetime_for_next_run": LAST_CRON_PROCESSED_PUBLISHED_DATETIME_ISO,
             "batch_details": analysis_outcomes
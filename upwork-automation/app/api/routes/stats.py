@@ -0,0 +1,87 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routes.job_listings import RELEVANCE_CATEGORIES
+from app.db.database import get_async_db
+from app.models.jobs import RelevanceRollup
+from app.schemas.jobs import RelevanceStatsResponse, RelevanceStatsRow
+from app.utils.relevance_rollup import UNKNOWN, rollup_rebuild_statements
+
+router = APIRouter()
+
+# group_by name -> rollup column
+STATS_DIMENSIONS = {
+    "day": RelevanceRollup.day,
+    "category": RelevanceRollup.category,
+    "country": RelevanceRollup.client_country,
+    "subcategory": RelevanceRollup.subcategory_label,
+}
+
+
+@router.get("/relevance", response_model=RelevanceStatsResponse)
+async def relevance_stats(
+    group_by: List[str] = Query(["category"], description="Any of day, category, country, subcategory"),
+    category: List[str] = Query([], description="Only these relevance categories"),
+    country: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Scored job counts and average score, grouped by published day, category,
+    client country and/or subcategory. Served from relevance_daily_rollup, so the
+    cost depends on the number of groups, not on the size of the jobs table.
+
+    Examples: Strong jobs per day is group_by=day&category=strong; average score
+    per subcategory is group_by=subcategory.
+    """
+    if not group_by or any(name not in STATS_DIMENSIONS for name in group_by):
+        raise HTTPException(status_code=400, detail=f"group_by must be one or more of {', '.join(STATS_DIMENSIONS)}.")
+    if any(value.lower() not in RELEVANCE_CATEGORIES for value in category):
+        raise HTTPException(status_code=400, detail="Invalid category value. Must be strong, medium, low, or irrelevant.")
+    dimensions = list(dict.fromkeys(group_by))
+    columns = [STATS_DIMENSIONS[name] for name in dimensions]
+
+    jobs = func.sum(RelevanceRollup.job_count)
+    stmt = (
+        select(*columns, jobs.label("jobs"), func.sum(RelevanceRollup.score_sum).label("score_sum"))
+        .group_by(*columns)
+        # Buckets emptied by re-scoring keep a zero row; leave them out.
+        .having(jobs > 0)
+        .order_by(*columns)
+    )
+    if category:
+        stmt = stmt.where(RelevanceRollup.category.in_({value.capitalize() for value in category}))
+    if country:
+        stmt = stmt.where(RelevanceRollup.client_country == country)
+    if date_from:
+        stmt = stmt.where(RelevanceRollup.day >= date_from)
+    if date_to:
+        stmt = stmt.where(RelevanceRollup.day <= date_to)
+
+    rows = []
+    for row in (await db.execute(stmt)).mappings():
+        groups = {name: row[column.name] for name, column in zip(dimensions, columns)}
+        for name in ("country", "subcategory"):
+            if groups.get(name) == UNKNOWN:
+                groups[name] = None
+        rows.append(RelevanceStatsRow(**groups, jobs=row["jobs"], avg_score=row["score_sum"] / row["jobs"]))
+    return RelevanceStatsResponse(group_by=dimensions, total_jobs=sum(row.jobs for row in rows), rows=rows)
+
+
+@router.post("/relevance/rebuild")
+async def rebuild_relevance_stats(db: AsyncSession = Depends(get_async_db)):
+    """
+    Recompute relevance_daily_rollup from job_relevance in one transaction. Needed
+    once after the table is created, and to repair drift if jobs were re-scored
+    outside the API (e.g. by hand in SQL).
+    """
+    for stmt in rollup_rebuild_statements():
+        await db.execute(stmt)
+    await db.commit()
+    total = (await db.execute(select(func.coalesce(func.sum(RelevanceRollup.job_count), 0)))).scalar_one()
+    return {"status": "rebuilt", "jobs": total}
@@ -17,6 +17,55 @@ class Settings(BaseSettings):
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
     
     RSS_FEED_URL: Optional[str] = ""
+    # Feed items parsed, converted and upserted per transaction by /fetch-and-save/.
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+    FEED_TIMEOUT_SECONDS: float = float(os.getenv("FEED_TIMEOUT_SECONDS", "60"))
+    # Feed pages requested in parallel (and keep-alive connections to the feed host).
+    FEED_FETCH_CONCURRENCY: int = int(os.getenv("FEED_FETCH_CONCURRENCY", "4"))
+    # Upper bound of pages per /fetch-and-save/ call; it stops earlier at the first already seen job.
+    FEED_MAX_PAGES: int = int(os.getenv("FEED_MAX_PAGES", "10"))
+    # Most recent job ids kept in memory to detect where the new part of the feed ends.
+    FEED_SEEN_IDS: int = int(os.getenv("FEED_SEEN_IDS", "20000"))
+
+    # Seconds between checks of the RAG markdown sources for changes; 0 disables the watcher.
+    RAG_WATCH_INTERVAL_SECONDS: float = float(os.getenv("RAG_WATCH_INTERVAL_SECONDS", "60"))
+    # Background proposal generation for newly scored Strong jobs, this many at a time; 0 turns it off.
+    PROPOSAL_PREGENERATE_CONCURRENCY: int = int(os.getenv("PROPOSAL_PREGENERATE_CONCURRENCY", "2"))
+    # Polling interval of the pre-generation worker; the relevance cron also wakes it up.
+    PROPOSAL_PREGENERATE_INTERVAL_SECONDS: float = float(os.getenv("PROPOSAL_PREGENERATE_INTERVAL_SECONDS", "300"))
+    # Only jobs scored Strong this recently get a proposal pre-generated.
+    PROPOSAL_PREGENERATE_LOOKBACK_HOURS: float = float(os.getenv("PROPOSAL_PREGENERATE_LOOKBACK_HOURS", "24"))
+
+    # text-embedding-3 models can return shortened vectors; 1536 is the native size.
+    # Changing either value rebuilds the FAISS indexes on next start/reload.
+    # Run evaluate_embeddings.py to measure the recall cost before lowering them.
+    EMBEDDING_DIMENSIONS: int = int(os.getenv("EMBEDDING_DIMENSIONS", "1536"))
+    # Vector storage in FAISS: "float32" (exact), "float16" (2x smaller) or "sq8" (4x smaller).
+    EMBEDDING_INDEX_STORAGE: str = os.getenv("EMBEDDING_INDEX_STORAGE", "float32")
+
+    # Lifetime of cached job listing responses; writers also invalidate them. 0 disables the cache.
+    LISTINGS_CACHE_TTL_SECONDS: float = float(os.getenv("LISTINGS_CACHE_TTL_SECONDS", "30"))
+
+    # Postgres connection pool, per engine (the sync and the async engine each get one).
+    # Keep pool_size + max_overflow per worker process under the server's (or pgbouncer's) client limit.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # Seconds a request waits for a free connection before failing.
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    # Replace connections older than this so idle timeouts on the server/pgbouncer side never hit a live request.
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Set when DATABASE_URL points at pgbouncer in transaction mode: disables asyncpg's prepared statement caches.
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+    # Statements slower than this are logged with their EXPLAIN plan; 0 disables the slow-query log.
+    DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+    DB_EXPLAIN_SLOW_QUERIES: bool = os.getenv("DB_EXPLAIN_SLOW_QUERIES", "true").lower() == "true"
+
+    # jobs/job_relevance are partitioned by month; partitions are created this many months ahead.
+    PARTITION_MONTHS_AHEAD: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    # `manage_partitions.py archive` detaches partitions older than this into ARCHIVE_SCHEMA.
+    PARTITION_ARCHIVE_AFTER_MONTHS: int = int(os.getenv("PARTITION_ARCHIVE_AFTER_MONTHS", "12"))
+    PARTITION_ARCHIVE_SCHEMA: str = os.getenv("PARTITION_ARCHIVE_SCHEMA", "archive")
 
     @property
     def sync_database_url(self) -> str:
@@ -1,13 +1,41 @@
 import os
+from uuid import uuid4
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
+from app.core.config import settings
+from app.db.instrumentation import DatabaseMetrics, instrument_engine, timed_pool_class
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+
+def pool_options(url: str, poolclass) -> dict:
+    """Pool settings from config for Postgres; SQLite keeps SQLAlchemy's default pool."""
+    if make_url(url).get_backend_name() != "postgresql":
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def new_database_metrics(name: str) -> DatabaseMetrics:
+    return DatabaseMetrics(name, settings.DB_SLOW_QUERY_MS, settings.DB_EXPLAIN_SLOW_QUERIES)
+
+
+sync_metrics = new_database_metrics("sync")
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, timed_pool_class(QueuePool, sync_metrics)))
+instrument_engine(engine, sync_metrics)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -17,3 +45,50 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def to_async_url(url: str) -> URL:
+    """Map the sync DATABASE_URL onto the matching asyncio driver (asyncpg for Postgres)."""
+    async_url = make_url(url)
+    driver = ASYNC_DRIVERS.get(async_url.get_backend_name())
+    if driver:
+        async_url = async_url.set(drivername=driver)
+    # asyncpg takes `ssl` instead of libpq's `sslmode`
+    if driver == "postgresql+asyncpg" and "sslmode" in async_url.query:
+        sslmode = async_url.query["sslmode"]
+        async_url = async_url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    # pgbouncer in transaction mode can hand each statement a different server
+    # connection, so named prepared statements must not be cached or reused.
+    if driver == "postgresql+asyncpg" and settings.DB_PGBOUNCER:
+        async_url = async_url.update_query_dict({"prepared_statement_cache_size": "0"})
+    return async_url
+
+
+def async_connect_args(url: URL) -> dict:
+    if url.get_backend_name() == "postgresql" and settings.DB_PGBOUNCER:
+        return {"statement_cache_size": 0, "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"}
+    return {}
+
+
+# Used by the async routes so that queries never block the event loop.
+async_metrics = new_database_metrics("async")
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=async_connect_args(ASYNC_DATABASE_URL),
+    **pool_options(DATABASE_URL, timed_pool_class(AsyncAdaptedQueuePool, async_metrics)),
+)
+instrument_engine(async_engine.sync_engine, async_metrics)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def database_metrics() -> dict:
+    return {metrics.name: metrics.snapshot() for metrics in (sync_metrics, async_metrics)}
@@ -0,0 +1,183 @@
+"""
+Connection pool and SQL statement instrumentation.
+
+Every engine created by app.db.database gets a DatabaseMetrics instance that
+records how long callers waited to check a connection out of the pool and how
+long each statement took. Statements slower than DB_SLOW_QUERY_MS are logged
+together with their EXPLAIN plan (plain EXPLAIN, so the query is not run twice).
+"""
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+logger = logging.getLogger(__name__)
+
+# Distinct statements tracked individually; the rest are folded into one bucket.
+MAX_TRACKED_STATEMENTS = 200
+STATEMENT_KEY_CHARS = 300
+RECENT_CHECKOUTS = 1000
+RECENT_SLOW_QUERIES = 20
+OTHER_STATEMENTS = "<other>"
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_QUERY_START = "_instrumentation_query_start"
+
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class DatabaseMetrics:
+    """Thread-safe counters for one engine; read with snapshot()."""
+    def __init__(self, name: str, slow_query_ms: float = 0.0, explain_slow_queries: bool = True):
+        self.name = name
+        self.slow_query_seconds = slow_query_ms / 1000.0
+        self.explain_slow_queries = explain_slow_queries
+        self.engine: Optional[Engine] = None
+        self._lock = threading.Lock()
+        self._checkout = {"count": 0, "timeouts": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+        self._recent_waits: Deque[float] = deque(maxlen=RECENT_CHECKOUTS)
+        self._statements: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._slow_queries: Deque[Dict[str, Any]] = deque(maxlen=RECENT_SLOW_QUERIES)
+
+    def record_checkout(self, seconds: float):
+        with self._lock:
+            self._checkout["count"] += 1
+            self._checkout["wait_seconds"] += seconds
+            self._checkout["max_wait_seconds"] = max(self._checkout["max_wait_seconds"], seconds)
+            self._recent_waits.append(seconds)
+
+    def record_checkout_timeout(self):
+        with self._lock:
+            self._checkout["timeouts"] += 1
+
+    def record_statement(self, statement: str, seconds: float):
+        key = " ".join(statement.split())[:STATEMENT_KEY_CHARS]
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= MAX_TRACKED_STATEMENTS:
+                    key = OTHER_STATEMENTS
+                    stats = self._statements.get(key)
+                if stats is None:
+                    stats = self._statements[key] = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            stats["count"] += 1
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def record_slow_query(self, statement: str, seconds: float, plan: Optional[str]):
+        with self._lock:
+            self._slow_queries.append({
+                "statement": statement[:2000],
+                "ms": round(seconds * 1000, 1),
+                "plan": plan,
+                "at": time.time(),
+            })
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            checkout: Dict[str, Any] = dict(self._checkout)
+            recent = list(self._recent_waits)
+            statements = sorted(
+                ({"statement": key, **stats} for key, stats in self._statements.items()),
+                key=lambda s: s["total_seconds"], reverse=True,
+            )[:top]
+            slow_queries = list(self._slow_queries)
+        checkout["p50_wait_seconds"] = _percentile(recent, 0.50)
+        checkout["p95_wait_seconds"] = _percentile(recent, 0.95)
+        return {
+            "pool": self.pool_status(),
+            "checkout": checkout,
+            "statements": statements,
+            "slow_queries": slow_queries,
+            "slow_query_ms": self.slow_query_seconds * 1000,
+        }
+
+    def pool_status(self) -> Dict[str, Any]:
+        pool = self.engine.pool if self.engine is not None else None
+        if pool is None or not hasattr(pool, "checkedout"):
+            return {"class": type(pool).__name__ if pool is not None else None}
+        status = {"class": type(pool).__name__, "in_use": pool.checkedout()}
+        if hasattr(pool, "overflow"):
+            status.update(size=pool.size(), idle=pool.checkedin(), overflow=max(pool.overflow(), 0))
+        return status
+
+
+def timed_pool_class(base: Type[Pool], metrics: DatabaseMetrics) -> Type[Pool]:
+    """
+    Subclass of `base` that times every checkout, including the wait for a free
+    connection. The metrics travel on the class so they survive pool.recreate().
+    """
+    class TimedPool(base):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                metrics.record_checkout_timeout()
+                raise
+            metrics.record_checkout(time.perf_counter() - started)
+            return connection
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def explain(connection, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN a statement on its own DBAPI cursor so the caller's pending result is untouched."""
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN " + statement, parameters)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def instrument_engine(engine: Engine, metrics: DatabaseMetrics) -> DatabaseMetrics:
+    """Attach statement timing and the slow-query log to a (sync) engine."""
+    metrics.engine = engine
+    explain_supported = engine.dialect.name == "postgresql"
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_QUERY_START, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_QUERY_START)
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        metrics.record_statement(statement, elapsed)
+        if not metrics.slow_query_seconds or elapsed < metrics.slow_query_seconds:
+            return
+
+        plan = None
+        if metrics.explain_slow_queries and explain_supported and not executemany and EXPLAINABLE.match(statement):
+            try:
+                plan = explain(conn, statement, parameters)
+            except Exception as e:
+                logger.warning(f"[{metrics.name}] Could not EXPLAIN slow query: {e}")
+        metrics.record_slow_query(statement, elapsed, plan)
+        logger.warning(
+            f"[{metrics.name}] Slow query ({elapsed * 1000:.0f} ms): {' '.join(statement.split())[:1000]}"
+            + (f"\n{plan}" if plan else "")
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(context):
+        if context.connection is not None:
+            starts = context.connection.info.get(_QUERY_START)
+            if starts:
+                starts.pop()
+
+    return metrics
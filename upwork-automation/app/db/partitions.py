@@ -0,0 +1,315 @@
+"""
+Monthly range partitions of jobs (on publishedDateTime) and job_relevance (on
+published_at). Postgres only.
+
+Each table has one partition per month plus a DEFAULT partition that catches
+rows outside every month range, so an insert never fails because a partition is
+missing. `ensure_partitions` runs at startup and from `manage_partitions.py`,
+creating partitions a few months ahead; `archive_partitions` detaches old
+months into a separate schema so the hot tables only hold recent history.
+"""
+import re
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, Table, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.models.jobs import Job, JobRelevance
+
+logger = logging.getLogger(__name__)
+
+# jobs first: job_relevance rows take their partition key from it during convert.
+PARTITIONED_TABLES = [
+    (Job.__table__, Job.__table__.c.publishedDateTime),
+    (JobRelevance.__table__, JobRelevance.__table__.c.published_at),
+]
+# job_relevance copies of job columns (the rollup bucket); an old job_relevance
+# without them takes the job's values during convert.
+RELEVANCE_JOB_COLUMNS = ("client_country", "subcategory_label")
+DEFAULT_PARTITION_SUFFIX = "_default"
+LEGACY_TABLE_SUFFIX = "_unpartitioned"
+_RANGE_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    lower: Optional[datetime] = None # None for the default partition
+    upper: Optional[datetime] = None
+
+    @property
+    def is_default(self) -> bool:
+        return self.lower is None
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: Table, month: date) -> str:
+    return f"{table.name}_y{month.year}m{month.month:02d}"
+
+
+def _quote(conn: Connection, name: str) -> str:
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def _month_bounds(month: date) -> dict:
+    return {"lower": datetime.combine(month, datetime.min.time()),
+            "upper": datetime.combine(add_months(month, 1), datetime.min.time())}
+
+
+def table_exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def column_types(conn: Connection, name: str) -> Dict[str, str]:
+    """Column name -> information_schema data_type of an existing table."""
+    rows = conn.execute(text(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :name"
+    ), {"name": name}).all()
+    return {row.column_name: row.data_type for row in rows}
+
+
+def is_partitioned(conn: Connection, table: Table) -> bool:
+    return conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name))"),
+        {"name": table.name},
+    ).scalar()
+
+
+def list_partitions(conn: Connection, table: Table) -> List[Partition]:
+    rows = conn.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:name)
+        ORDER BY c.relname
+    """), {"name": table.name}).all()
+    partitions = []
+    for name, bound in rows:
+        match = _RANGE_BOUND.search(bound or "")
+        if match:
+            partitions.append(Partition(name, datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2))))
+        else:
+            partitions.append(Partition(name))
+    return partitions
+
+
+def _copy_columns(conn: Connection, table: Table) -> str:
+    # Generated columns (jobs.search_vector) are recomputed by Postgres.
+    return ", ".join(_quote(conn, column.name) for column in table.columns if column.computed is None)
+
+
+def _create_month_partition(conn: Connection, table: Table, key: Column, month: date, default_name: str):
+    name, parent, default = _quote(conn, partition_name(table, month)), _quote(conn, table.name), _quote(conn, default_name)
+    bounds = _month_bounds(month)
+    in_range = f"{_quote(conn, key.name)} >= :lower AND {_quote(conn, key.name)} < :upper"
+    # Postgres refuses to add a partition while the default partition holds rows of its
+    # range (e.g. ensure did not run for months), so those rows are moved over first.
+    stray = conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"), bounds).scalar()
+    if stray:
+        conn.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {default}"))
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {parent} "
+        f"FOR VALUES FROM ('{bounds['lower'].isoformat()}') TO ('{bounds['upper'].isoformat()}')"
+    ))
+    if stray:
+        columns = _copy_columns(conn, table)
+        moved = conn.execute(text(f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {default} WHERE {in_range}"), bounds)
+        conn.execute(text(f"DELETE FROM {default} WHERE {in_range}"), bounds)
+        conn.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {default} DEFAULT"))
+        logger.info(f"Moved {moved.rowcount} rows of {month:%Y-%m} from {default_name} into {partition_name(table, month)}.")
+
+
+def ensure_partitions(conn: Connection, first_month: Optional[date] = None,
+                      months_ahead: Optional[int] = None) -> List[str]:
+    """
+    Create the default partition and the monthly partitions from `first_month`
+    (default: the current month) to `months_ahead` months from now. Tables that
+    are not partitioned yet are skipped. Returns the names of created partitions.
+    """
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(datetime.utcnow())
+    first = month_start(first_month) if first_month else current
+    last = add_months(current, months_ahead)
+
+    created = []
+    for table, key in PARTITIONED_TABLES:
+        if not is_partitioned(conn, table):
+            continue
+        existing = {partition.name for partition in list_partitions(conn, table)}
+        default_name = table.name + DEFAULT_PARTITION_SUFFIX
+        if default_name not in existing:
+            conn.execute(text(f"CREATE TABLE {_quote(conn, default_name)} PARTITION OF {_quote(conn, table.name)} DEFAULT"))
+            created.append(default_name)
+        month = first
+        while month <= last:
+            if partition_name(table, month) not in existing:
+                _create_month_partition(conn, table, key, month, default_name)
+                created.append(partition_name(table, month))
+            month = add_months(month, 1)
+    return created
+
+
+def archive_partitions(conn: Connection, older_than_months: Optional[int] = None,
+                       schema: Optional[str] = None, dry_run: bool = False) -> List[str]:
+    """
+    Detach monthly partitions that end before `older_than_months` months ago and
+    move them to `schema`. They stay queryable there (e.g. archive.jobs_y2024m01)
+    and can be dumped with pg_dump and dropped to reclaim the space.
+    """
+    older_than_months = settings.PARTITION_ARCHIVE_AFTER_MONTHS if older_than_months is None else older_than_months
+    schema = schema or settings.PARTITION_ARCHIVE_SCHEMA
+    cutoff = datetime.combine(add_months(month_start(datetime.utcnow()), -older_than_months), datetime.min.time())
+
+    archived = []
+    for table, _ in PARTITIONED_TABLES:
+        if not is_partitioned(conn, table):
+            continue
+        for partition in list_partitions(conn, table):
+            if partition.is_default or partition.upper > cutoff:
+                continue
+            archived.append(partition.name)
+            if dry_run:
+                continue
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {_quote(conn, schema)}"))
+            conn.execute(text(f"ALTER TABLE {_quote(conn, table.name)} DETACH PARTITION {_quote(conn, partition.name)}"))
+            conn.execute(text(f"ALTER TABLE {_quote(conn, partition.name)} SET SCHEMA {_quote(conn, schema)}"))
+    return archived
+
+
+def convert_to_partitioned(conn: Connection, months_ahead: Optional[int] = None) -> List[str]:
+    """
+    One-time migration of existing unpartitioned jobs/job_relevance tables.
+
+    The old tables are renamed to <table>_unpartitioned, the partitioned tables
+    are created from the models, every month that has data gets a partition and
+    the rows are copied. Only columns the old tables actually have are copied
+    (read from information_schema), so a database created before later columns
+    were added converts too; job_relevance copies of job columns come from the
+    job, the other missing columns start out NULL or at their server default
+    and are filled by the backfill scripts
+    (backfill_skills.py, backfill_contractor_selection.py) or on the next feed
+    ingest. Rows without a partition key (jobs without publishedDateTime, and
+    their job_relevance rows) are not copied and stay in the _unpartitioned
+    tables: a stand-in date would become part of the primary key, and the job
+    would be stored a second time once the feed delivers its real date.
+
+    The primary keys become (id, publishedDateTime) and (id, published_at), so
+    jobs.id alone is no longer unique, and the foreign keys from proposals and
+    job_relevance to jobs.id are dropped (Postgres cannot reference a partitioned
+    table without its partition key). Run it in one transaction; the
+    _unpartitioned tables are left for you to drop after checking the row counts.
+    Returns the names of the renamed tables.
+    """
+    legacy = {}
+    for table, _ in PARTITIONED_TABLES:
+        if not table_exists(conn, table.name) or is_partitioned(conn, table):
+            continue
+        old_name = table.name + LEGACY_TABLE_SUFFIX
+        conn.execute(text(f"ALTER TABLE {_quote(conn, table.name)} RENAME TO {_quote(conn, old_name)}"))
+        # Constraint and index names are global per schema; free them for the new table.
+        primary_key = conn.execute(text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name) AND contype = 'p'"
+        ), {"name": old_name}).scalar()
+        if primary_key:
+            conn.execute(text(f"ALTER TABLE {_quote(conn, old_name)} RENAME CONSTRAINT "
+                              f"{_quote(conn, primary_key)} TO {_quote(conn, old_name + '_pkey')}"))
+        for index in table.indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {_quote(conn, index.name)}"))
+        legacy[table.name] = old_name
+    if not legacy:
+        return []
+
+    jobs_table = legacy.get(Job.__tablename__, Job.__tablename__)
+    foreign_keys = conn.execute(text(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint WHERE contype = 'f' AND confrelid = to_regclass(:name)"
+    ), {"name": jobs_table}).all()
+    for table_name, constraint in foreign_keys:
+        conn.execute(text(f"ALTER TABLE {table_name} DROP CONSTRAINT {_quote(conn, constraint)}"))
+
+    for table, _ in PARTITIONED_TABLES:
+        if table.name in legacy:
+            table.create(conn)
+
+    def q(name: str) -> str:
+        return _quote(conn, name)
+
+    def copy_expression(alias: str, column: Column, legacy_type: str) -> str:
+        expression = f"{alias}.{q(column.name)}"
+        # e.g. contractor_selection, which used to be JSON text: keep each value as a JSON string.
+        if column.type.compile(dialect=conn.dialect).upper() in ("JSON", "JSONB") \
+                and legacy_type not in ("json", "jsonb"):
+            return f"to_jsonb({expression})"
+        return expression
+
+    def copied_columns(table: Table, legacy_columns: Dict[str, str], key: Column) -> List[Column]:
+        return [column for column in table.columns
+                if column.computed is None and (column.name in legacy_columns or column is key)]
+
+    def copy_rows(table: Table, columns: List[Column], select_list: str, source: str, key: str):
+        conn.execute(text(
+            f"INSERT INTO {q(table.name)} ({', '.join(q(column.name) for column in columns)}) "
+            f"SELECT {select_list} FROM {source} WHERE {key} IS NOT NULL"
+        ))
+        left = conn.execute(text(f"SELECT count(*) FROM {source} WHERE {key} IS NULL")).scalar()
+        if left:
+            logger.warning(f"{left} {table.name} rows have no partition key and were left in "
+                           f"{legacy[table.name]}.")
+
+    legacy_jobs = column_types(conn, jobs_table)
+    job_key = f'j.{q("publishedDateTime")}'
+    first = conn.execute(text(f"SELECT min({job_key}) FROM {q(jobs_table)} j")).scalar()
+    ensure_partitions(conn, first_month=first, months_ahead=months_ahead)
+
+    if Job.__tablename__ in legacy:
+        table, key = PARTITIONED_TABLES[0]
+        columns = copied_columns(table, legacy_jobs, key)
+        select_list = ", ".join(job_key if column is key else copy_expression("j", column, legacy_jobs[column.name])
+                                for column in columns)
+        copy_rows(table, columns, select_list, f"{q(jobs_table)} j", job_key)
+    if JobRelevance.__tablename__ in legacy:
+        table, key = PARTITIONED_TABLES[1]
+        legacy_relevance = column_types(conn, legacy[table.name])
+        # The job's key, so the row joins its job on (id, publishedDateTime).
+        relevance_key = f'j.{q("publishedDateTime")}'
+        columns = copied_columns(table, legacy_relevance, key)
+        columns += [table.c[name] for name in RELEVANCE_JOB_COLUMNS if name not in legacy_relevance]
+
+        def relevance_expression(column: Column) -> str:
+            if column is key:
+                return relevance_key
+            if column.name not in legacy_relevance:
+                return f"j.{q(column.name)}"
+            return copy_expression("r", column, legacy_relevance[column.name])
+
+        select_list = ", ".join(relevance_expression(column) for column in columns)
+        copy_rows(table, columns, select_list,
+                  f"{q(legacy[table.name])} r LEFT JOIN {q(Job.__tablename__)} j ON j.id = r.id", relevance_key)
+    for table, _ in PARTITIONED_TABLES:
+        conn.execute(text(f"ANALYZE {q(table.name)}"))
+    return list(legacy.values())
+
+
+def ensure_partitions_on(engine: Engine) -> List[str]:
+    """Startup hook: create upcoming partitions if the database is Postgres and partitioned."""
+    if engine.dialect.name != "postgresql":
+        return []
+    with engine.begin() as conn:
+        if not all(is_partitioned(conn, table) for table, _ in PARTITIONED_TABLES):
+            logger.warning("jobs/job_relevance are not partitioned yet. Run `python manage_partitions.py convert`, "
+                           "then the other steps of \"Upgrading an existing database\" in documentation.md.")
+        created = ensure_partitions(conn)
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    return created
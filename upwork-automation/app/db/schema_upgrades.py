@@ -0,0 +1,112 @@
+"""
+Columns added to existing tables after they were first created. Postgres only.
+
+Base.metadata.create_all only creates missing tables, so a database created
+before one of these columns existed gets them from `python upgrade_schema.py`,
+which adds the columns and their indexes idempotently and fills the ones that
+are copied from another table. Tables converted with `manage_partitions.py
+convert` already have most of them; unpartitioned tables get every one. Startup
+only logs a warning while any is missing: building an index on a large jobs
+table should not block the API from starting.
+
+The full upgrade order is in documentation.md ("Upgrading an existing database").
+"""
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Table, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn
+
+from app.models.jobs import Job, JobRelevance
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ColumnUpgrade:
+    table: Table
+    column: str
+    definition: str # type and default, as in ALTER TABLE ... ADD COLUMN <column> <definition>
+    indexes: Tuple[str, ...] = ()
+    fill: Optional[str] = None # UPDATE run once, right after the column was added
+
+
+def generated_definition(column) -> str:
+    """The model's own DDL of a generated column, without its name."""
+    ddl = str(CreateColumn(column).compile(dialect=postgresql.dialect()))
+    return ddl.split(" ", 1)[1]
+
+
+UPGRADES: List[ColumnUpgrade] = [
+    # Read by every listing and /search. Adding the generated column rewrites the table.
+    ColumnUpgrade(Job.__table__, "search_vector", generated_definition(Job.__table__.c.search_vector),
+                  ("idx_jobs_search_vector",)),
+    # Listings ETag and delta sync of re-scored jobs.
+    ColumnUpgrade(JobRelevance.__table__, "updated_at", "timestamp DEFAULT now()", ("idx_job_relevance_updated_at",)),
+    # The relevance listing orders and pages on it; copied from the job like on every new score.
+    ColumnUpgrade(
+        JobRelevance.__table__, "published_at", "timestamp", ("idx_job_relevance_category_published",),
+        fill='UPDATE job_relevance r SET published_at = j."publishedDateTime" FROM jobs j WHERE j.id = r.id',
+    ),
+    # Rollup bucket of the last score. Until they were copied, ingestion never changed
+    # these on jobs, so the job's current values are the ones the rollup counted.
+    *(ColumnUpgrade(
+        JobRelevance.__table__, column, "text",
+        fill=f'UPDATE job_relevance r SET {column} = j.{column} FROM jobs j '
+             f'WHERE j.id = r.id AND j."publishedDateTime" = r.published_at',
+    ) for column in ("client_country", "subcategory_label")),
+    # Existing rows get the time of the upgrade; the delta sync falls back to JobFirstFetchedDateTime.
+    ColumnUpgrade(Job.__table__, "updated_at", "timestamp DEFAULT now()", ("idx_jobs_updated_at",)),
+    # Change detection of feed ingestion. Existing rows have no hashes yet, so each is
+    # rewritten once on its next fetch; re-scoring is only queued for a new title/description.
+    ColumnUpgrade(Job.__table__, "content_hash", "text"),
+    ColumnUpgrade(Job.__table__, "counters_hash", "text"),
+    ColumnUpgrade(Job.__table__, "rescore_requested_at", "timestamp", ("idx_jobs_rescore_requested",)),
+]
+
+
+def _quote(conn: Connection, name: str) -> str:
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def missing_columns(conn: Connection) -> List[ColumnUpgrade]:
+    missing = []
+    for upgrade in UPGRADES:
+        exists = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_schema = current_schema() "
+            "AND table_name = :table AND column_name = :column)"
+        ), {"table": upgrade.table.name, "column": upgrade.column}).scalar()
+        if not exists:
+            missing.append(upgrade)
+    return missing
+
+
+def upgrade_schema(conn: Connection) -> List[str]:
+    """Add every missing column and (re)check its indexes; returns the added columns as table.column."""
+    missing = missing_columns(conn)
+    for upgrade in UPGRADES:
+        conn.execute(text(
+            f"ALTER TABLE {_quote(conn, upgrade.table.name)} "
+            f"ADD COLUMN IF NOT EXISTS {_quote(conn, upgrade.column)} {upgrade.definition}"
+        ))
+        if upgrade.fill and any(upgrade is added for added in missing):
+            conn.execute(text(upgrade.fill))
+        for index in upgrade.table.indexes:
+            if index.name in upgrade.indexes:
+                index.create(conn, checkfirst=True)
+    return [f"{upgrade.table.name}.{upgrade.column}" for upgrade in missing]
+
+
+def check_schema_on(engine: Engine) -> List[str]:
+    """Startup hook: warn about columns that still need `python upgrade_schema.py`."""
+    if engine.dialect.name != "postgresql":
+        return []
+    with engine.connect() as conn:
+        missing = [f"{upgrade.table.name}.{upgrade.column}" for upgrade in missing_columns(conn)]
+    if missing:
+        logger.warning(f"Missing columns {', '.join(missing)}: listings and /search fail until "
+                       f"`python upgrade_schema.py` has run.")
+    return missing
@@ -0,0 +1,50 @@
+"""
+SQLite engines for tests and local benchmarks.
+
+The models use a few Postgres-only column types and generated-column functions;
+they get plain SQLite stand-ins here so the tables can be created. Only storage
+is emulated: text search and the other Postgres semantics are not.
+"""
+from typing import Optional
+
+from sqlalchemy import BigInteger, create_engine, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import NullPool, StaticPool
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_as_text(type_, compiler, **kw):
+    return "TEXT"
+
+
+# SQLite integers are 64-bit already, and only an INTEGER primary key is auto-assigned
+# (the identity columns of proposals and proposal_settings).
+@compiles(BigInteger, "sqlite")
+def _bigint_as_integer(type_, compiler, **kw):
+    return "INTEGER"
+
+
+def _register_postgres_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function("to_tsvector", 2, lambda config, text: text, deterministic=True)
+    dbapi_connection.create_function("setweight", 2, lambda vector, weight: vector, deterministic=True)
+
+
+def create_sqlite_engine(path: Optional[str] = None) -> Engine:
+    """In-memory database by default; pass a file path to share it with create_async_sqlite_engine()."""
+    if path is None:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(f"sqlite:///{path}")
+    event.listen(engine, "connect", _register_postgres_functions)
+    return engine
+
+
+def create_async_sqlite_engine(path: str) -> AsyncEngine:
+    # No pooling: aiosqlite connections belong to the event loop that opened them,
+    # and tests run each request (or asyncio.run call) on its own loop.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    event.listen(engine.sync_engine, "connect", _register_postgres_functions)
+    return engine
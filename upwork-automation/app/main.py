@@ -1,11 +1,44 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import job_listings, rag_relevance, agentic_proposal_generator, template_routes
-from app.db.database import Base, engine
+from app.api.routes import jobs, job_listings, rag_relevance, agentic_proposal_generator, template_routes, rag_admin, metrics, stats
+from app.db.database import Base, engine, async_engine
+from app.db.partitions import ensure_partitions_on
+from app.db.schema_upgrades import check_schema_on
+from app.utils.rag_index import RAG_WATCHER
+from app.utils.job_embeddings import flush_job_embedding_store
+from app.utils.feed_fetcher import close_feed_fetcher
+from app.utils.proposal_pregeneration import PROPOSAL_PREGENERATOR
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Upwork Automation Tool API")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await asyncio.to_thread(ensure_partitions_on, engine)
+    except Exception as e:
+        # Rows still land in the default partitions; retry with manage_partitions.py ensure.
+        logger.error(f"Could not create upcoming jobs partitions: {e}", exc_info=True)
+    try:
+        await asyncio.to_thread(check_schema_on, engine)
+    except Exception as e:
+        logger.error(f"Could not check the schema for missing columns: {e}", exc_info=True)
+    RAG_WATCHER.start()
+    PROPOSAL_PREGENERATOR.start()
+    yield
+    await PROPOSAL_PREGENERATOR.stop()
+    await RAG_WATCHER.stop()
+    flush_job_embedding_store()
+    await close_feed_fetcher()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Upwork Automation Tool API", lifespan=lifespan)
 
 origins = ["*"] 
 
@@ -15,12 +48,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+app.include_router(jobs.router, tags=["ingestion"])
 app.include_router(job_listings.router, prefix="/api/job-listings", tags=["job-listings"])
 app.include_router(rag_relevance.router, prefix="/api", tags=["jobs"])
 app.include_router(agentic_proposal_generator.router, prefix="/api/agentic-proposals", tags=["agentic-proposals"])
 app.include_router(template_routes.router, prefix="/api/template", tags=["template"])
+app.include_router(rag_admin.router, prefix="/api/rag", tags=["rag"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
 
 
 @app.get("/")
@@ -1,12 +1,19 @@
 # models.py - SQLAlchemy ORM Models
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Date, BigInteger, ForeignKey, Float, Identity,
-    UniqueConstraint, Index # Added UniqueConstraint and Index
+    Column, Integer, String, Text, DateTime, Date, BigInteger, Boolean, ForeignKey, Float, Identity,
+    UniqueConstraint, Index, Computed, and_, text # Added UniqueConstraint and Index
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred, validates
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, REAL # Added REAL
+from sqlalchemy.types import JSON
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, JSONB, REAL, TSVECTOR # Added REAL
+
+from app.utils.contractor_selection import parse_contractor_selection, selection_summary
+from app.utils.skills import parse_skills
+
+# Text search configuration shared by the generated column and the search queries
+SEARCH_CONFIG = "english"
 
 Base = declarative_base()
 
@@ -43,7 +50,8 @@ class Job(Base):
     title = Column(Text)
     description = Column(Text)
     createdDateTime = Column(DateTime)
-    publishedDateTime = Column(DateTime)
+    # Partition key (monthly ranges, see app/db/partitions.py), so it is part of the primary key.
+    publishedDateTime = Column(DateTime, primary_key=True)
     renewedDateTime = Column(DateTime)
     duration = Column(Text)
     durationLabel = Column(Text)
@@ -94,17 +102,77 @@ class Job(Base):
     total_offered = Column(Integer)
     total_recommended = Column(Integer)
     skills = Column(Text)
+    # Normalized skill names parsed from `skills` whenever it is set (see parse_skills);
+    # GIN-indexed for skill filters. JSON on SQLite, which has no arrays.
+    skill_list = Column(ARRAY(Text).with_variant(JSON(), "sqlite"))
     ciphertext = Column(Text)
     JobUpdatedDateTime = Column(DateTime)
     JobFirstFetchedDateTime = Column(DateTime, server_default=func.now())
-    contractor_selection = Column(Text)
-    relevance = relationship("JobRelevance", uselist=False, back_populates="job")
+    # Last insert or in-place update by an ingest (see on_conflict_update); part of the listings watermark.
+    updated_at = Column(DateTime, server_default=func.now())
+    # Parsed feed JSON (screening questions, proposal requirements); None stays SQL NULL.
+    contractor_selection = Column(JSONB(none_as_null=True).with_variant(JSON(none_as_null=True), "sqlite"))
+    # Extracted from contractor_selection whenever it is set (see selection_summary) so
+    # listings filter on plain indexed columns; null when the feed had no selection.
+    has_questions = Column(Boolean)
+    question_count = Column(Integer)
+    required_connects = Column(Integer)
+    # Change detection for re-ingested jobs (see app/utils/job_utils.py): md5 of the
+    # volatile counters (applicants, invites, client activity...) and of every other
+    # feed field. Unchanged jobs are not rewritten; a counters-only change keeps the rest.
+    content_hash = Column(Text)
+    counters_hash = Column(Text)
+    # Set when a re-ingest changed the title or description; the relevance cron re-scores and clears it.
+    rescore_requested_at = Column(DateTime)
+    # Maintained by Postgres; title ranks above skills above description. Deferred so it is never loaded.
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(skills, '')), 'B') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')",
+        persisted=True
+    )))
+    # No database foreign key: a unique key on a partitioned table must include the partition key.
+    # Joined on the whole key so Postgres only probes the matching month's partition.
+    relevance = relationship("JobRelevance", uselist=False, back_populates="job",
+                             primaryjoin="and_(Job.id == foreign(JobRelevance.id), "
+                                         "Job.publishedDateTime == foreign(JobRelevance.published_at))")
 
     __table_args__ = (
         Index('idx_jobs_engagement', 'engagement'),
-        Index('idx_jobs_publisheddatetime', 'publishedDateTime'),
+        # Serves ORDER BY publishedDateTime DESC, id DESC and the keyset cursor
+        # comparison of the listing endpoints; supersedes the single-column index.
+        Index('idx_jobs_published_id', 'publishedDateTime', 'id'),
+        # Watermark for the listings delta sync / ETag (newly inserted jobs).
+        Index('idx_jobs_first_fetched', 'JobFirstFetchedDateTime'),
+        # Watermark for re-ingested jobs whose content or counters were updated in place.
+        Index('idx_jobs_updated_at', 'updated_at'),
+        Index('idx_jobs_search_vector', 'search_vector', postgresql_using='gin'),
+        # skill_list @> ARRAY[...] for the skill filters
+        Index('idx_jobs_skill_list', 'skill_list', postgresql_using='gin'),
+        # has_questions filter keeps the (publishedDateTime, id) keyset order.
+        Index('idx_jobs_has_questions_published', 'has_questions', 'publishedDateTime', 'id'),
+        Index('idx_jobs_required_connects', 'required_connects'),
+        # contractor_selection @> '{...}' for ad-hoc requirement lookups
+        Index('idx_jobs_contractor_selection', 'contractor_selection', postgresql_using='gin',
+              postgresql_ops={'contractor_selection': 'jsonb_path_ops'}),
+        # Re-scoring queue; only the few flagged jobs are indexed.
+        Index('idx_jobs_rescore_requested', 'rescore_requested_at',
+              postgresql_where=text('"rescore_requested_at" IS NOT NULL')),
+        {'postgresql_partition_by': 'RANGE ("publishedDateTime")'},
     )
 
+    @validates("skills")
+    def _parse_skill_list(self, key, value):
+        self.skill_list = parse_skills(value)
+        return value
+
+    @validates("contractor_selection")
+    def _parse_contractor_selection(self, key, value):
+        value = parse_contractor_selection(value)
+        for name, derived in selection_summary(value).items():
+            setattr(self, name, derived)
+        return value
+
 
 class Metrics(Base):
     __tablename__ = "metrics"
@@ -140,7 +208,7 @@ class Proposal(Base):
     __tablename__ = "proposals"
 
     id = Column(BigInteger, Identity(always=True), primary_key=True, index=True)
-    job_id = Column(Text, ForeignKey("jobs.id"))
+    job_id = Column(Text) # jobs.id; not a foreign key since jobs is partitioned
     user_id = Column(BigInteger)
     proposal_text = Column(Text)
     applied_at = Column(DateTime, server_default=func.now())
@@ -150,11 +218,13 @@ class Proposal(Base):
     __table_args__ = (
         Index('idx_proposals_job_id', 'job_id'),
         Index('idx_proposals_user_id', 'user_id'),
+        # Part of the listings ETag, so a newly generated proposal shows as ready.
+        Index('idx_proposals_applied_at', 'applied_at'),
     )
 
 class JobRelevance(Base):
     __tablename__ = "job_relevance"
-    id = Column(Text, ForeignKey("jobs.id"), primary_key=True, index=True) 
+    id = Column(Text, primary_key=True, index=True) # jobs.id
     score = Column(REAL, nullable=False) 
     category = Column(Text, nullable=False)
     reasoning = Column(Text)
@@ -164,4 +234,53 @@ class JobRelevance(Base):
     location_match = Column(Text)
     closest_profile_name = Column(Text)
     tags = Column(Text)
-    job = relationship("Job", back_populates="relevance")
\ No newline at end of file
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Copy of jobs.publishedDateTime so category listings can be served in order from one index.
+    # Also the partition key, partitioned by month like jobs.
+    published_at = Column(DateTime, primary_key=True)
+    # The job's relevance_daily_rollup bucket as of its last score: jobs keeps the
+    # latest values from the feed, the rollup only moves when the job is re-scored.
+    client_country = Column(Text)
+    subcategory_label = Column(Text)
+    job = relationship("Job", back_populates="relevance",
+                       primaryjoin="and_(Job.id == foreign(JobRelevance.id), "
+                                   "Job.publishedDateTime == foreign(JobRelevance.published_at))")
+
+    __table_args__ = (
+        # Watermark for the listings delta sync / ETag (re-scored jobs).
+        Index('idx_job_relevance_updated_at', 'updated_at'),
+        # WHERE category = ? ORDER BY published_at DESC, id DESC (+ keyset cursor)
+        Index('idx_job_relevance_category_published', 'category', 'published_at', 'id'),
+        # Score range filters across categories
+        Index('idx_job_relevance_score', 'score'),
+        {'postgresql_partition_by': 'RANGE (published_at)'},
+    )
+
+
+# Join condition for Core queries, like the relationship above: with the partition
+# key on both sides Postgres prunes to one partition instead of probing every month.
+JOB_RELEVANCE_JOIN = and_(JobRelevance.id == Job.id, JobRelevance.published_at == Job.publishedDateTime)
+
+
+class RelevanceRollup(Base):
+    """
+    Scored jobs per published day, category, client country and subcategory.
+
+    Maintained incrementally in the same transaction as every job_relevance
+    write (see app/utils/relevance_rollup.py), so the stats endpoint reads a few
+    hundred rows instead of scanning jobs joined with job_relevance. Unknown
+    country/subcategory are stored as '' because they are part of the key.
+    """
+    __tablename__ = "relevance_daily_rollup"
+    day = Column(Date, primary_key=True)
+    category = Column(Text, primary_key=True)
+    client_country = Column(Text, primary_key=True)
+    subcategory_label = Column(Text, primary_key=True)
+    job_count = Column(Integer, nullable=False, server_default="0")
+    score_sum = Column(DOUBLE_PRECISION, nullable=False, server_default="0")
+
+    __table_args__ = (
+        # Per-category and per-country reports without a day range still hit an index.
+        Index('idx_relevance_rollup_category_day', 'category', 'day'),
+        Index('idx_relevance_rollup_country', 'client_country'),
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime, date
-from typing import Optional, List 
+from typing import Any, Optional, List 
 
 
 class JobRelevanceBase(BaseModel):
@@ -140,10 +140,11 @@ class JobBase(BaseModel):
     total_offered: Optional[int] = None
     total_recommended: Optional[int] = None
     skills: Optional[str] = None
+    skill_list: Optional[List[str]] = None # Parsed from skills
     ciphertext: Optional[str] = None
     JobUpdatedDateTime: Optional[datetime] = None
     JobFirstFetchedDateTime: Optional[datetime] = None
-    contractor_selection: Optional[str] = None
+    contractor_selection: Optional[Any] = None # JSON from the feed
     relevance: Optional[JobRelevanceResponse] = None
 
 
@@ -210,15 +211,85 @@ class JobUpdate(BaseModel):
     ciphertext: Optional[str] = None
     JobUpdatedDateTime: Optional[datetime] = None
     JobFirstFetchedDateTime: Optional[datetime] = None
-    contractor_selection: Optional[str] = None
+    contractor_selection: Optional[Any] = None # JSON from the feed
 
 class JobResponse(JobBase):
     id: str 
+    # Derived from contractor_selection
+    has_questions: Optional[bool] = None
+    question_count: Optional[int] = None
+    required_connects: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class JobRelevanceSummary(BaseModel):
+    score: Optional[float] = None
+    category: Optional[str] = None
+
+
+class JobSummary(BaseModel):
+    """Row of the jobs table in the dashboard; the full record comes from /api/job-listings/{job_id}."""
+    id: str
+    title: Optional[str] = None
+    description: Optional[str] = None # Excerpt only, see DESCRIPTION_EXCERPT_CHARS
+    publishedDateTime: Optional[datetime] = None
+    engagement: Optional[str] = None
+    experienceLevel: Optional[str] = None
+    durationLabel: Optional[str] = None
+    status: Optional[str] = None
+    amount: Optional[float] = None
+    currency: Optional[str] = None
+    client_country: Optional[str] = None
+    client_total_hires: Optional[int] = None
+    client_total_spent: Optional[float] = None
+    client_verification_status: Optional[str] = None
+    has_questions: Optional[bool] = None
+    question_count: Optional[int] = None
+    required_connects: Optional[int] = None
+    relevance: Optional[JobRelevanceSummary] = None
+    proposal_ready: bool = False # a proposal (possibly pre-generated) is stored for the job
+
+
+class JobSearchResult(JobSummary):
+    rank: float
+    headline: Optional[str] = None # Description fragments with matches wrapped in <mark>
+
+
+class JobChangesResponse(BaseModel):
+    jobs: List[JobSummary]
+    token: str # Pass as `since` on the next call
+    has_more: bool = False
+
+
+class SimilarJobResponse(BaseModel):
+    similarity: float
+    proposal_status: Optional[str] = None
+    job: JobResponse
+
+
+class SkillFrequency(BaseModel):
+    skill: str
+    jobs: int
+
+
+class RelevanceStatsRow(BaseModel):
+    # Only the dimensions listed in group_by are set
+    day: Optional[date] = None
+    category: Optional[str] = None
+    country: Optional[str] = None
+    subcategory: Optional[str] = None
+    jobs: int
+    avg_score: Optional[float] = None
+
+
+class RelevanceStatsResponse(BaseModel):
+    group_by: List[str]
+    total_jobs: int
+    rows: List[RelevanceStatsRow]
+
+
 class MetricsBase(BaseModel):
     scraped_at: datetime
     start_date: date
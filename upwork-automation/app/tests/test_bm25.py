@@ -0,0 +1,31 @@
+from app.utils.bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_tech_names_intact():
+    assert tokenize("Built with Node.js, C++ and C# on Supabase") == [
+        "built", "with", "node.js", "c++", "and", "c#", "on", "supabase"
+    ]
+
+
+def test_bm25_ranks_exact_keyword_match_first():
+    documents = [
+        "We build web apps with React and Django.",
+        "Our backend runs on Supabase with row level security.",
+        "Agent workflows orchestrated with LangGraph and LangChain.",
+    ]
+    index = BM25Index(documents)
+
+    results = index.search("Need a Supabase expert", k=3)
+
+    assert results[0][0] == 1
+    assert all(score > 0 for _, score in results)
+    assert index.search("kubernetes", k=3) == []
+
+
+def test_reciprocal_rank_fusion_prefers_documents_ranked_by_both():
+    dense = [0, 1, 2]
+    keyword = [2, 3]
+
+    fused = reciprocal_rank_fusion([dense, keyword], k=2)
+
+    assert [doc_id for doc_id, _ in fused] == [2, 0]
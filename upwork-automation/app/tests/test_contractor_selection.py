@@ -0,0 +1,87 @@
+import os
+import json
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.job_listings import JobFilters, job_summary_select
+from app.models.jobs import Job
+from app.utils.contractor_selection import parse_contractor_selection, screening_questions, selection_summary
+from app.utils.job_backfill import copy_csv
+from app.utils.job_utils import ingest_items, jobs_frame
+
+SELECTION = {
+    "proposalRequirement": {
+        "coverLetterRequired": True,
+        "screeningQuestions": [{"sequenceNumber": 1, "question": " Describe a similar project "}, {"question": ""},
+                               "Which stack would you use?"],
+        "connectPrice": {"amount": "16"},
+    },
+}
+
+
+def test_parse_contractor_selection():
+    assert parse_contractor_selection(json.dumps(SELECTION)) == SELECTION
+    assert parse_contractor_selection("not json") == "not json"
+    assert parse_contractor_selection(" ") is None and parse_contractor_selection(float("nan")) is None
+    assert screening_questions(SELECTION) == ["Describe a similar project", "Which stack would you use?"]
+    assert selection_summary(SELECTION) == {"has_questions": True, "question_count": 2, "required_connects": 16}
+    assert selection_summary("not json") == {"has_questions": False, "question_count": 0, "required_connects": None}
+    assert selection_summary(None) == {"has_questions": None, "question_count": None, "required_connects": None}
+
+
+def test_model_derives_question_columns(sqlite_engine, create_tables):
+    create_tables(Job)
+    session = sessionmaker(bind=sqlite_engine)()
+    job = Job(id="a", publishedDateTime=datetime(2025, 1, 1), contractor_selection=json.dumps(SELECTION))
+    session.add(job)
+    session.commit()
+    session.expire_all()
+    job = session.get(Job, ("a", datetime(2025, 1, 1)))
+    assert job.contractor_selection == SELECTION
+    assert (job.has_questions, job.question_count, job.required_connects) == (True, 2, 16)
+
+    job.contractor_selection = None
+    session.commit()
+    assert session.scalar(select(Job.id).where(Job.contractor_selection.is_(None))) == "a" # SQL NULL, not JSON null
+    assert job.has_questions is None
+    session.close()
+
+
+def test_ingest_parses_contractor_selection(sqlite_engine, create_tables):
+    create_tables(Job)
+    items = [
+        {"id": "a", "publishedDateTime": "2025-03-01T09:00:00Z", "contractor_selection": json.dumps(SELECTION)},
+        {"id": "b", "publishedDateTime": "2025-03-01T10:00:00Z", "contractor_selection": '{"proposalRequirement": {}}'},
+        {"id": "c", "publishedDateTime": "2025-03-01T11:00:00Z", "contractor_selection": ""},
+    ]
+    frame = jobs_frame(items)
+    assert frame["question_count"].tolist()[:2] == [2, 0]
+    assert ingest_items(items, sqlite_engine).inserted == 3
+    # Same feed again: nothing to rewrite.
+    assert ingest_items(items, sqlite_engine).unchanged == 3
+
+    session = sessionmaker(bind=sqlite_engine)()
+    jobs = {job.id: job for job in session.scalars(select(Job))}
+    assert jobs["a"].contractor_selection == SELECTION and jobs["a"].required_connects == 16
+    assert (jobs["b"].has_questions, jobs["b"].question_count) == (False, 0)
+    assert jobs["c"].contractor_selection is None and jobs["c"].has_questions is None
+    without_questions = JobFilters(has_questions=False).apply(select(Job.id))
+    assert session.scalars(without_questions).all() == ["b"]
+    assert session.scalars(JobFilters(max_connects=10).apply(select(Job.id))).all() == []
+    session.close()
+
+    lines = copy_csv(frame[["id", "contractor_selection", "has_questions"]]).getvalue().splitlines()
+    assert lines[1] == 'b,"{""proposalRequirement"": {}}",False'
+    assert lines[2] == "c,,"
+
+
+def test_question_filters_use_derived_columns():
+    sql = str(JobFilters(has_questions=True, max_connects=8).apply(job_summary_select()).compile(dialect=postgresql.dialect()))
+    assert "jobs.has_questions IS true" in sql
+    assert "jobs.required_connects <= " in sql
+    assert "contractor_selection" not in sql
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.db.instrumentation import DatabaseMetrics, instrument_engine, timed_pool_class
+
+
+@pytest.fixture
+def engine_with_metrics(sqlite_path):
+    metrics = DatabaseMetrics("test", slow_query_ms=0.000001)
+    engine = create_engine(
+        f"sqlite:///{sqlite_path}", poolclass=timed_pool_class(QueuePool, metrics),
+        pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    instrument_engine(engine, metrics)
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_checkouts_and_pool_exhaustion_are_counted(engine_with_metrics):
+    engine, metrics = engine_with_metrics
+    with engine.connect():
+        assert metrics.pool_status()["in_use"] == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    checkout = metrics.snapshot()["checkout"]
+    assert checkout["count"] == 1 and checkout["timeouts"] == 1
+    assert metrics.pool_status() == {"class": "TimedQueuePool", "in_use": 0, "size": 1, "idle": 1, "overflow": 0}
+
+    engine.dispose()
+    with engine.connect():
+        pass
+    assert metrics.snapshot()["checkout"]["count"] == 2
+
+
+def test_statements_are_timed_and_slow_ones_logged(engine_with_metrics, caplog):
+    engine, metrics = engine_with_metrics
+    with engine.connect() as conn:
+        for _ in range(3):
+            conn.execute(text("SELECT 1"))
+        with pytest.raises(exc.OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 2"))
+
+    snapshot = metrics.snapshot()
+    by_statement = {s["statement"]: s for s in snapshot["statements"]}
+    assert by_statement["SELECT 1"]["count"] == 3
+    assert by_statement["SELECT 2"]["count"] == 1
+    assert "SELECT * FROM missing_table" not in by_statement
+    # EXPLAIN is only captured on Postgres
+    assert snapshot["slow_queries"][-1]["statement"] == "SELECT 2"
+    assert snapshot["slow_queries"][-1]["plan"] is None
+    assert "Slow query" in caplog.text
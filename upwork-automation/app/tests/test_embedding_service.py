@@ -0,0 +1,126 @@
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.utils.embeddings import EmbeddingService, truncate_embeddings
+from app.core.config import settings
+from app.utils.rag_index import RAGIndexSnapshot, build_faiss_index, embed_with_reuse
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, input, model, **kwargs):
+        self.calls.append(list(input))
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in input])
+
+
+def test_concurrent_requests_are_coalesced_into_one_api_call():
+    embeddings = CountingEmbeddings()
+    service = EmbeddingService(SimpleNamespace(embeddings=embeddings), max_wait_ms=200)
+    texts = ["a", "bb", "ccc", "dddd", "bb"]
+    results = {}
+
+    def worker(text):
+        results[text] = service.embed([text])
+
+    threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(embeddings.calls) == 1
+    assert sorted(embeddings.calls[0]) == ["a", "bb", "ccc", "dddd"]
+    for text in texts:
+        assert results[text].shape == (1, 2)
+        assert results[text][0][0] == len(text)
+
+
+def test_cached_texts_skip_the_api_and_large_batches_are_split():
+    embeddings = CountingEmbeddings()
+    service = EmbeddingService(SimpleNamespace(embeddings=embeddings), max_wait_ms=0, max_batch_inputs=2)
+
+    first = service.embed(["x", "yy", "zzz"])
+    second = service.embed(["zzz", "x"])
+
+    assert embeddings.calls == [["x", "yy"], ["zzz"]]
+    assert second.tolist() == [first[2].tolist(), first[0].tolist()]
+    assert service.metrics()["cache_hits"] == 2
+
+
+class SlowEmbeddings(CountingEmbeddings):
+    def create(self, input, model, **kwargs):
+        time.sleep(0.1)
+        return super().create(input, model, **kwargs)
+
+
+def test_cancelled_callers_do_not_break_the_batch_or_the_worker():
+    embeddings = SlowEmbeddings()
+    service = EmbeddingService(SimpleNamespace(embeddings=embeddings), max_wait_ms=50)
+
+    async def cancel_one(delay, kept_text):
+        cancelled = asyncio.create_task(service.aembed(["gone"]))
+        kept = asyncio.create_task(service.aembed([kept_text]))
+        await asyncio.sleep(delay)
+        cancelled.cancel()
+        return await asyncio.wait_for(kept, timeout=5)
+
+    # Cancelled while queued: dropped before the API call.
+    assert asyncio.run(cancel_one(0.01, "kept")).tolist() == [[4.0, 1.0]]
+    assert embeddings.calls == [["kept"]]
+    # Cancelled while its batch is at the API: the other caller still gets its result.
+    assert asyncio.run(cancel_one(0.08, "kept2")).tolist() == [[5.0, 1.0]]
+    assert sorted(embeddings.calls[1]) == ["gone", "kept2"]
+    assert service.embed(["after"]).tolist() == [[5.0, 1.0]]
+    assert service._worker.is_alive()
+
+
+def test_truncate_embeddings_returns_unit_vectors_of_requested_size():
+    vectors = np.random.default_rng(0).normal(size=(4, 1536)).astype("float32")
+
+    shortened = truncate_embeddings(vectors, 256)
+
+    assert shortened.shape == (4, 256)
+    assert np.allclose(np.linalg.norm(shortened, axis=1), 1.0, atol=1e-5)
+
+
+def test_quantized_storage_shrinks_vectors_and_keeps_neighbours():
+    rng = np.random.default_rng(1)
+    corpus = truncate_embeddings(rng.normal(size=(200, 1536)).astype("float32"), 512)
+    queries = corpus[:20]
+
+    for storage, expected_bytes in [("float32", 2048), ("float16", 1024), ("sq8", 512)]:
+        index = build_faiss_index(corpus, 512, storage)
+        _, neighbours = index.search(queries, 1)
+        assert index.sa_code_size() == expected_bytes
+        assert (neighbours[:, 0] == np.arange(20)).all()
+
+
+def test_reload_reuses_vectors_only_when_storage_keeps_them_exact(monkeypatch):
+    rng = np.random.default_rng(2)
+    texts = [f"chunk {i}" for i in range(40)]
+    vectors = truncate_embeddings(rng.normal(size=(40, 64)).astype("float32"), 64)
+    chunks = [{"text": text} for text in texts]
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSIONS", 64)
+    embedded = []
+
+    def embed(batch):
+        embedded.append(list(batch))
+        return vectors[[texts.index(text) for text in batch]]
+
+    def reload(previous_storage, storage):
+        monkeypatch.setattr(settings, "EMBEDDING_INDEX_STORAGE", storage)
+        embedded.clear()
+        previous = RAGIndexSnapshot(index=build_faiss_index(vectors, 64, previous_storage), chunks_metadata=chunks)
+        return embed_with_reuse(previous, "text", texts, embed)
+
+    assert np.array_equal(reload("float32", "sq8"), vectors) and embedded == []
+    reload("sq8", "sq8")
+    assert embedded == []
+    # Moving from sq8 to exact storage re-embeds instead of keeping the quantization error.
+    assert np.array_equal(reload("sq8", "float32"), vectors) and embedded == [texts]
@@ -0,0 +1,137 @@
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from aiohttp import web
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models.jobs import Job
+from app.utils.feed_fetcher import FeedFetcher
+
+PAGE_SIZE = 3
+
+
+class StubFeed:
+    """Local feed server: newest-first job ids, paginated, with ETags per page."""
+    def __init__(self, job_ids):
+        self.job_ids = list(job_ids)
+        self.requests = []
+        self.peers = set()
+        self.active = self.max_active = 0
+
+    def publish(self, *job_ids):
+        self.job_ids[:0] = job_ids
+
+    async def handle(self, request: web.Request) -> web.Response:
+        page, limit = int(request.query["page"]), int(request.query["limit"])
+        self.requests.append(page)
+        self.peers.add(request.transport.get_extra_info("peername"))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.02)
+            ids = self.job_ids[(page - 1) * limit:page * limit]
+            etag = f'"{page}-{"-".join(ids)}"'
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+            items = "".join(
+                f"<item><id>{job_id}</id><title>Job {job_id}</title>"
+                f"<publishedDateTime>2025-03-01T09:00:00Z</publishedDateTime></item>" for job_id in ids
+            )
+            return web.Response(body=f"<rss><channel>{items}</channel></rss>".encode(),
+                                content_type="application/rss+xml", headers={"ETag": etag})
+        finally:
+            self.active -= 1
+
+
+def run_with_feed(feed: StubFeed, scenario):
+    async def main():
+        app = web.Application()
+        app.router.add_get("/feed", feed.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        fetcher = FeedFetcher(f"http://{host}:{port}/feed?q=python", concurrency=2)
+        try:
+            return await scenario(fetcher)
+        finally:
+            await fetcher.close()
+            await runner.cleanup()
+    return asyncio.run(main())
+
+
+async def fetch_all(fetcher: FeedFetcher, max_pages: int = 10):
+    pages = []
+    async for feed_page in fetcher.iter_new_pages(1, PAGE_SIZE, max_pages):
+        fetcher.mark_ingested(feed_page)
+        pages.append(feed_page)
+    return pages
+
+
+def test_stops_at_seen_jobs_and_skips_unchanged_pages():
+    feed = StubFeed([f"j{n}" for n in range(20, 0, -1)]) # j20 is the newest
+
+    async def scenario(fetcher: FeedFetcher):
+        fetcher.seen.add_all(["j12", "j11"])
+        first = await fetch_all(fetcher)
+        assert [page.page for page in first] == [1, 2, 3]
+        assert first[2].reached_seen and first[2].new_items == 2 # j14, j13
+        assert sum(page.new_items for page in first) == 8
+        # Pages are fetched two at a time over pooled keep-alive connections.
+        assert feed.max_active == 2 and len(feed.peers) <= 2
+
+        feed.requests.clear()
+        assert await fetch_all(fetcher) == []
+        assert feed.requests == [1, 2] # page 1 answered 304, page 2 was in flight alongside it
+        assert fetcher.metrics()["not_modified"] == 2
+
+        feed.publish("j22", "j21")
+        feed.requests.clear()
+        third = await fetch_all(fetcher)
+        assert [page.page for page in third] == [1]
+        assert [item["id"] for item in third[0].items] == ["j22", "j21", "j20"]
+        assert third[0].new_items == 2 and third[0].reached_seen
+
+    run_with_feed(feed, scenario)
+
+
+def test_short_page_and_max_pages_end_pagination():
+    feed = StubFeed([f"j{n}" for n in range(7, 0, -1)])
+
+    async def scenario(fetcher: FeedFetcher):
+        pages = await fetch_all(fetcher)
+        assert [len(page.items) for page in pages] == [3, 3, 1]
+        assert sorted(feed.requests) == [1, 2, 3, 4] # page 4 was fetched in the same wave as page 3
+
+        fresh = FeedFetcher(fetcher.base_url, concurrency=2)
+        try:
+            assert [page.page for page in await fetch_all(fresh, max_pages=1)] == [1]
+        finally:
+            await fresh.close()
+
+    run_with_feed(feed, scenario)
+
+
+def test_seen_ids_are_seeded_from_newest_jobs(sqlite_engine, create_tables, async_sqlite_engine):
+    create_tables(Job)
+    session = sessionmaker(bind=sqlite_engine)()
+    start = datetime(2025, 3, 1)
+    session.add_all(Job(id=f"j{n}", publishedDateTime=start + timedelta(hours=n)) for n in range(1, 6))
+    session.commit()
+    session.close()
+
+    async def scenario():
+        fetcher = FeedFetcher("http://feed.invalid/feed", max_seen_ids=3)
+        async with AsyncSession(async_sqlite_engine) as db:
+            await fetcher.seed_seen_ids(db)
+        assert [job_id in fetcher.seen for job_id in ("j5", "j4", "j3", "j2")] == [True, True, True, False]
+        # Newly ingested ids evict the oldest seeded ones.
+        fetcher.seen.add_all(["j6"])
+        assert "j3" not in fetcher.seen and "j6" in fetcher.seen
+
+    asyncio.run(scenario())
@@ -0,0 +1,143 @@
+import os
+import json
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pandas as pd
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.db.partitions import ensure_partitions, partition_name
+from app.models.jobs import Base, Job
+from app.utils.job_backfill import backfill_jobs, copy_csv, map_source_columns, merge_statement, source_format
+from app.utils.job_utils import coerce_job_frame
+
+EXPORT = [
+    {"id": 101, "title": "Chatbot", "published_date_time": "2024-05-01T10:00:00Z", "total_applicants": "7",
+     "skills": ["Python", "LangChain"], "client_country": "Germany", "unknown_field": "x"},
+    {"id": "102", "title": "Scraper", "published_date_time": "2024-06-02T08:30:00+00:00", "amount": 250},
+    {"id": None, "title": "No id", "published_date_time": "2024-05-01T10:00:00Z"},
+    {"id": "103", "title": "Dashboard", "published_date_time": "2024-07-03T12:00:00Z", "skills": "React, D3.js"},
+    {"id": 101, "title": "Chatbot (edited)", "published_date_time": "2024-05-01T10:00:00Z", "total_applicants": 9},
+    # No publishedDateTime: skipped rather than keyed on its creation date.
+    {"id": "104", "title": "Draft", "created_date_time": "2024-06-05T08:30:00Z"},
+]
+
+
+def load_jobs(engine):
+    session = sessionmaker(bind=engine)()
+    try:
+        return {job.id: job for job in session.scalars(select(Job))}
+    finally:
+        session.close()
+
+
+def test_source_format_and_column_mapping():
+    assert source_format("dump.jsonl.gz") == "jsonl"
+    assert source_format("dump.CSV") == "csv"
+    assert source_format("dump.bin", "parquet") == "parquet"
+    with pytest.raises(ValueError):
+        source_format("dump.bin")
+
+    frame = pd.DataFrame(columns=["job_uid", "Published Date Time", "client_country", "id", "extra"])
+    mapped = map_source_columns(frame, {"job_uid": "id"})
+    assert list(mapped.columns) == ["id", "publishedDateTime", "client_country"]
+
+
+def test_jsonl_backfill_in_chunks(tmp_path, sqlite_engine, create_tables):
+    create_tables(Job)
+    path = tmp_path / "export.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in EXPORT))
+    progress = []
+
+    result = backfill_jobs(str(path), sqlite_engine, chunk_size=2, progress=lambda r: progress.append(r.rows_read))
+    assert progress == [2, 4, 6]
+    assert (result.rows_read, result.rows_loaded, result.skipped) == (6, 4, 2)
+
+    jobs = load_jobs(sqlite_engine)
+    assert sorted(jobs) == ["101", "102", "103"]
+    assert jobs["101"].title == "Chatbot (edited)" and jobs["101"].totalApplicants == 9
+    assert jobs["101"].skill_list == ["python", "langchain"]
+    assert jobs["102"].publishedDateTime == datetime(2024, 6, 2, 8, 30) and jobs["102"].amount == 250.0
+    assert jobs["103"].skill_list == ["react", "d3.js"]
+
+
+def test_skip_backfill_leaves_existing_jobs_alone(tmp_path, sqlite_engine, create_tables):
+    create_tables(Job)
+    path = tmp_path / "export.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in EXPORT))
+
+    result = backfill_jobs(str(path), sqlite_engine, chunk_size=2, on_conflict="skip")
+    assert (result.rows_read, result.rows_loaded, result.skipped) == (6, 3, 2)
+    assert load_jobs(sqlite_engine)["101"].title == "Chatbot"
+
+    again = backfill_jobs(str(path), sqlite_engine, on_conflict="skip")
+    assert again.rows_loaded == 0
+
+
+def test_csv_backfill_with_explicit_mapping(tmp_path, sqlite_engine, create_tables):
+    create_tables(Job)
+    path = tmp_path / "export.csv"
+    path.write_text(
+        "uid,posted,Title,totalApplicants\n"
+        "a,2024-05-01 10:00:00,\"Multi-line,\nquoted\",3\n"
+        "b,,No date,\n"
+    )
+    result = backfill_jobs(str(path), sqlite_engine, column_map={"uid": "id", "posted": "publishedDateTime"})
+    assert (result.rows_read, result.rows_loaded, result.skipped) == (2, 1, 1)
+    assert load_jobs(sqlite_engine)["a"].title == "Multi-line,\nquoted"
+
+
+def test_copy_csv_renders_postgres_literals():
+    frame = coerce_job_frame(pd.DataFrame([
+        {"id": "a", "publishedDateTime": "2024-05-01T10:00:00Z", "title": 'Say "hi"', "skills": 'C\\C++, "Go"'},
+        {"id": "b", "publishedDateTime": "2024-05-02T10:00:00Z", "title": None, "totalApplicants": 4},
+    ]))
+    lines = copy_csv(frame[["id", "publishedDateTime", "title", "totalApplicants", "skill_list"]]).getvalue().splitlines()
+    # Array literal {"c\\c++","\"go\""}, then CSV-quoted
+    assert lines[0] == r'a,2024-05-01 10:00:00.000000,"Say ""hi""",,"{""c\\c++"",""\""go\""""}"'
+    assert lines[1] == "b,2024-05-02 10:00:00.000000,,4,{}"
+
+
+def test_merge_statement_targets_the_partition_key():
+    columns = ["id", "publishedDateTime", "title", "client_country", "content_hash", "counters_hash"]
+    sql = str(merge_statement(columns).compile(dialect=postgresql.dialect()))
+    assert sql.startswith('INSERT INTO jobs (id, "publishedDateTime", title, client_country, content_hash, counters_hash) '
+                          'SELECT jobs_backfill_staging.id, ')
+    assert 'ON CONFLICT (id, "publishedDateTime") DO UPDATE SET ' in sql
+    assert "client_country = CASE WHEN (jobs.content_hash IS DISTINCT FROM excluded.content_hash) " \
+           "THEN excluded.client_country ELSE jobs.client_country END" in sql
+    assert sql.endswith("WHERE jobs.content_hash IS DISTINCT FROM excluded.content_hash "
+                        "OR jobs.counters_hash IS DISTINCT FROM excluded.counters_hash")
+    skip = str(merge_statement(columns, "skip").compile(dialect=postgresql.dialect()))
+    assert skip.endswith('ON CONFLICT (id, "publishedDateTime") DO NOTHING')
+
+
+# ---- Postgres (see conftest.py) -------------------------------------------------
+
+@pytest.fixture
+def pg(pg_engine):
+    Base.metadata.create_all(pg_engine, tables=[Job.__table__])
+    with pg_engine.begin() as conn:
+        ensure_partitions(conn, months_ahead=1)
+    return pg_engine
+
+
+def test_copy_backfill_creates_partitions_and_merges(tmp_path, pg):
+    path = tmp_path / "export.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in EXPORT))
+    result = backfill_jobs(str(path), pg, chunk_size=2)
+    assert (result.rows_read, result.skipped) == (6, 2)
+
+    jobs = load_jobs(pg)
+    assert jobs["101"].title == "Chatbot (edited)" and jobs["101"].skill_list == ["python", "langchain"]
+    with pg.connect() as conn:
+        may = partition_name(Job.__table__, datetime(2024, 5, 1))
+        assert conn.execute(text(f"SELECT count(*) FROM {may}")).scalar() == 1
+        assert conn.execute(text("SELECT count(*) FROM jobs_default")).scalar() == 0
+
+    skipped = backfill_jobs(str(path), pg, on_conflict="skip")
+    assert skipped.rows_loaded == 0
@@ -0,0 +1,34 @@
+import numpy as np
+
+from app.utils.job_embeddings import JobEmbeddingStore
+
+
+def unit(*components):
+    vector = np.zeros(8, dtype="float32")
+    vector[:len(components)] = components
+    return vector / np.linalg.norm(vector)
+
+
+def test_similar_returns_nearest_jobs_excluding_itself(tmp_path):
+    store = JobEmbeddingStore(data_dir=str(tmp_path), dim=8)
+    store.upsert(["a", "b", "c"], np.stack([unit(1, 0), unit(0.9, 0.1), unit(0, 1)]))
+
+    matches = store.similar("a", k=2)
+
+    assert [job_id for job_id, _ in matches] == ["b", "c"]
+    assert matches[0][1] > 0.99
+    assert store.similar("missing", k=2) is None
+
+
+def test_upsert_replaces_vector_and_store_survives_reload(tmp_path):
+    store = JobEmbeddingStore(data_dir=str(tmp_path), dim=8)
+    store.upsert(["a", "b"], np.stack([unit(1, 0), unit(0, 1)]))
+    store.upsert(["b"], np.stack([unit(1, 0.01)]))
+    store.save()
+
+    reloaded = JobEmbeddingStore(data_dir=str(tmp_path), dim=8)
+
+    assert len(reloaded) == 2
+    assert reloaded.index.ntotal == 2
+    assert reloaded.similar("a", k=1)[0][0] == "b"
+    assert reloaded.similar("a", k=1)[0][1] > 0.99
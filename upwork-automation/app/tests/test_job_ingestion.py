@@ -0,0 +1,172 @@
+import os
+import io
+import asyncio
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.agents.structures import MatchScore, RelevanceCategory
+from app.api.routes.rag_relevance import load_rescore_queue, update_database_for_single_job
+from app.models.jobs import Job, JobRelevance, RelevanceRollup
+from app.utils.job_utils import frame_rows, ingest_feed, iter_feed_items, jobs_frame, upsert_jobs_statement
+
+
+def feed(*items: str) -> io.BytesIO:
+    body = "".join(f"<item>{item}</item>" for item in items)
+    return io.BytesIO(
+        f'<?xml version="1.0"?><rss xmlns:up="https://upwork.com/rss"><channel><title>Jobs</title>{body}</channel></rss>'.encode()
+    )
+
+
+FIRST_FETCH_ITEMS = (
+    "<id>a</id><up:title>Agent build</up:title><publishedDateTime>2025-03-01T09:00:00Z</publishedDateTime>"
+    "<totalApplicants>5</totalApplicants><amount>1500.5</amount><skills>Python, LangChain</skills>"
+    "<client_country>United States</client_country><link>https://upwork.com/jobs/a</link>",
+    "<id>b</id><title>No published date</title><createdDateTime>2025-03-02T10:00:00+02:00</createdDateTime>"
+    "<totalApplicants></totalApplicants>",
+    "<id></id><title>No id</title><publishedDateTime>2025-03-01T09:00:00Z</publishedDateTime>",
+)
+
+
+def first_fetch() -> io.BytesIO:
+    return feed(*FIRST_FETCH_ITEMS)
+
+
+def test_iter_feed_items_strips_namespaces_and_text():
+    items = list(iter_feed_items(first_fetch()))
+    assert len(items) == 3
+    assert items[0]["title"] == "Agent build" and items[0]["link"] == "https://upwork.com/jobs/a"
+
+
+def test_jobs_frame_types_and_keys():
+    rows = frame_rows(jobs_frame(list(iter_feed_items(first_fetch()))))
+    # "b" has only a createdDateTime: without its real publishedDateTime it would be stored twice.
+    assert [row["id"] for row in rows] == ["a"]
+    a = rows[0]
+    assert "link" not in a # not a Job column
+    assert a["publishedDateTime"] == datetime(2025, 3, 1, 9, 0)
+    assert a["totalApplicants"] == 5 and isinstance(a["totalApplicants"], int)
+    assert a["amount"] == 1500.5
+    assert a["skill_list"] == ["python", "langchain"]
+
+
+def test_ingest_feed_upserts(sqlite_engine, create_tables):
+    create_tables(Job)
+    first = ingest_feed(first_fetch(), sqlite_engine, batch_size=2)
+    assert (first.parsed, first.inserted, first.updated, first.skipped) == (3, 1, 0, 2)
+
+    refetch = feed(
+        "<id>a</id><title>Agent build (updated)</title><publishedDateTime>2025-03-01T09:00:00Z</publishedDateTime>"
+        "<totalApplicants>12</totalApplicants><skills>Python, FastAPI</skills>"
+        "<client_country>Canada</client_country>",
+        "<id>c</id><title>New</title><publishedDateTime>2025-03-03T09:00:00Z</publishedDateTime>",
+    )
+    second = ingest_feed(refetch, sqlite_engine)
+    assert (second.parsed, second.inserted, second.updated, second.skipped) == (2, 1, 1, 0)
+
+    session = sessionmaker(bind=sqlite_engine)()
+    jobs = {job.id: job for job in session.scalars(select(Job))}
+    assert sorted(jobs) == ["a", "c"]
+    a = jobs["a"]
+    assert a.title == "Agent build (updated)" and a.totalApplicants == 12
+    assert a.amount == 1500.5 # not in the re-fetched item, left as is
+    assert a.skill_list == ["python", "fastapi"]
+    assert a.client_country == "Canada"
+    assert a.JobFirstFetchedDateTime is not None
+    session.close()
+
+
+def test_upsert_targets_the_partition_key():
+    rows = frame_rows(jobs_frame(list(iter_feed_items(first_fetch()))))
+    sql = str(upsert_jobs_statement("postgresql", rows).compile(dialect=postgresql.dialect()))
+    assert 'ON CONFLICT (id, "publishedDateTime") DO UPDATE SET' in sql
+    assert "client_country = CASE WHEN (jobs.content_hash IS DISTINCT FROM excluded.content_hash) " \
+           "THEN excluded.client_country ELSE jobs.client_country END" in sql
+    # Counters always follow the feed, other columns only when the content hash changed.
+    assert '"totalApplicants" = excluded."totalApplicants"' in sql
+    assert "title = CASE WHEN (jobs.content_hash IS DISTINCT FROM excluded.content_hash) THEN excluded.title ELSE jobs.title END" in sql
+    assert "rescore_requested_at = CASE WHEN (jobs.content_hash IS DISTINCT FROM excluded.content_hash " \
+           "AND jobs.title IS DISTINCT FROM excluded.title) THEN CURRENT_TIMESTAMP" in sql
+
+
+def job_item(title="Agent build", description="Build an agent", applicants=5, amount=1000):
+    return (f"<id>a</id><title>{title}</title><description>{description}</description>"
+            f"<publishedDateTime>2025-03-01T09:00:00Z</publishedDateTime>"
+            f"<totalApplicants>{applicants}</totalApplicants><amount>{amount}</amount>")
+
+
+def stored_job(engine) -> Job:
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    try:
+        return session.scalars(select(Job)).one()
+    finally:
+        session.close()
+
+
+def counts(result):
+    return result.inserted, result.updated, result.unchanged
+
+
+def test_reingest_writes_only_what_changed(sqlite_engine, create_tables):
+    create_tables(Job)
+    assert counts(ingest_feed(feed(job_item()), sqlite_engine)) == (1, 0, 0)
+    first = stored_job(sqlite_engine)
+    assert first.content_hash and first.counters_hash and first.rescore_requested_at is None
+
+    assert counts(ingest_feed(feed(job_item()), sqlite_engine)) == (0, 0, 1)
+
+    # Counters only: the other columns are left as stored (a local edit to the title survives).
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("UPDATE jobs SET title = 'edited locally'"))
+    assert counts(ingest_feed(feed(job_item(applicants=9)), sqlite_engine)) == (0, 1, 0)
+    job = stored_job(sqlite_engine)
+    assert job.totalApplicants == 9 and job.title == "edited locally"
+    assert job.content_hash == first.content_hash and job.counters_hash != first.counters_hash
+    assert job.rescore_requested_at is None
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("UPDATE jobs SET title = 'Agent build'"))
+
+    # Content that the relevance analysis does not read: rewritten, not re-scored.
+    assert counts(ingest_feed(feed(job_item(applicants=9, amount=1500)), sqlite_engine)) == (0, 1, 0)
+    job = stored_job(sqlite_engine)
+    assert job.amount == 1500.0 and job.title == "Agent build"
+    assert job.rescore_requested_at is None
+
+    assert counts(ingest_feed(feed(job_item(description="Build two agents", applicants=9, amount=1500)), sqlite_engine)) == (0, 1, 0)
+    job = stored_job(sqlite_engine)
+    assert job.description == "Build two agents"
+    assert job.rescore_requested_at is not None
+
+
+def test_hashes_do_not_depend_on_the_other_items_of_the_batch(sqlite_engine, create_tables):
+    create_tables(Job)
+    without_amount = ("<id>a</id><title>Agent build</title>"
+                      "<publishedDateTime>2025-03-01T09:00:00Z</publishedDateTime><totalApplicants>5</totalApplicants>")
+    with_amount = ("<id>b</id><title>Scraper</title><publishedDateTime>2025-03-01T09:00:00Z</publishedDateTime>"
+                   "<amount>250</amount><invites_sent>2</invites_sent>")
+    assert counts(ingest_feed(feed(without_amount, with_amount), sqlite_engine)) == (2, 0, 0)
+    # Alone, "a" has no amount or invites_sent column at all: still the same posting.
+    assert counts(ingest_feed(feed(without_amount), sqlite_engine)) == (0, 0, 1)
+    assert counts(ingest_feed(feed(with_amount, without_amount), sqlite_engine)) == (0, 0, 2)
+
+
+def test_scoring_clears_the_rescore_request(sqlite_engine, create_tables, async_sqlite_engine):
+    create_tables(Job, JobRelevance, RelevanceRollup)
+    ingest_feed(feed(job_item()), sqlite_engine)
+    ingest_feed(feed(job_item(title="Agent build (v2)")), sqlite_engine)
+
+    async def rescore():
+        async with AsyncSession(async_sqlite_engine, expire_on_commit=False) as db:
+            assert await load_rescore_queue(db) == ["a"]
+            await update_database_for_single_job(db, MatchScore(
+                job_id="a", score=0.8, category=RelevanceCategory.STRONG, reasoning="",
+            ))
+            assert await load_rescore_queue(db) == []
+
+    asyncio.run(rescore())
+    assert stored_job(sqlite_engine).rescore_requested_at is None
@@ -0,0 +1,154 @@
+import os
+import re
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.api.routes import job_listings
+from app.api.routes.job_listings import JobFilters, job_summary_select, page_select, relevance_summary_select
+from app.db.database import get_async_db
+from app.db.partitions import ensure_partitions
+from app.models.jobs import Base, Job, JobRelevance, Proposal, ProposalSetting
+from app.utils.response_cache import invalidate_job_listings
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+JOBS = [
+    # id, category, score, tags, country, engagement, client spent
+    ("a", "Strong", 0.95, "[]", "United States", "Full-time", 50000.0),
+    ("b", "Strong", 0.85, '["Agencies disallowed"]', "United States", "Part-time", 1000.0),
+    ("c", "Medium", 0.60, None, "Canada", "Full-time", 20000.0),
+    ("d", "Low", 0.35, "[]", "India", "Full-time", 0.0),
+]
+
+
+@pytest.fixture
+def client(sqlite_engine, create_tables, override_async_db):
+    create_tables(Job, JobRelevance, Proposal)
+    session = sessionmaker(bind=sqlite_engine)()
+    for i, (job_id, category, score, tags, country, engagement, spent) in enumerate(JOBS):
+        published = NOW - timedelta(hours=i)
+        session.add(Job(id=job_id, title=job_id, publishedDateTime=published, client_country=country,
+                        engagement=engagement, client_total_spent=spent))
+        session.add(JobRelevance(id=job_id, score=score, category=category, tags=tags, published_at=published))
+    session.commit()
+
+    app = FastAPI()
+    app.include_router(job_listings.router, prefix="/api/job-listings")
+    app.dependency_overrides[get_async_db] = override_async_db
+    invalidate_job_listings()
+    yield TestClient(app)
+    session.close()
+
+
+def ids(response):
+    assert response.status_code == 200, response.text
+    return [job["id"] for job in response.json()]
+
+
+def test_filters_combine_on_all_jobs(client):
+    assert ids(client.get("/api/job-listings/", params={"min_score": 0.5})) == ["a", "b", "c"]
+    assert ids(client.get("/api/job-listings/", params={"category": ["strong", "low"], "max_score": 0.9})) == ["b", "d"]
+    assert ids(client.get("/api/job-listings/", params={"country": "United States", "exclude_agencies_disallowed": True})) == ["a"]
+    assert ids(client.get("/api/job-listings/", params={"engagement": "Full-time", "min_client_spent": 10000})) == ["a", "c"]
+
+
+def test_filters_apply_to_relevance_listing(client):
+    assert ids(client.get("/api/job-listings/relevance/strong")) == ["a", "b"]
+    assert ids(client.get("/api/job-listings/relevance/strong", params={"exclude_agencies_disallowed": True})) == ["a"]
+    assert client.get("/api/job-listings/", params={"category": "great"}).status_code == 400
+
+
+def test_relevance_is_joined_on_the_partition_key():
+    sql = str(job_summary_select().compile(dialect=postgresql.dialect()))
+    assert ('LEFT OUTER JOIN job_relevance ON job_relevance.id = jobs.id '
+            'AND job_relevance.published_at = jobs."publishedDateTime"') in sql
+    relationship_join = str(Job.relevance.property.primaryjoin)
+    assert "published_at" in relationship_join and "publishedDateTime" in relationship_join
+
+
+# ---- Query plans (Postgres only, see conftest.py) --------------------------------
+
+PLAN_ROWS = 50_000
+
+
+@pytest.fixture(scope="module")
+def pg(pg_module_engine):
+    engine = pg_module_engine
+    Base.metadata.create_all(engine, tables=[Job.__table__, JobRelevance.__table__, ProposalSetting.__table__, Proposal.__table__])
+    with engine.begin() as conn:
+        ensure_partitions(conn, first_month=NOW - timedelta(minutes=PLAN_ROWS), months_ahead=0)
+        conn.execute(text(f"""
+            INSERT INTO jobs (id, title, description, "publishedDateTime", client_country, engagement, client_total_spent)
+            SELECT 'job-' || g, 'Job ' || g, repeat('python react api ', 50), now() - g * interval '1 minute',
+                   (ARRAY['United States', 'Canada', 'India', 'Germany'])[1 + g % 4],
+                   (ARRAY['Full-time', 'Part-time'])[1 + g % 2], (g % 1000) * 100
+            FROM generate_series(1, {PLAN_ROWS}) g
+        """))
+        conn.execute(text("""
+            INSERT INTO job_relevance (id, score, category, tags, published_at)
+            SELECT id, (abs(hashtext(id)) % 100) / 100.0,
+                   (ARRAY['Strong', 'Medium', 'Low', 'Irrelevant'])[1 + abs(hashtext(id)) % 4],
+                   '[]', "publishedDateTime"
+            FROM jobs
+        """))
+        conn.execute(text("ANALYZE jobs"))
+        conn.execute(text("ANALYZE job_relevance"))
+    return engine
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+
+def explain(engine, stmt) -> str:
+    with engine.connect() as conn:
+        return "\n".join(row[0] for row in conn.execute(Explain(stmt)))
+
+
+def has_sort_node(plan: str) -> bool:
+    # Merge Append prints a "Sort Key:" line too; only an actual Sort node means sorting.
+    return re.search(r"^\s*(->\s+)?Sort\s+\(", plan, re.M) is not None
+
+
+# The tables are partitioned by month, so the plans read each partition's copy of
+# the index (named <partition>_<columns>_idx) and merge them in order.
+
+def test_relevance_listing_reads_category_index_in_order(pg):
+    stmt, job = relevance_summary_select("postgresql")
+    stmt = JobFilters(min_score=0.5, country="Canada").apply(stmt.where(JobRelevance.category == "Strong"), job)
+    page = page_select(stmt, 150, None, order_columns=(JobRelevance.published_at, JobRelevance.id))
+    plan = explain(pg, page)
+
+    assert "category_published_at_id_idx" in plan
+    assert not has_sort_node(plan)
+    with pg.connect() as conn:
+        rows = conn.execute(page).mappings().all()
+    assert len(rows) == 151
+    assert {(row["relevance_category"], row["client_country"]) for row in rows} == {("Strong", "Canada")}
+    assert [row["publishedDateTime"] for row in rows] == sorted((row["publishedDateTime"] for row in rows), reverse=True)
+
+
+def test_all_jobs_listing_uses_published_index(pg):
+    stmt = JobFilters(country="Canada", engagement="Full-time").apply(job_summary_select())
+    plan = explain(pg, page_select(stmt, 200, None))
+
+    assert "publishedDateTime_id_idx" in plan
+    assert not has_sort_node(plan)
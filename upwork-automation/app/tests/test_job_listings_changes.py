@@ -0,0 +1,107 @@
+import os
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import job_listings
+from app.db.database import get_async_db
+from app.models.jobs import Job, JobRelevance, Proposal
+from app.utils.job_utils import ingest_items
+from app.utils.response_cache import LISTINGS_CACHE, invalidate_job_listings
+
+T0 = datetime(2025, 1, 10, 12, 0, 0)
+
+
+@pytest.fixture
+def session(sqlite_engine, create_tables):
+    create_tables(Job, JobRelevance, Proposal)
+    session = sessionmaker(bind=sqlite_engine)()
+    for i in range(3):
+        session.add(Job(id=f"job-{i}", title=f"Job {i}", publishedDateTime=T0, JobFirstFetchedDateTime=T0, updated_at=T0))
+        session.add(JobRelevance(id=f"job-{i}", score=0.9, category="Strong", updated_at=T0, published_at=T0))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(session, override_async_db):
+    app = FastAPI()
+    app.include_router(job_listings.router, prefix="/api/job-listings")
+    app.dependency_overrides[get_async_db] = override_async_db
+    invalidate_job_listings()
+    return TestClient(app)
+
+
+def test_relevance_listing_answers_304_until_something_changes(client, session):
+    first = client.get("/api/job-listings/relevance/strong")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and len(first.json()) == 3
+
+    assert client.get("/api/job-listings/relevance/strong", headers={"If-None-Match": etag}).status_code == 304
+
+    session.get(JobRelevance, ("job-1", T0)).updated_at = T0 + timedelta(minutes=1)
+    session.commit()
+    # Still served from the cache until the writer invalidates it.
+    assert client.get("/api/job-listings/relevance/strong", headers={"If-None-Match": etag}).status_code == 304
+    invalidate_job_listings()
+    refreshed = client.get("/api/job-listings/relevance/strong", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert LISTINGS_CACHE.metrics()["hits"] >= 2
+
+
+def test_changes_returns_only_new_or_rescored_jobs(client, session):
+    bootstrap = client.get("/api/job-listings/changes").json()
+    assert bootstrap["jobs"] == []
+    assert job_listings.decode_change_token(bootstrap["token"]) == (T0, None)
+
+    later = T0 + timedelta(minutes=5)
+    session.add(Job(id="job-new", title="New", publishedDateTime=later, JobFirstFetchedDateTime=later, updated_at=later))
+    session.get(JobRelevance, ("job-0", T0)).updated_at = later
+    session.commit()
+
+    # Start from a watermark past the overlap window of the seed rows.
+    token = job_listings.encode_change_token(T0 + timedelta(minutes=1))
+    body = client.get("/api/job-listings/changes", params={"since": token}).json()
+    assert sorted(job["id"] for job in body["jobs"]) == ["job-0", "job-new"]
+
+    strong_only = client.get("/api/job-listings/changes", params={"since": token, "relevance": "strong"}).json()
+    assert [job["id"] for job in strong_only["jobs"]] == ["job-0"]
+
+    caught_up = client.get("/api/job-listings/changes", params={"since": body["token"]}).json()
+    assert job_listings.decode_change_token(caught_up["token"])[0] == later
+
+
+def test_changes_pages_through_bursts(client):
+    token = job_listings.encode_change_token(T0 - timedelta(minutes=1))
+    seen = []
+    while True:
+        body = client.get("/api/job-listings/changes", params={"since": token, "limit": 2}).json()
+        seen.extend(job["id"] for job in body["jobs"])
+        token = body["token"]
+        if not body["has_more"]:
+            break
+    assert seen == ["job-0", "job-1", "job-2"]
+
+
+def test_reingested_edits_change_the_etag_and_show_in_changes(client, session, sqlite_engine):
+    first = client.get("/api/job-listings/relevance/strong")
+    # Past the overlap window of the seed rows, like a client that synced a while ago.
+    token = job_listings.encode_change_token(T0 + timedelta(minutes=1))
+
+    # The feed re-delivers job-1 with a new title: updated in place, not re-inserted.
+    item = {"id": "job-1", "title": "Job 1 (edited)", "publishedDateTime": T0.isoformat()}
+    assert ingest_items([item], sqlite_engine).updated == 1
+    invalidate_job_listings()
+
+    refreshed = client.get("/api/job-listings/relevance/strong", headers={"If-None-Match": first.headers["etag"]})
+    assert refreshed.status_code == 200
+    assert {job["id"]: job["title"] for job in refreshed.json()}["job-1"] == "Job 1 (edited)"
+    changes = client.get("/api/job-listings/changes", params={"since": token}).json()
+    assert [job["id"] for job in changes["jobs"]] == ["job-1"]
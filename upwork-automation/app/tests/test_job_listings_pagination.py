@@ -0,0 +1,92 @@
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.job_listings import (
+    DESCRIPTION_EXCERPT_CHARS, decode_cursor, encode_cursor, job_summary_select,
+    job_summary_dict, paginate_jobs,
+)
+from app.models.jobs import JOB_RELEVANCE_JOIN, Job, JobRelevance, Proposal
+from app.schemas.jobs import JobSummary
+
+
+@pytest.fixture
+def db(sqlite_engine, create_tables):
+    create_tables(Job, JobRelevance, Proposal)
+    session = sessionmaker(bind=sqlite_engine)()
+    now = datetime(2025, 1, 10, 12, 0, 0)
+    # Two jobs share a timestamp so the id tie-breaker is exercised.
+    for i in range(7):
+        published = now - timedelta(hours=i if i != 4 else 3)
+        session.add(Job(id=f"job-{i}", title=f"Job {i}", description="word " * 500, publishedDateTime=published))
+    session.add(JobRelevance(id="job-0", score=0.9, category="Strong", reasoning="long reasoning " * 100, published_at=now))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_cursor_round_trip():
+    published = datetime(2025, 1, 10, 12, 30, 5)
+    assert decode_cursor(encode_cursor(published, "~0123")) == (published, "~0123")
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def fetch_page(async_sqlite_engine, limit, cursor):
+    async def run():
+        async with AsyncSession(async_sqlite_engine) as session:
+            return await paginate_jobs(session, job_summary_select(), limit=limit, cursor=cursor)
+    return asyncio.run(run())
+
+
+def test_pages_cover_all_rows_once_in_stable_order(db, async_sqlite_engine):
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = fetch_page(async_sqlite_engine, limit=3, cursor=cursor)
+        seen.extend(row["id"] for row in page)
+        if cursor is None:
+            break
+
+    expected = [job.id for job in db.query(Job).order_by(Job.publishedDateTime.desc(), Job.id.desc())]
+    assert seen == expected
+    assert len(seen) == 7
+
+
+def test_cursor_comes_from_the_order_columns(db, async_sqlite_engine):
+    # Keyed on job_relevance, like the relevance listing; the cursor must not read the jobs columns.
+    stmt = select(Job.title).join(JobRelevance, JOB_RELEVANCE_JOIN)
+    order_columns = (JobRelevance.published_at, JobRelevance.id)
+    db.add(JobRelevance(id="job-1", score=0.5, category="Medium", published_at=datetime(2025, 1, 10, 11, 0, 0)))
+    db.commit()
+
+    async def run(cursor):
+        async with AsyncSession(async_sqlite_engine) as session:
+            return await paginate_jobs(session, stmt, limit=1, cursor=cursor, order_columns=order_columns)
+    first, cursor = asyncio.run(run(None))
+    assert decode_cursor(cursor) == (datetime(2025, 1, 10, 12, 0, 0), "job-0")
+    second, cursor = asyncio.run(run(cursor))
+    assert [row["title"] for row in first + second] == ["Job 0", "Job 1"] and cursor is None
+
+
+def test_summary_carries_excerpt_and_relevance_only(db, async_sqlite_engine):
+    rows, _ = fetch_page(async_sqlite_engine, limit=10, cursor=None)
+    summaries = {summary["id"]: summary for summary in map(job_summary_dict, rows)}
+
+    assert len(summaries["job-0"]["description"]) == DESCRIPTION_EXCERPT_CHARS
+    assert summaries["job-0"]["relevance"] == {"score": 0.9, "category": "Strong"}
+    assert summaries["job-1"]["relevance"] is None
+    # Same shape as the declared response model
+    assert JobSummary.model_validate(summaries["job-0"]).model_dump() == summaries["job-0"]
@@ -0,0 +1,35 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.api.routes.job_listings import job_search_select
+from app.models.jobs import Job
+
+
+def compile_pg(element) -> str:
+    return str(element.compile(dialect=postgresql.dialect()))
+
+
+def test_search_vector_is_generated_and_gin_indexed():
+    ddl = compile_pg(CreateTable(Job.__table__))
+    assert "search_vector TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('english', coalesce(title, '')), 'A')" in ddl
+
+    index = next(index for index in Job.__table__.indexes if index.name == "idx_jobs_search_vector")
+    assert "USING gin (search_vector)" in compile_pg(CreateIndex(index))
+
+
+def test_search_ranks_on_index_and_highlights_only_the_page():
+    compiled = job_search_select("supabase -wordpress", categories=["Strong", "Medium"], country="Canada", limit=20) \
+        .compile(dialect=postgresql.dialect())
+    outer, inner = str(compiled).split("JOIN (", 1)
+
+    assert "jobs.search_vector @@ websearch_to_tsquery(" in inner
+    assert "ts_rank_cd(jobs.search_vector" in inner
+    assert "job_relevance.category IN (" in inner
+    assert "LIMIT" in inner
+    assert "ts_headline" in outer and "ts_headline" not in inner
+    assert "supabase -wordpress" in compiled.params.values()
+    assert ["Strong", "Medium"] in compiled.params.values()
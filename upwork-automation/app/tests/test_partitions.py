@@ -0,0 +1,83 @@
+import os
+from datetime import date, datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import text
+
+from app.db.partitions import (
+    DEFAULT_PARTITION_SUFFIX, add_months, archive_partitions, convert_to_partitioned, ensure_partitions, is_partitioned,
+    list_partitions, month_start, partition_name,
+)
+from app.models.jobs import Base, Job, JobRelevance
+
+
+def test_month_arithmetic_and_names():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert month_start(datetime(2025, 3, 31, 23, 59)) == date(2025, 3, 1)
+    assert partition_name(Job.__table__, date(2025, 3, 1)) == "jobs_y2025m03"
+
+
+# ---- Postgres (see conftest.py) -------------------------------------------------
+
+@pytest.fixture
+def pg(pg_engine):
+    Base.metadata.create_all(pg_engine, tables=[Job.__table__, JobRelevance.__table__])
+    return pg_engine
+
+
+def test_rows_in_the_default_partition_move_when_their_month_is_created(pg):
+    old_month = add_months(month_start(datetime.utcnow()), -14)
+    with pg.begin() as conn:
+        ensure_partitions(conn, months_ahead=1)
+        conn.execute(text("""INSERT INTO jobs (id, "publishedDateTime") VALUES ('old', :published)"""),
+                     {"published": datetime.combine(old_month, datetime.min.time())})
+        assert conn.execute(text(f"SELECT count(*) FROM jobs{DEFAULT_PARTITION_SUFFIX}")).scalar() == 1
+
+        created = ensure_partitions(conn, first_month=old_month, months_ahead=1)
+        assert partition_name(Job.__table__, old_month) in created
+        assert conn.execute(text(f"SELECT count(*) FROM jobs{DEFAULT_PARTITION_SUFFIX}")).scalar() == 0
+        assert conn.execute(text(f"SELECT id FROM {partition_name(Job.__table__, old_month)}")).scalar() == "old"
+
+
+def test_archive_detaches_only_old_months(pg):
+    current = month_start(datetime.utcnow())
+    old_month = add_months(current, -14)
+    with pg.begin() as conn:
+        ensure_partitions(conn, first_month=old_month, months_ahead=1)
+        archive_schema = conn.execute(text("SELECT current_schema()")).scalar() + "_archive"
+        archived = archive_partitions(conn, older_than_months=12, schema=archive_schema)
+
+        assert partition_name(Job.__table__, old_month) in archived
+        assert partition_name(JobRelevance.__table__, old_month) in archived
+        remaining = {partition.name for partition in list_partitions(conn, Job.__table__)}
+        assert partition_name(Job.__table__, current) in remaining
+        assert partition_name(Job.__table__, old_month) not in remaining
+        assert conn.execute(text(f"SELECT to_regclass('{archive_schema}.{partition_name(Job.__table__, old_month)}')")).scalar()
+
+
+def test_convert_copies_tables_that_predate_the_newer_columns(pg):
+    with pg.begin() as conn:
+        conn.execute(text("DROP TABLE job_relevance, jobs"))
+        # Shape of the tables before partitioning: no skill_list, content_hash, published_at, updated_at...
+        conn.execute(text("""CREATE TABLE jobs (id text PRIMARY KEY, title text, "publishedDateTime" timestamp,
+                             "createdDateTime" timestamp, "JobFirstFetchedDateTime" timestamp DEFAULT now(),
+                             skills text, contractor_selection text, client_country text)"""))
+        conn.execute(text("""CREATE TABLE job_relevance (id text PRIMARY KEY REFERENCES jobs (id), score real NOT NULL,
+                             category text NOT NULL)"""))
+        conn.execute(text("""INSERT INTO jobs (id, title, "publishedDateTime", contractor_selection, client_country) VALUES
+                             ('a', 'A', '2025-01-05', '{"proposalRequirement": {}}', 'Canada'), ('b', 'B', NULL, NULL, NULL)"""))
+        conn.execute(text("INSERT INTO job_relevance (id, score, category) VALUES ('a', 0.9, 'Strong')"))
+
+        assert sorted(convert_to_partitioned(conn, months_ahead=1)) == ["job_relevance_unpartitioned", "jobs_unpartitioned"]
+        assert is_partitioned(conn, Job.__table__) and is_partitioned(conn, JobRelevance.__table__)
+        jobs = conn.execute(text("""SELECT id, title, contractor_selection, skill_list FROM jobs ORDER BY id""")).all()
+        # "b" has no publishedDateTime: left in jobs_unpartitioned rather than given a made-up key.
+        assert [(job.id, job.title, job.skill_list) for job in jobs] == [("a", "A", None)]
+        # Old JSON text becomes a JSON string; backfill_contractor_selection.py parses it.
+        assert jobs[0].contractor_selection == '{"proposalRequirement": {}}'
+        relevance = conn.execute(text("SELECT id, published_at, client_country, subcategory_label FROM job_relevance")).one()
+        # The rollup bucket comes from the job, which the old tables kept unchanged after scoring.
+        assert relevance == ("a", datetime(2025, 1, 5), "Canada", None)
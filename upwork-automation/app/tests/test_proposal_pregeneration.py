@@ -0,0 +1,143 @@
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import job_listings
+from app.db.database import get_async_db
+from app.models.jobs import Job, JobRelevance, Proposal
+from app.utils import proposal_pregeneration
+from app.utils.proposal_pregeneration import PREGENERATED_STATUS, ProposalPregenerator
+from app.utils.response_cache import invalidate_job_listings
+
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+@pytest.fixture
+def session(sqlite_engine, create_tables):
+    create_tables(Job, JobRelevance, Proposal)
+    session = sessionmaker(bind=sqlite_engine)()
+    rows = [
+        ("strong-new", "Strong", NOW),
+        ("strong-newer", "Strong", NOW + timedelta(minutes=1)),
+        ("strong-old", "Strong", NOW - timedelta(days=3)),
+        ("weak", "Weak", NOW),
+        ("strong-applied", "Strong", NOW),
+    ]
+    for job_id, category, scored_at in rows:
+        session.add(Job(id=job_id, title=job_id, publishedDateTime=NOW, JobFirstFetchedDateTime=NOW))
+        session.add(JobRelevance(id=job_id, score=0.9, category=category, updated_at=scored_at, published_at=NOW))
+    session.add(Proposal(job_id="strong-applied", proposal_text="Sent already", applied_at=NOW))
+    session.commit()
+    yield session
+    session.close()
+
+
+def pregenerator(async_sqlite_engine, generate, **kwargs):
+    worker = ProposalPregenerator(session_factory=lambda: AsyncSession(async_sqlite_engine), **kwargs)
+    worker.register(generate)
+    return worker
+
+
+def test_run_once_generates_for_recent_strong_jobs_without_a_proposal(session, async_sqlite_engine):
+    generated = []
+
+    async def generate(job_id):
+        generated.append(job_id)
+        return True
+
+    worker = pregenerator(async_sqlite_engine, generate, concurrency=1)
+    assert asyncio.run(worker.run_once()) == 2
+    assert generated == ["strong-newer", "strong-new"]
+    assert worker.metrics()["generated"] == 2
+
+    assert asyncio.run(ProposalPregenerator(session_factory=lambda: AsyncSession(async_sqlite_engine)).run_once()) == 0
+
+
+def test_failed_jobs_are_retried_up_to_max_attempts(session, async_sqlite_engine):
+    attempts = []
+
+    async def generate(job_id):
+        attempts.append(job_id)
+        if job_id == "strong-new":
+            raise RuntimeError("rate limited")
+        return False # stored by someone else meanwhile
+
+    worker = pregenerator(async_sqlite_engine, generate, max_attempts=2)
+    for _ in range(3):
+        asyncio.run(worker.run_once())
+    assert attempts.count("strong-new") == 2
+    assert attempts.count("strong-newer") == 3
+    metrics = worker.metrics()
+    assert (metrics["failed"], metrics["already_existed"], metrics["failing_jobs"]) == (2, 3, 1)
+
+
+def test_failures_older_than_the_lookback_window_are_forgotten(session, async_sqlite_engine):
+    async def generate(job_id):
+        raise RuntimeError("rate limited")
+
+    worker = pregenerator(async_sqlite_engine, generate, max_attempts=1, lookback_hours=24)
+    asyncio.run(worker.run_once())
+    assert worker.metrics()["failing_jobs"] == 2
+
+    worker._failures["strong-new"] = (1, NOW - timedelta(hours=25))
+    asyncio.run(worker.run_once())
+    # "strong-newer" is still excluded; "strong-new" got a new attempt.
+    assert set(worker._failures) == {"strong-new", "strong-newer"}
+    assert worker._failures["strong-new"][1] > NOW - timedelta(hours=1)
+    assert worker.metrics()["failed"] == 3
+
+
+def test_concurrency_is_bounded_and_interactive_requests_go_first(session, async_sqlite_engine, monkeypatch):
+    monkeypatch.setattr(proposal_pregeneration, "INTERACTIVE_POLL_SECONDS", 0.01)
+    running, peak = [], []
+
+    async def generate(job_id):
+        running.append(job_id)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.remove(job_id)
+        return True
+
+    worker = pregenerator(async_sqlite_engine, generate, concurrency=1)
+
+    async def run_during_interactive():
+        with worker.interactive("strong-applied"):
+            task = asyncio.create_task(worker.run_once())
+            await asyncio.sleep(0.05)
+            assert peak == [] # nothing starts while the user waits
+        return await task
+
+    assert asyncio.run(run_during_interactive()) == 2
+    assert max(peak) == 1
+    assert worker.metrics()["waited_for_interactive"] == 1
+    assert worker.metrics()["interactive_in_progress"] == 0
+
+
+def test_listing_flags_ready_proposals_and_changes_etag(session, override_async_db):
+    app = FastAPI()
+    app.include_router(job_listings.router, prefix="/api/job-listings")
+    app.dependency_overrides[get_async_db] = override_async_db
+    invalidate_job_listings()
+    client = TestClient(app)
+
+    first = client.get("/api/job-listings/relevance/strong")
+    ready = {job["id"]: job["proposal_ready"] for job in first.json()}
+    assert ready == {"strong-new": False, "strong-newer": False, "strong-old": False, "strong-applied": True}
+
+    session.add(Proposal(job_id="strong-new", proposal_text="Drafted", status=PREGENERATED_STATUS,
+                         applied_at=NOW + timedelta(minutes=5)))
+    session.commit()
+    invalidate_job_listings()
+    refreshed = client.get("/api/job-listings/relevance/strong", headers={"If-None-Match": first.headers["etag"]})
+    assert refreshed.status_code == 200
+    assert {job["id"] for job in refreshed.json() if job["proposal_ready"]} == {"strong-new", "strong-applied"}
+    assert session.scalars(select(Proposal.status).where(Proposal.job_id == "strong-new")).all() == [PREGENERATED_STATUS]
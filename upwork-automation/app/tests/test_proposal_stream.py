@@ -0,0 +1,209 @@
+import os
+import json
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import agentic_proposal_generator
+from app.db.database import get_async_db
+from app.models.jobs import Job, JobRelevance, Proposal, ProposalSetting
+from app.utils.node_timings import PROPOSAL_NODE_TIMINGS
+
+GENERATE_URL = "/api/agentic-proposals/agentic-generate-proposal/{}"
+STREAM_URL = GENERATE_URL + "/stream"
+PROJECT = {"doc_type": "project", "name": "Support RAG bot", "tech_stack": ["LangGraph"]}
+
+
+class FakeCompletions:
+    """chat.completions of an AsyncOpenAI client that streams `tokens`, then optionally fails."""
+    def __init__(self, tokens, fail: bool = False):
+        self.tokens = tokens
+        self.fail = fail
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+
+        async def chunks():
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None))]) # role chunk
+            for token in self.tokens:
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+            if self.fail:
+                raise RuntimeError("connection reset")
+            yield SimpleNamespace(choices=[]) # usage chunk
+        return chunks()
+
+
+def sse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def session(sqlite_engine, create_tables):
+    create_tables(Job, JobRelevance, ProposalSetting, Proposal)
+    session = sessionmaker(bind=sqlite_engine)()
+    session.add(Job(id="job-1", title="Build a RAG chatbot", description="LangGraph and FastAPI",
+                    publishedDateTime=datetime(2025, 3, 1),
+                    contractor_selection={"proposalRequirement": {"screeningQuestions": [{"question": "Similar work?"}]}}))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    completions = FakeCompletions(["Hi ", "there, ", "we built this before."])
+    monkeypatch.setattr(agentic_proposal_generator, "get_async_openai_client",
+                        lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return completions
+
+
+@pytest.fixture
+def client(session, override_async_db):
+    app = FastAPI()
+    app.include_router(agentic_proposal_generator.router, prefix="/api/agentic-proposals")
+    app.dependency_overrides[get_async_db] = override_async_db
+    return TestClient(app)
+
+
+def test_streams_tokens_then_saves_the_proposal(client, session, completions):
+    response = client.post(STREAM_URL.format("job-1"))
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = sse_events(response.text)
+    assert events[:-1] == [("token", {"text": "Hi "}), ("token", {"text": "there, "}),
+                           ("token", {"text": "we built this before."})]
+    assert events[-1] == ("done", {"job_id": "job-1", "proposal": "Hi there, we built this before.",
+                                   "exists": False, "overwritten": False})
+    prompt = completions.calls[0]["messages"][0]["content"]
+    assert completions.calls[0]["stream"] is True and "1. Similar work?" in prompt
+    assert session.scalars(select(Proposal.proposal_text)).all() == ["Hi there, we built this before."]
+
+    # Without overwrite the saved proposal comes back without generating again.
+    assert sse_events(client.post(STREAM_URL.format("job-1")).text) == [
+        ("done", {"job_id": "job-1", "proposal": "Hi there, we built this before.", "exists": True})
+    ]
+    assert len(completions.calls) == 1
+
+    completions.tokens = ["Second draft."]
+    events = sse_events(client.post(STREAM_URL.format("job-1"), params={"overwrite": True}).text)
+    assert events[-1][1]["overwritten"] is True
+    session.expire_all()
+    assert session.scalars(select(Proposal.proposal_text)).all() == ["Second draft."]
+
+
+def test_failed_stream_reports_an_error_and_saves_nothing(client, session, completions):
+    completions.fail = True
+    events = sse_events(client.post(STREAM_URL.format("job-1")).text)
+    assert [event for event, _ in events] == ["token", "token", "token", "error"]
+    assert "connection reset" in events[-1][1]["detail"]
+    assert session.scalars(select(Proposal)).all() == []
+
+
+def test_unknown_job_is_a_404_before_streaming(client, session, completions):
+    assert client.post(STREAM_URL.format("missing")).status_code == 404
+    assert completions.calls == []
+
+
+def test_generate_endpoint_runs_the_async_graph(client, session, completions):
+    before = PROPOSAL_NODE_TIMINGS.snapshot().get("generate_proposal", {}).get("count", 0)
+    assert client.post(GENERATE_URL.format("job-1")).json() == {"job_id": "job-1",
+                                                                 "proposal": "Hi there, we built this before."}
+    assert session.scalars(select(Proposal.proposal_text)).all() == ["Hi there, we built this before."]
+    timings = PROPOSAL_NODE_TIMINGS.snapshot()
+    assert {"get_job_details", "load_template", "retrieve_context", "retrieve_context_by_text",
+            "generate_proposal"} <= set(timings)
+    assert timings["generate_proposal"]["count"] == before + 1
+
+    completions.tokens, completions.fail = ["Half"], True
+    response = client.post(GENERATE_URL.format("job-1"), params={"overwrite": True})
+    assert response.status_code == 502 and "connection reset" in response.json()["detail"]
+    session.expire_all()
+    assert session.scalars(select(Proposal.proposal_text)).all() == ["Hi there, we built this before."]
+    assert client.post(GENERATE_URL.format("missing")).status_code == 404
+
+
+def test_no_transaction_is_open_while_the_model_generates(session, completions, async_sqlite_engine):
+    sessions, in_transaction = [], []
+
+    async def get_test_async_db():
+        async with AsyncSession(async_sqlite_engine, expire_on_commit=False) as db:
+            sessions.append(db)
+            yield db
+
+    create = completions.create
+
+    async def create_checking(**kwargs):
+        in_transaction.append(sessions[-1].in_transaction())
+        return await create(**kwargs)
+
+    completions.create = create_checking
+    app = FastAPI()
+    app.include_router(agentic_proposal_generator.router, prefix="/api/agentic-proposals")
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    client = TestClient(app)
+
+    assert client.post(GENERATE_URL.format("job-1")).status_code == 200
+    events = sse_events(client.post(STREAM_URL.format("job-1"), params={"overwrite": True}).text)
+    assert events[-1][1]["overwritten"] is True
+    assert in_transaction == [False, False]
+    session.expire_all()
+    assert session.scalars(select(Proposal.proposal_text)).all() == ["Hi there, we built this before."]
+
+
+class FakeIndex:
+    def __init__(self):
+        self.by_vector, self.by_text = [], []
+
+    def query_by_vector(self, vector, k):
+        self.by_vector.append(vector)
+        return [PROJECT]
+
+    def query(self, text, k):
+        self.by_text.append(text)
+        return [PROJECT]
+
+
+def test_retrieval_uses_the_stored_job_vector_alongside_the_template_load(client, session, completions, monkeypatch):
+    index = FakeIndex()
+    monkeypatch.setattr(agentic_proposal_generator, "GLOBAL_FAISS_MANAGER", index)
+    retrieving, loading = threading.Event(), threading.Event()
+
+    def get_vector(job_id):
+        retrieving.set()
+        assert loading.wait(5), "template load did not overlap retrieval"
+        return [0.1, 0.2] if job_id == "job-1" else None
+
+    def load_template(path):
+        loading.set()
+        assert retrieving.wait(5), "retrieval did not overlap the template load"
+        return "Hi {{client_name}}"
+
+    monkeypatch.setattr(agentic_proposal_generator, "get_job_embedding_store",
+                        lambda: SimpleNamespace(get_vector=get_vector))
+    monkeypatch.setattr(agentic_proposal_generator, "load_proposal_template", load_template)
+
+    assert sse_events(client.post(STREAM_URL.format("job-1")).text)[-1][0] == "done"
+    assert index.by_vector == [[0.1, 0.2]] and index.by_text == []
+    prompt = completions.calls[0]["messages"][0]["content"]
+    assert "Project: Support RAG bot" in prompt and "Hi {{client_name}}" in prompt
+
+    # Without a stored vector the job text is embedded once the job is loaded.
+    session.add(Job(id="job-2", title="Voice agent", description="Twilio", publishedDateTime=datetime(2025, 3, 2)))
+    session.commit()
+    retrieving.clear()
+    loading.clear()
+    assert client.post(GENERATE_URL.format("job-2")).status_code == 200
+    assert index.by_text == ["Job Title: Voice agent. Description: Twilio"]
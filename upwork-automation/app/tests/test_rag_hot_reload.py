@@ -0,0 +1,55 @@
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.api.routes.rag_relevance import EMBEDDING_DIM, FAISSIndexManager
+from app.utils.embeddings import EmbeddingService
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.inputs = []
+
+    def create(self, input, model, **kwargs):
+        self.inputs.append(list(input))
+        data = [SimpleNamespace(embedding=[float(len(text) % 7)] * EMBEDDING_DIM) for text in input]
+        return SimpleNamespace(data=data)
+
+
+def make_manager(tmp_path):
+    profile = tmp_path / "company_profile.md"
+    details = tmp_path / "company_details.md"
+    profile.write_text("# Company\nWe build LangGraph agents.\n\n## Stack\nSupabase and FastAPI.")
+    details.write_text("- name: Alice\n  skills: React\n- name: Bob\n  skills: Django")
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    manager = FAISSIndexManager(
+        embedding_service=EmbeddingService(client, max_wait_ms=0, cache_size=0),
+        profile_md_path=str(profile),
+        details_md_path=str(details),
+        rag_data_dir=str(tmp_path / "rag_data"),
+    )
+    return manager, client.embeddings, details
+
+
+def test_reload_is_noop_when_sources_unchanged(tmp_path):
+    manager, embeddings, _ = make_manager(tmp_path)
+    calls_after_build = len(embeddings.inputs)
+
+    assert manager.reload_if_changed() is False
+    assert len(embeddings.inputs) == calls_after_build
+
+
+def test_reload_swaps_snapshot_and_only_embeds_changed_chunks(tmp_path):
+    manager, embeddings, details = make_manager(tmp_path)
+    old_snapshot = manager._snapshot
+    old_chunk_count = len(old_snapshot.chunks_metadata)
+
+    details.write_text("- name: Alice\n  skills: React\n- name: Bob\n  skills: Django\n- name: Carol\n  skills: Rust")
+    embeddings.inputs.clear()
+
+    assert manager.reload_if_changed() is True
+    assert manager._snapshot is not old_snapshot
+    assert len(old_snapshot.chunks_metadata) == old_chunk_count
+    assert manager.index.ntotal == len(manager.chunks_metadata) == old_chunk_count + 1
+    assert embeddings.inputs == [["- name:Carol\n  skills: Rust"]]
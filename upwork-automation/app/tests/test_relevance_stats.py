@@ -0,0 +1,143 @@
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import stats
+from app.api.routes.agents.structures import MatchScore, RelevanceCategory
+from app.api.routes.rag_relevance import update_database_for_single_job
+from app.db.database import get_async_db
+from app.models.jobs import Job, JobRelevance, RelevanceRollup
+from app.utils.relevance_rollup import RollupContribution, rollup_change_statements
+
+DAY1 = datetime(2025, 3, 1, 9, 0)
+DAY2 = DAY1 + timedelta(days=1)
+
+JOBS = [
+    # id, published, country, subcategory
+    ("a", DAY1, "United States", "Web Development"),
+    ("b", DAY1, "United States", "Web Development"),
+    ("c", DAY2, "Canada", None),
+    ("d", DAY2, None, "Web Development"),
+]
+
+
+@pytest.fixture
+def client(sqlite_engine, create_tables, async_sqlite_engine, override_async_db):
+    create_tables(Job, JobRelevance, RelevanceRollup)
+    session = sessionmaker(bind=sqlite_engine)()
+    for job_id, published, country, subcategory in JOBS:
+        session.add(Job(id=job_id, title=job_id, publishedDateTime=published,
+                        client_country=country, subcategory_label=subcategory))
+    session.commit()
+    session.close()
+
+    def score(job_id, value, category):
+        async def run():
+            async with AsyncSession(async_sqlite_engine, expire_on_commit=False) as db:
+                await update_database_for_single_job(db, MatchScore(
+                    job_id=job_id, score=value, category=category, reasoning="",
+                ))
+        asyncio.run(run())
+
+    score("a", 0.9, RelevanceCategory.STRONG)
+    score("b", 0.5, RelevanceCategory.MEDIUM)
+    score("c", 0.8, RelevanceCategory.STRONG)
+    score("d", 0.2, RelevanceCategory.LOW)
+    # Re-scored: moves from Medium to Strong
+    score("b", 0.7, RelevanceCategory.STRONG)
+
+    app = FastAPI()
+    app.state.score = score
+    app.include_router(stats.router, prefix="/api/stats")
+    app.dependency_overrides[get_async_db] = override_async_db
+    return TestClient(app)
+
+
+def get_stats(client, **params):
+    response = client.get("/api/stats/relevance", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_strong_jobs_per_day(client):
+    body = get_stats(client, group_by="day", category="strong")
+    assert [(row["day"], row["jobs"]) for row in body["rows"]] == [("2025-03-01", 2), ("2025-03-02", 1)]
+    assert body["rows"][0]["avg_score"] == pytest.approx(0.8)
+    assert body["total_jobs"] == 3
+
+
+def test_rescoring_moves_the_job_between_buckets(client):
+    by_category = {row["category"]: row["jobs"] for row in get_stats(client, group_by="category")["rows"]}
+    # The emptied Medium bucket is not reported
+    assert by_category == {"Low": 1, "Strong": 3}
+
+
+def test_country_and_subcategory_groups(client):
+    by_country = {row["country"]: row["jobs"] for row in get_stats(client, group_by="country")["rows"]}
+    assert by_country == {None: 1, "Canada": 1, "United States": 2}
+
+    by_subcategory = {row["subcategory"]: row["avg_score"] for row in get_stats(client, group_by="subcategory")["rows"]}
+    assert by_subcategory[None] == pytest.approx(0.8)
+    assert by_subcategory["Web Development"] == pytest.approx((0.9 + 0.7 + 0.2) / 3)
+
+
+def test_rebuild_matches_incremental_maintenance(client, sqlite_engine):
+    def snapshot():
+        with sqlite_engine.connect() as conn:
+            rows = conn.execute(select(RelevanceRollup).where(RelevanceRollup.job_count > 0)).all()
+        return {row[:5]: pytest.approx(row[5]) for row in rows}
+
+    incremental = snapshot()
+    assert client.post("/api/stats/relevance/rebuild").json() == {"status": "rebuilt", "jobs": 4}
+    assert snapshot() == incremental
+
+
+def test_the_bucket_follows_the_last_score(client, sqlite_engine):
+    # The feed moves job "c" to another country; jobs is updated, the rollup is not.
+    with sqlite_engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == "c").values(client_country="Germany"))
+
+    def by_country():
+        return {row["country"]: row["jobs"] for row in get_stats(client, group_by="country")["rows"]}
+
+    assert by_country() == {None: 1, "Canada": 1, "United States": 2}
+    client.post("/api/stats/relevance/rebuild")
+    assert by_country() == {None: 1, "Canada": 1, "United States": 2}
+
+    client.app.state.score("c", 0.8, RelevanceCategory.STRONG)
+    assert by_country() == {None: 1, "Germany": 1, "United States": 2}
+
+
+def test_databases_without_on_conflict_get_portable_statements(sqlite_engine, create_tables):
+    create_tables(RelevanceRollup)
+    web = RollupContribution((DAY1.date(), "Medium", "", "Web Development"), 0.5)
+    moved = RollupContribution((DAY1.date(), "Strong", "", "Web Development"), 0.7)
+    other = RollupContribution((DAY2.date(), "Strong", "Canada", ""), 0.8)
+
+    with sqlite_engine.begin() as conn:
+        # "mysql" has no INSERT ... ON CONFLICT: buckets are created if missing, then updated.
+        for before, after in ((None, web), (None, other), (web, moved)):
+            for stmt in rollup_change_statements("mysql", before, after):
+                conn.execute(stmt)
+        rows = conn.execute(select(RelevanceRollup.category, RelevanceRollup.day, RelevanceRollup.job_count,
+                                   RelevanceRollup.score_sum)).all()
+    assert sorted(rows) == [
+        ("Medium", DAY1.date(), 0, pytest.approx(0.0)),
+        ("Strong", DAY1.date(), 1, pytest.approx(0.7)),
+        ("Strong", DAY2.date(), 1, pytest.approx(0.8)),
+    ]
+    assert rollup_change_statements("mysql", moved, moved) == []
+
+
+def test_invalid_group_by_is_rejected(client):
+    assert client.get("/api/stats/relevance", params={"group_by": "title"}).status_code == 400
+    assert client.get("/api/stats/relevance", params={"category": "great"}).status_code == 400
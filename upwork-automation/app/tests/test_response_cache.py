@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.response_cache import CachedResponse, ResponseCache
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResponseCache(ttl_seconds=60)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return CachedResponse(body=b"[]", headers={"ETag": 'W/"1"'})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("strong", compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while cache.metrics()["coalesced"] < 7:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result.body == b"[]" for result in results)
+    assert cache.get_or_compute("strong", compute).etag == 'W/"1"'
+    assert len(calls) == 1
+
+
+def test_invalidation_during_computation_is_not_cached():
+    cache = ResponseCache(ttl_seconds=60)
+    versions = iter([b"old", b"new"])
+
+    def compute_and_race_a_write():
+        body = next(versions)
+        if body == b"old":
+            cache.invalidate()
+        return CachedResponse(body=body)
+
+    assert cache.get_or_compute("all", compute_and_race_a_write).body == b"old"
+    assert cache.get_or_compute("all", compute_and_race_a_write).body == b"new"
+
+
+def test_errors_propagate_and_are_not_cached():
+    cache = ResponseCache(ttl_seconds=60)
+
+    def failing():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("all", failing)
+    assert cache.get_or_compute("all", lambda: CachedResponse(body=b"ok")).body == b"ok"
+
+
+def test_concurrent_async_misses_share_one_computation():
+    cache = ResponseCache(ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return CachedResponse(body=b"[]")
+
+    async def run():
+        results = await asyncio.gather(*(cache.aget_or_compute("strong", compute) for _ in range(8)))
+        cached = await cache.aget_or_compute("strong", compute)
+        return results, cached
+
+    results, cached = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result.body == b"[]" for result in results) and cached.body == b"[]"
+    assert cache.metrics()["coalesced"] == 7 and cache.metrics()["hits"] == 1
+
+
+def test_async_errors_reach_every_waiter():
+    cache = ResponseCache(ttl_seconds=60)
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_compute("all", failing) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+    assert cache.metrics()["in_flight"] == 0
+
+
+def test_followers_take_over_from_a_cancelled_leader():
+    cache = ResponseCache(ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return CachedResponse(body=b"[]")
+
+    async def run():
+        leader = asyncio.create_task(cache.aget_or_compute("strong", compute))
+        await asyncio.sleep(0.01)
+        followers = asyncio.gather(*(cache.aget_or_compute("strong", compute) for _ in range(3)))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return leader, await followers
+
+    leader, results = asyncio.run(run())
+    assert leader.cancelled()
+    assert [result.body for result in results] == [b"[]"] * 3
+    assert len(calls) == 2 and cache.metrics()["in_flight"] == 0
@@ -0,0 +1,43 @@
+import os
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import inspect, text
+
+from app.db.schema_upgrades import UPGRADES, missing_columns, upgrade_schema
+
+
+def test_upgrades_match_the_model():
+    for upgrade in UPGRADES:
+        assert upgrade.column in upgrade.table.c
+        indexes = {index.name: index for index in upgrade.table.indexes}
+        for name in upgrade.indexes:
+            assert upgrade.column in indexes[name].columns
+
+
+# ---- Postgres (see conftest.py) -------------------------------------------------
+
+def test_upgrade_adds_missing_columns_and_indexes(pg_engine):
+    # The tables as an old version created them: unpartitioned, without the newer columns.
+    with pg_engine.begin() as conn:
+        conn.execute(text('CREATE TABLE jobs (id text PRIMARY KEY, "publishedDateTime" timestamp, '
+                          'title text, skills text, description text, client_country text, subcategory_label text)'))
+        conn.execute(text("CREATE TABLE job_relevance (id text PRIMARY KEY REFERENCES jobs (id), "
+                          "score real NOT NULL, category text NOT NULL)"))
+        conn.execute(text("INSERT INTO jobs VALUES ('a', '2025-03-01 09:00', 'RAG chatbot', 'Python', 'LangGraph', "
+                          "'Canada', 'AI Apps')"))
+        conn.execute(text("INSERT INTO job_relevance VALUES ('a', 0.9, 'Strong')"))
+        assert len(missing_columns(conn)) == len(UPGRADES)
+
+    with pg_engine.begin() as conn:
+        assert len(upgrade_schema(conn)) == len(UPGRADES)
+        assert upgrade_schema(conn) == []
+        assert missing_columns(conn) == []
+        row = conn.execute(text("SELECT r.published_at, r.client_country, r.subcategory_label, "
+                                "j.search_vector @@ to_tsquery('english', 'chatbot') "
+                                "FROM job_relevance r JOIN jobs j ON j.id = r.id")).one()
+        assert tuple(row) == (datetime(2025, 3, 1, 9, 0), "Canada", "AI Apps", True)
+
+    indexes = {index["name"] for table in ("jobs", "job_relevance") for index in inspect(pg_engine).get_indexes(table)}
+    assert {name for upgrade in UPGRADES for name in upgrade.indexes} <= indexes
@@ -0,0 +1,43 @@
+import os
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.job_listings import JobFilters, job_summary_select, skill_frequency_select
+from app.models.jobs import Job
+from app.utils.skills import parse_skills
+
+
+def test_parse_delimited_and_json_skills():
+    assert parse_skills("Python, LangChain ,  langchain; React|Next.js") == ["python", "langchain", "react", "next.js"]
+    assert parse_skills('[{"prettyName": "Machine  Learning"}, "FastAPI", {"id": 3}]') == ["machine learning", "fastapi"]
+    assert parse_skills("[not json, Docker]") == ["[not json", "docker]"]
+    assert parse_skills(None) == [] and parse_skills("  ") == []
+
+
+def test_skill_list_follows_skills(sqlite_engine, create_tables):
+    create_tables(Job)
+    session = sessionmaker(bind=sqlite_engine)()
+    job = Job(id="a", publishedDateTime=datetime(2025, 1, 1), skills="Python, FastAPI")
+    session.add(job)
+    session.commit()
+    job.skills = "LangChain"
+    session.commit()
+    session.expire_all()
+    assert session.get(Job, ("a", datetime(2025, 1, 1))).skill_list == ["langchain"]
+    session.close()
+
+
+def test_skill_queries_use_array_containment():
+    dialect = postgresql.dialect()
+    filtered = JobFilters(skills=("langchain", "python")).apply(job_summary_select()).compile(dialect=dialect)
+    assert "jobs.skill_list @> " in str(filtered)
+    assert ["langchain", "python"] in filtered.params.values()
+
+    frequency = str(skill_frequency_select(["Strong"], ["langchain"], None, datetime(2025, 1, 1), 20).compile(dialect=dialect))
+    assert "unnest(jobs.skill_list) AS job_skill(skill)" in frequency
+    assert "jobs.skill_list @> " in frequency
+    assert "GROUP BY job_skill.skill" in frequency
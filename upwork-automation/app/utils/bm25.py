@@ -0,0 +1,75 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+# Keeps tech names like "node.js", "c++", "c#" and "gpt-4o" as single tokens so
+# exact matches on them are not diluted by splitting on punctuation.
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.+#\-][a-z0-9+#]+)*[+#]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into keyword tokens for BM25 scoring."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Small in-memory Okapi BM25 scorer over an inverted index.
+
+    Built from the same chunk texts as the FAISS index so that positions line up:
+    document i here is chunk i in the FAISS index and metadata list.
+    """
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.num_docs = len(documents)
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        for doc_id, document in enumerate(documents):
+            term_counts = Counter(tokenize(document))
+            self.doc_lengths.append(sum(term_counts.values()))
+            for term, count in term_counts.items():
+                self.postings[term].append((doc_id, count))
+
+        self.avg_doc_length = (sum(self.doc_lengths) / self.num_docs) if self.num_docs else 0.0
+        self.idf: Dict[str, float] = {
+            term: math.log(1 + (self.num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query_text: str, k: int) -> List[Tuple[int, float]]:
+        """Return up to k (doc_id, score) pairs with a positive score, best first."""
+        if not self.num_docs or k <= 0:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query_text)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc_id, term_freq in postings:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_doc_length or 1.0)
+                scores[doc_id] += idf * term_freq * (self.k1 + 1) / (term_freq + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:k]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int, rrf_k: int = 60) -> List[Tuple[int, float]]:
+    """
+    Fuse several ranked lists of doc ids with Reciprocal Rank Fusion.
+
+    Each list contributes 1 / (rrf_k + rank) per document, so documents ranked
+    well by both the dense and the keyword retriever float to the top.
+    """
+    fused: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] += 1.0 / (rrf_k + rank)
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return ranked[:k]
@@ -0,0 +1,62 @@
+import json
+from typing import Any, Dict, List, Optional
+
+# Feeds deliver contractorSelection as a JSON object:
+# {"proposalRequirement": {"coverLetterRequired": ..., "screeningQuestions": [{"question": ...}, ...]}, ...}
+QUESTION_KEYS = ("question", "text")
+# Where the Connects price of a proposal shows up, first match wins.
+CONNECTS_KEYS = ("connectPrice", "connectsRequired", "requiredConnects")
+
+
+def parse_contractor_selection(raw: Any) -> Any:
+    """
+    JSON value stored in Job.contractor_selection: objects pass through, JSON
+    text is decoded, and text that is not JSON is kept as a JSON string.
+    """
+    if isinstance(raw, (dict, list)):
+        return raw
+    if not isinstance(raw, str) or not raw.strip():
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def _proposal_requirement(selection: Any) -> Dict[str, Any]:
+    if not isinstance(selection, dict):
+        return {}
+    requirement = selection.get("proposalRequirement")
+    return requirement if isinstance(requirement, dict) else {}
+
+
+def screening_questions(selection: Any) -> List[str]:
+    """Screening question texts of a parsed contractor_selection, in order."""
+    questions = []
+    for entry in _proposal_requirement(selection).get("screeningQuestions") or ():
+        if isinstance(entry, dict):
+            entry = next((entry[key] for key in QUESTION_KEYS if entry.get(key)), None)
+        if isinstance(entry, str) and entry.strip():
+            questions.append(entry.strip())
+    return questions
+
+
+def required_connects(selection: Any) -> Optional[int]:
+    for source in (_proposal_requirement(selection), selection if isinstance(selection, dict) else {}):
+        for key in CONNECTS_KEYS:
+            value = source.get(key)
+            if isinstance(value, dict): # {"amount": 16}
+                value = value.get("amount")
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+def selection_summary(selection: Any) -> Dict[str, Any]:
+    """The indexed jobs columns derived from a parsed contractor_selection (all null without one)."""
+    if selection is None:
+        return {"has_questions": None, "question_count": None, "required_connects": None}
+    count = len(screening_questions(selection))
+    return {"has_questions": count > 0, "question_count": count, "required_connects": required_connects(selection)}
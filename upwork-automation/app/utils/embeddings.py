@@ -0,0 +1,276 @@
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import openai
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+NATIVE_EMBEDDING_DIM = 1536
+# OpenAI accepts at most 2048 inputs and ~300k tokens per embeddings request.
+MAX_BATCH_INPUTS = 2048
+MAX_BATCH_TOKENS = 250_000
+# How long the worker waits for more requests to join a batch once one arrived.
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_CACHE_SIZE = 4096
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-bound token estimate (~3 chars per token) used only for batch sizing."""
+    return len(text) // 3 + 1
+
+
+@dataclass
+class _EmbeddingRequest:
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+
+
+class EmbeddingService:
+    """
+    Process-wide embedding client that coalesces concurrent requests.
+
+    Callers from any thread (sync routes, FAISS managers) use `embed`; coroutines use
+    `aembed`. Requests are queued, and a single worker thread waits up to
+    `max_wait_ms` for more to arrive, merges their texts (deduplicated) into as few
+    `embeddings.create` calls as the API limits allow, and resolves every caller's
+    future with its own rows. An LRU cache short-circuits texts seen before.
+    """
+    def __init__(self, client: openai.OpenAI, model: str = OPENAI_EMBEDDING_MODEL,
+                 dimensions: Optional[int] = None,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+                 max_batch_inputs: int = MAX_BATCH_INPUTS,
+                 max_batch_tokens: int = MAX_BATCH_TOKENS,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.client = client
+        self.model = model
+        # None (or the native size) requests full vectors; smaller values use the
+        # API's `dimensions` parameter to return shortened, re-normalized vectors.
+        self.dimensions = dimensions if dimensions and dimensions != NATIVE_EMBEDDING_DIM else None
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_inputs = max_batch_inputs
+        self.max_batch_tokens = max_batch_tokens
+        self.cache_size = cache_size
+
+        self._queue: "queue.Queue[_EmbeddingRequest]" = queue.Queue()
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "texts_requested": 0,
+            "cache_hits": 0,
+            "api_calls": 0,
+            "texts_embedded": 0,
+            "api_errors": 0,
+            "api_seconds": 0.0,
+        }
+
+    # ---- public API -------------------------------------------------------
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Blocking call returning a float32 array with one row per input text."""
+        return self.submit(texts).result()
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for embedding and return a future resolving to their vectors."""
+        texts = list(texts)
+        self._count(requests=1, texts_requested=len(texts))
+
+        cached = self._cache_lookup(texts)
+        if cached is not None:
+            done: Future = Future()
+            done.set_result(cached)
+            return done
+
+        request = _EmbeddingRequest(texts=texts)
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["cache_entries"] = len(self._cache)
+        stats["avg_texts_per_api_call"] = (
+            stats["texts_embedded"] / stats["api_calls"] if stats["api_calls"] else 0.0
+        )
+        return stats
+
+    def _count(self, **increments: float):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    # ---- cache ------------------------------------------------------------
+
+    def _cache_lookup(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Return all vectors if every text is cached, else None."""
+        if not self.cache_size or not texts:
+            return None
+        with self._cache_lock:
+            vectors = []
+            for text in texts:
+                vector = self._cache.get(text)
+                if vector is None:
+                    return None
+                self._cache.move_to_end(text)
+                vectors.append(vector)
+        self._count(cache_hits=len(texts))
+        return np.array(vectors, dtype="float32")
+
+    def _cache_store(self, vectors: Dict[str, np.ndarray]):
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            for text, vector in vectors.items():
+                self._cache[text] = vector
+                self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ---- worker -----------------------------------------------------------
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-coalescer", daemon=True)
+                self._worker.start()
+
+    def _collect_batch(self) -> List[_EmbeddingRequest]:
+        """Block for the first request, then gather more until the wait window or API limits are hit."""
+        first = self._queue.get()
+        batch = [first]
+        inputs = len(first.texts)
+        tokens = sum(estimate_tokens(t) for t in first.texts)
+        deadline = time.monotonic() + self.max_wait
+
+        while inputs < self.max_batch_inputs and tokens < self.max_batch_tokens:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            inputs += len(request.texts)
+            tokens += sum(estimate_tokens(t) for t in request.texts)
+        return batch
+
+    def _split_for_api(self, texts: List[str]) -> List[List[str]]:
+        slices: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for text in texts:
+            text_tokens = estimate_tokens(text)
+            if current and (len(current) >= self.max_batch_inputs or current_tokens + text_tokens > self.max_batch_tokens):
+                slices.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += text_tokens
+        if current:
+            slices.append(current)
+        return slices
+
+    def _call_api(self, texts: List[str]) -> np.ndarray:
+        started = time.perf_counter()
+        try:
+            if self.dimensions:
+                response = self.client.embeddings.create(input=texts, model=self.model, dimensions=self.dimensions)
+            else:
+                response = self.client.embeddings.create(input=texts, model=self.model)
+        except Exception:
+            self._count(api_errors=1, api_seconds=time.perf_counter() - started)
+            raise
+        self._count(api_calls=1, texts_embedded=len(texts), api_seconds=time.perf_counter() - started)
+        return np.array([item.embedding for item in response.data]).astype("float32")
+
+    @staticmethod
+    def _resolve(request: _EmbeddingRequest, result: Optional[np.ndarray] = None,
+                 error: Optional[BaseException] = None):
+        # One request failing to resolve must not take the worker or the rest of the batch down.
+        try:
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(result)
+        except InvalidStateError:
+            logger.debug("Embedding request was resolved or cancelled elsewhere; dropping its result.")
+
+    def _run(self):
+        while True:
+            # Callers cancelled while queued (e.g. an aembed() task) are dropped; the
+            # rest are marked running, so they can no longer be cancelled under us.
+            batch = [request for request in self._collect_batch() if request.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            unique_texts = list(dict.fromkeys(text for request in batch for text in request.texts))
+            try:
+                vectors: Dict[str, np.ndarray] = {}
+                for api_slice in self._split_for_api(unique_texts):
+                    embedded = self._call_api(api_slice)
+                    vectors.update(zip(api_slice, embedded))
+                self._cache_store(vectors)
+            except Exception as e:
+                logger.error(f"Error getting embeddings from OpenAI for {len(unique_texts)} texts: {e}")
+                for request in batch:
+                    self._resolve(request, error=e)
+                continue
+
+            if len(batch) > 1:
+                logger.debug(f"Coalesced {len(batch)} embedding requests into one batch of {len(unique_texts)} texts.")
+            for request in batch:
+                self._resolve(request, np.array([vectors[t] for t in request.texts], dtype="float32"))
+
+
+def truncate_embeddings(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """
+    Shorten full-size text-embedding-3 vectors locally the way the API's
+    `dimensions` parameter does: keep the first `dim` components and L2-normalize.
+    """
+    shortened = np.ascontiguousarray(vectors[:, :dim], dtype="float32")
+    norms = np.linalg.norm(shortened, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return shortened / norms
+
+
+_SHARED_SERVICE: Optional[EmbeddingService] = None
+_SHARED_SERVICE_LOCK = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Return the process-wide EmbeddingService, creating its OpenAI client on first use."""
+    global _SHARED_SERVICE
+    if _SHARED_SERVICE is None:
+        with _SHARED_SERVICE_LOCK:
+            if _SHARED_SERVICE is None:
+                api_key = os.getenv("OPEN_AI_KEY")
+                if not api_key:
+                    raise ValueError("No OpenAI API key found in environment variables (OPEN_AI_KEY).")
+                _SHARED_SERVICE = EmbeddingService(openai.OpenAI(api_key=api_key), dimensions=settings.EMBEDDING_DIMENSIONS)
+    return _SHARED_SERVICE
+
+
+def get_embedding_service_if_ready() -> Optional[EmbeddingService]:
+    """Return the shared service only if it has already been created (for metrics)."""
+    return _SHARED_SERVICE
@@ -0,0 +1,191 @@
+"""
+Concurrent fetching of the paginated job feed.
+
+One aiohttp session (and its keep-alive connection pool) is shared by every
+fetch. Pages are requested `concurrency` at a time, newest first, and
+pagination stops at the first page that is unchanged since the last fetch
+(conditional request answered with 304), shorter than a full page, or that
+contains a job already seen. Seen job ids are seeded from the database once and
+kept in memory; validators and seen ids are only recorded once a page has been
+ingested, so a failed write is retried on the next fetch.
+"""
+import io
+import asyncio
+import logging
+import threading
+import urllib.parse
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.jobs import Job
+from app.utils.job_utils import iter_feed_items
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeedPage:
+    page: int
+    url: str
+    not_modified: bool = False
+    items: List[Dict[str, str]] = field(default_factory=list)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    new_items: int = 0 # items whose job id was not seen before
+    reached_seen: bool = False
+
+
+def parse_feed_items(body: bytes) -> List[Dict[str, str]]:
+    return list(iter_feed_items(io.BytesIO(body)))
+
+
+class SeenJobIds:
+    """Insertion-ordered set of job ids, capped at `max_size` (oldest dropped first)."""
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add_all(self, job_ids: Iterable[str]):
+        for job_id in job_ids:
+            if job_id:
+                self._ids[job_id] = None
+                self._ids.move_to_end(job_id)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+
+class FeedFetcher:
+    def __init__(self, base_url: str, concurrency: int = 4, timeout_seconds: float = 60.0, max_seen_ids: int = 20000):
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.timeout_seconds = timeout_seconds
+        self.seen = SeenJobIds(max_seen_ids)
+        self._seeded = False
+        self._validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._stats = {"requests": 0, "not_modified": 0, "pages": 0, "items": 0}
+
+    def page_url(self, page: int, limit: int) -> str:
+        """base_url with the page and limit query parameters set."""
+        parsed_url = urllib.parse.urlparse(self.base_url)
+        query_params = urllib.parse.parse_qs(parsed_url.query)
+        query_params["page"] = [str(page)]
+        query_params["limit"] = [str(limit)]
+        return urllib.parse.urlunparse(parsed_url._replace(query=urllib.parse.urlencode(query_params, doseq=True)))
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created on first use so it belongs to the running event loop.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def seed_seen_ids(self, db: AsyncSession):
+        """Load the ids of the most recently published jobs, once per process."""
+        if self._seeded:
+            return
+        job_ids = (await db.execute(
+            select(Job.id).order_by(Job.publishedDateTime.desc(), Job.id.desc()).limit(self.seen.max_size)
+        )).scalars().all()
+        self.seen.add_all(reversed(job_ids))
+        self._seeded = True
+        logger.info(f"Feed fetcher seeded with {len(job_ids)} known job ids.")
+
+    async def fetch_page(self, page: int, limit: int) -> FeedPage:
+        url = self.page_url(page, limit)
+        etag, last_modified = self._validators.get(url, (None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async with self._get_session().get(url, headers=headers) as response:
+            self._stats["requests"] += 1
+            if response.status == 304:
+                self._stats["not_modified"] += 1
+                return FeedPage(page, url, not_modified=True, etag=etag, last_modified=last_modified)
+            response.raise_for_status()
+            body = await response.read()
+            feed_page = FeedPage(page, url, etag=response.headers.get("ETag"),
+                                 last_modified=response.headers.get("Last-Modified"))
+
+        feed_page.items = await asyncio.to_thread(parse_feed_items, body)
+        for item in feed_page.items:
+            if item.get("id") in self.seen:
+                feed_page.reached_seen = True
+            else:
+                feed_page.new_items += 1
+        self._stats["pages"] += 1
+        self._stats["items"] += len(feed_page.items)
+        return feed_page
+
+    async def iter_new_pages(self, first_page: int = 1, limit: int = 100,
+                             max_pages: int = 10) -> AsyncIterator[FeedPage]:
+        """
+        Yield changed pages in order, fetching up to `concurrency` of them at a
+        time, until a page is unchanged, short, or reaches an already seen job.
+        """
+        last_page = first_page + max_pages - 1
+        page = first_page
+        while page <= last_page:
+            wave = range(page, min(page + self.concurrency, last_page + 1))
+            fetched = await asyncio.gather(*(self.fetch_page(number, limit) for number in wave))
+            for feed_page in fetched:
+                if feed_page.not_modified:
+                    return
+                yield feed_page
+                if feed_page.reached_seen or len(feed_page.items) < limit:
+                    return
+            page = wave.stop
+
+    def mark_ingested(self, feed_page: FeedPage):
+        """Remember the page's validators and job ids once its jobs are saved."""
+        if feed_page.etag or feed_page.last_modified:
+            self._validators[feed_page.url] = (feed_page.etag, feed_page.last_modified)
+        self.seen.add_all(item.get("id") for item in reversed(feed_page.items))
+
+    def metrics(self) -> Dict[str, int]:
+        return {**self._stats, "seen_ids": len(self.seen), "validators": len(self._validators)}
+
+
+_FETCHER: Optional[FeedFetcher] = None
+_FETCHER_LOCK = threading.Lock()
+
+
+def get_feed_fetcher() -> FeedFetcher:
+    global _FETCHER
+    if _FETCHER is None:
+        with _FETCHER_LOCK:
+            if _FETCHER is None:
+                _FETCHER = FeedFetcher(
+                    settings.RSS_FEED_URL or "",
+                    concurrency=settings.FEED_FETCH_CONCURRENCY,
+                    timeout_seconds=settings.FEED_TIMEOUT_SECONDS,
+                    max_seen_ids=settings.FEED_SEEN_IDS,
+                )
+    return _FETCHER
+
+
+async def close_feed_fetcher():
+    if _FETCHER is not None:
+        await _FETCHER.close()
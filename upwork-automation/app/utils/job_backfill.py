@@ -0,0 +1,211 @@
+"""
+Bulk loading of historical job exports (JSONL, CSV or Parquet) into jobs.
+
+The file is read in chunks, so memory stays flat whatever its size. Each chunk
+is mapped onto the Job columns and typed with the same vectorized coercion as
+feed ingestion (coerce_job_frame). On Postgres it is COPYed into a temporary
+staging table and merged into jobs with one INSERT ... SELECT ... ON CONFLICT
+(the same change detection as feed ingestion), one transaction per chunk.
+Other databases (SQLite in tests) fall back to the multi-row upserts of feed
+ingestion, or to multi-row INSERT ... ON CONFLICT DO NOTHING when existing
+jobs are skipped. Months without a partition are created before their rows
+are merged, so history does not pile up in the default partition.
+"""
+import io
+import re
+import csv
+import json
+import time
+import logging
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+from sqlalchemy import column, select, table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.partitions import ensure_partitions, is_partitioned, month_start
+from app.utils.job_utils import (
+    FEED_COLUMN_TYPES, JOBS, KEY_COLUMNS, MAX_BIND_PARAMS, coerce_job_frame, frame_rows, on_conflict_update,
+    write_job_rows
+)
+from app.utils.relevance_rollup import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+SOURCE_FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".csv": "csv", ".parquet": "parquet"}
+STAGING_TABLE = "jobs_backfill_staging"
+ON_CONFLICT_ACTIONS = ("update", "skip")
+
+
+def _column_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+# Source columns match Job columns ignoring case and separators: published_date_time -> publishedDateTime.
+JOB_COLUMN_KEYS: Dict[str, str] = {_column_key(name): name for name in FEED_COLUMN_TYPES}
+
+
+@dataclass
+class BackfillResult:
+    rows_read: int = 0
+    rows_loaded: int = 0
+    skipped: int = 0 # rows without an id or a publishedDateTime
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+
+def source_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    # data.jsonl.gz, data.csv.gz: pandas decompresses by extension
+    for suffix in reversed([s for s in suffixes if s not in (".gz", ".bz2", ".zst", ".xz")]):
+        if suffix in SOURCE_FORMATS:
+            return SOURCE_FORMATS[suffix]
+    raise ValueError(f"Cannot tell the format of {path}; pass one of {sorted(set(SOURCE_FORMATS.values()))}")
+
+
+def iter_source_chunks(path: str, chunk_size: int, fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Raw DataFrames of at most `chunk_size` rows; values are left for coerce_job_frame to type."""
+    fmt = source_format(path, fmt)
+    if fmt == "jsonl":
+        with pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False) as reader:
+            yield from reader
+    elif fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Loading Parquet files needs pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def map_source_columns(frame: pd.DataFrame, column_map: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Rename source columns to Job columns: explicit `column_map` first, then by normalized name."""
+    column_map = column_map or {}
+    renamed = {}
+    for name in frame.columns:
+        target = column_map.get(name) or JOB_COLUMN_KEYS.get(_column_key(str(name)))
+        if target and target not in renamed.values():
+            renamed[name] = target
+    return frame[list(renamed)].rename(columns=renamed)
+
+
+def _array_literal(values) -> Optional[str]:
+    if values is None:
+        return None
+    quoted = ('"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values)
+    return "{" + ",".join(quoted) + "}"
+
+
+def copy_csv(frame: pd.DataFrame) -> io.StringIO:
+    """`frame` as COPY ... (FORMAT csv) input: nulls unquoted and empty, arrays as Postgres literals, JSON as text."""
+    if "skill_list" in frame.columns:
+        frame = frame.assign(skill_list=frame["skill_list"].map(_array_literal, na_action="ignore"))
+    if "contractor_selection" in frame.columns:
+        frame = frame.assign(contractor_selection=frame["contractor_selection"].map(json.dumps, na_action="ignore"))
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f", quoting=csv.QUOTE_MINIMAL)
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_into(conn: Connection, table: str, columns: List[str], buffer: io.StringIO):
+    quote = conn.dialect.identifier_preparer.quote
+    sql = f"COPY {quote(table)} ({', '.join(map(quote, columns))}) FROM STDIN WITH (FORMAT csv)"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"): # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else: # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def merge_statement(columns: List[str], on_conflict: str = "update"):
+    """INSERT ... SELECT from the staging table into jobs, resolving existing jobs per `on_conflict`."""
+    staging = table(STAGING_TABLE, *(column(name) for name in columns))
+    stmt = postgresql.insert(JOBS).from_select(columns, select(*staging.c))
+    if on_conflict == "skip":
+        return stmt.on_conflict_do_nothing(index_elements=[JOBS.c[name] for name in KEY_COLUMNS])
+    return on_conflict_update(stmt, columns)
+
+
+def copy_and_merge(conn: Connection, frame: pd.DataFrame, on_conflict: str = "update") -> int:
+    """COPY one chunk into the staging table and merge it into jobs; returns the rows inserted or changed."""
+    columns = list(frame.columns)
+    quote = conn.dialect.identifier_preparer.quote
+    # Lives as long as the connection and is emptied on every commit; temp tables skip WAL.
+    conn.exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS {quote(STAGING_TABLE)} "
+        f"(LIKE {quote(JOBS.name)} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    _copy_into(conn, STAGING_TABLE, columns, copy_csv(frame))
+    return conn.execute(merge_statement(columns, on_conflict)).rowcount
+
+
+def _upsert_rows(conn: Connection, frame: pd.DataFrame, on_conflict: str = "update") -> int:
+    rows = frame_rows(frame)
+    if on_conflict == "update":
+        inserted, updated, _ = write_job_rows(conn, rows)
+        return inserted + updated
+    inserted = 0
+    per_statement = max(1, MAX_BIND_PARAMS // len(rows[0]))
+    for start in range(0, len(rows), per_statement):
+        stmt = dialect_insert(conn.dialect.name)(JOBS).values(rows[start:start + per_statement])
+        inserted += conn.execute(stmt.on_conflict_do_nothing(index_elements=list(KEY_COLUMNS))).rowcount
+    return inserted
+
+
+def backfill_jobs(path: str, bind: Engine, chunk_size: int = 50000, fmt: Optional[str] = None,
+                  column_map: Optional[Dict[str, str]] = None, on_conflict: str = "update",
+                  progress: Optional[Callable[[BackfillResult], None]] = None) -> BackfillResult:
+    """Load a job export chunk by chunk; `progress` is called after every committed chunk."""
+    if on_conflict not in ON_CONFLICT_ACTIONS:
+        raise ValueError(f"on_conflict must be one of {ON_CONFLICT_ACTIONS}")
+    use_copy = bind.dialect.name == "postgresql"
+    partitioned: Optional[bool] = None
+    first_partition_month: Optional[date] = None
+    result = BackfillResult()
+    started = time.perf_counter()
+
+    for chunk in iter_source_chunks(path, chunk_size, fmt):
+        frame = coerce_job_frame(map_source_columns(chunk, column_map))
+        result.rows_read += len(chunk)
+        result.skipped += len(chunk) - len(frame)
+        if not frame.empty:
+            with bind.begin() as conn:
+                if use_copy:
+                    if partitioned is None:
+                        partitioned = is_partitioned(conn, JOBS)
+                    oldest = month_start(frame["publishedDateTime"].min())
+                    if partitioned and (first_partition_month is None or oldest < first_partition_month):
+                        created = ensure_partitions(conn, first_month=oldest)
+                        if created:
+                            logger.info(f"Created partitions: {', '.join(created)}")
+                        first_partition_month = oldest
+                    result.rows_loaded += copy_and_merge(conn, frame, on_conflict)
+                else:
+                    result.rows_loaded += _upsert_rows(conn, frame, on_conflict)
+        result.seconds = time.perf_counter() - started
+        if progress:
+            progress(result)
+
+    if use_copy and result.rows_loaded:
+        with bind.begin() as conn:
+            conn.exec_driver_sql(f"ANALYZE {conn.dialect.identifier_preparer.quote(JOBS.name)}")
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from app.core.config import settings
+from app.utils.rag_index import atomic_write_index, atomic_write_json, create_faiss_index
+
+logger = logging.getLogger(__name__)
+
+JOB_VECTORS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "api", "routes", "rag_data"
+))
+JOB_INDEX_FILE_NAME = "job_vectors.faiss"
+JOB_IDS_FILE_NAME = "job_vector_ids.json"
+# Persisting rewrites the whole index file, so writes are debounced.
+SAVE_INTERVAL_SECONDS = 30.0
+# Fixed per-dimension range used to train SQ8 codes; unit-norm embedding
+# components essentially never leave it, so no data-dependent training is needed.
+SQ8_COMPONENT_RANGE = 0.25
+
+
+class JobEmbeddingStore:
+    """
+    Side FAISS index of job embeddings keyed by Job.id.
+
+    Job ids are Text, so each one is mapped to a sequential int64 FAISS id that is
+    persisted next to the index. Vectors are unit-normalized and stored in an
+    L2 index, so distances convert directly to cosine similarity.
+    """
+    def __init__(self, data_dir: str = JOB_VECTORS_DIR, dim: Optional[int] = None,
+                 index_file_name: str = JOB_INDEX_FILE_NAME, ids_file_name: str = JOB_IDS_FILE_NAME):
+        self.dim = dim or settings.EMBEDDING_DIMENSIONS
+        os.makedirs(data_dir, exist_ok=True)
+        self.index_path = os.path.join(data_dir, index_file_name)
+        self.ids_path = os.path.join(data_dir, ids_file_name)
+
+        self._lock = threading.RLock()
+        self._ids: Dict[str, int] = {}
+        self._job_ids_by_faiss_id: Dict[int, str] = {}
+        self._next_id = 0
+        self._dirty = False
+        self._last_save = 0.0
+        self.index: faiss.IndexIDMap2 = self._new_index()
+        self._load()
+
+    def _new_index(self) -> faiss.IndexIDMap2:
+        base = create_faiss_index(self.dim)
+        if not base.is_trained:
+            bounds = np.array([[-SQ8_COMPONENT_RANGE] * self.dim, [SQ8_COMPONENT_RANGE] * self.dim], dtype="float32")
+            base.train(bounds)
+        return faiss.IndexIDMap2(base)
+
+    def _load(self):
+        if not (os.path.exists(self.index_path) and os.path.exists(self.ids_path)):
+            return
+        try:
+            index = faiss.read_index(self.index_path)
+            with open(self.ids_path, "r") as f:
+                stored = json.load(f)
+            if index.d != self.dim or stored.get("index_config") != self._config_key():
+                logger.warning("Stored job embeddings use a different dimension/storage. Starting a fresh job index.")
+                return
+            self.index = index
+            self._ids = {job_id: int(faiss_id) for job_id, faiss_id in stored["ids"].items()}
+            self._next_id = int(stored["next_id"])
+            self._job_ids_by_faiss_id = {faiss_id: job_id for job_id, faiss_id in self._ids.items()}
+            logger.info(f"Loaded {len(self._ids)} job embeddings from {self.index_path}.")
+        except Exception as e:
+            logger.error(f"Failed to load job embedding index, starting empty: {e}", exc_info=True)
+
+    def _config_key(self) -> str:
+        return f"{self.dim}:{settings.EMBEDDING_INDEX_STORAGE}"
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._ids
+
+    def upsert(self, job_ids: List[str], vectors: np.ndarray):
+        """Insert or replace the vectors of the given jobs."""
+        if not job_ids:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype="float32").copy()
+        if vectors.shape != (len(job_ids), self.dim):
+            logger.warning(f"Skipping job embedding upsert: expected shape ({len(job_ids)}, {self.dim}), got {vectors.shape}.")
+            return
+        faiss.normalize_L2(vectors)
+
+        with self._lock:
+            replaced = np.array([self._ids[j] for j in job_ids if j in self._ids], dtype="int64")
+            if len(replaced):
+                self.index.remove_ids(replaced)
+            faiss_ids = []
+            for job_id in job_ids:
+                if job_id not in self._ids:
+                    self._ids[job_id] = self._next_id
+                    self._job_ids_by_faiss_id[self._next_id] = job_id
+                    self._next_id += 1
+                faiss_ids.append(self._ids[job_id])
+            self.index.add_with_ids(vectors, np.array(faiss_ids, dtype="int64"))
+            self._dirty = True
+        self.save(force=False)
+
+    def get_vector(self, job_id: str) -> Optional[np.ndarray]:
+        with self._lock:
+            faiss_id = self._ids.get(job_id)
+            if faiss_id is None:
+                return None
+            return self.index.reconstruct(faiss_id)
+
+    def search(self, vector: np.ndarray, k: int, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Return up to k (job_id, cosine similarity) pairs, most similar first."""
+        query = np.ascontiguousarray(vector, dtype="float32").reshape(1, -1).copy()
+        faiss.normalize_L2(query)
+        with self._lock:
+            if self.index.ntotal == 0:
+                return []
+            fetch = min(k + (1 if exclude else 0), self.index.ntotal)
+            distances, faiss_ids = self.index.search(query, fetch)
+            matches = []
+            for distance, faiss_id in zip(distances[0], faiss_ids[0]):
+                job_id = self._job_ids_by_faiss_id.get(int(faiss_id))
+                if job_id is None or job_id == exclude:
+                    continue
+                matches.append((job_id, float(1.0 - distance / 2.0)))
+        return matches[:k]
+
+    def similar(self, job_id: str, k: int) -> Optional[List[Tuple[str, float]]]:
+        """Jobs most similar to an already indexed job, or None if it has no stored vector."""
+        vector = self.get_vector(job_id)
+        if vector is None:
+            return None
+        return self.search(vector, k, exclude=job_id)
+
+    def save(self, force: bool = True):
+        """Persist index and id map; without force, only if dirty and the debounce interval passed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            if not force and time.monotonic() - self._last_save < SAVE_INTERVAL_SECONDS:
+                return
+            try:
+                atomic_write_index(self.index, self.index_path)
+                atomic_write_json(self.ids_path, {
+                    "index_config": self._config_key(),
+                    "next_id": self._next_id,
+                    "ids": self._ids,
+                })
+                self._dirty = False
+                self._last_save = time.monotonic()
+            except Exception as e:
+                logger.error(f"Failed to persist job embedding index: {e}", exc_info=True)
+
+
+_STORE: Optional[JobEmbeddingStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_job_embedding_store() -> JobEmbeddingStore:
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = JobEmbeddingStore()
+    return _STORE
+
+
+def flush_job_embedding_store():
+    if _STORE is not None:
+        _STORE.save(force=True)
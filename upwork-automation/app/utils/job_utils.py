@@ -1,172 +1,278 @@
-# import json
-# import os
-# import json
-# import os
-# from sqlalchemy.orm import Session
-# from app.models.jobs import Job, Question # Removed Skill and ClientInfo
-# from datetime import datetime
-# from fastapi import HTTPException
-# from app.api.routes.job_analyzer import load_company_details # This import might be unused now
-# from typing import List
-# from itertools import islice
-# from app.api.routes.rag_relevance import analyze_job_batch_rag
-
-# COMPANY_DETAILS_PATH = os.path.abspath(os.path.join(
-#     os.path.dirname(__file__),
-#     "..",
-#     "api", "routes", "agents", "company_details.md"
-# ))
-
-# async def process_and_save_jobs(db: Session, jobs_data: list) -> tuple:
-#     """
-#     Process and save jobs to the database.
-
-#     Args:
-#         db (Session): The database session.
-#         jobs_data (list): A list of job data dictionaries.
-
-#     Returns:
-#         tuple: A tuple containing the number of jobs added and skipped.
-#     """
-#     jobs_added = 0
-#     jobs_skipped = 0
-#     job_ids: List[str] = []
-
-#     for job_data in jobs_data:
-#         # Use 'id' from job_data which maps to Job.id (Supabase primary key)
-#         existing_job = db.query(Job).filter(Job.id == job_data.get("id")).first()
-#         if existing_job:
-#             jobs_skipped += 1
-#             continue
-
-#         # Create Job object and assign fields directly from job_data
-#         job = Job(
-#             id=job_data.get("id"), # Use 'id' as per new schema
-#             title=job_data.get("title"),
-#             description=job_data.get("description"),
-#             createdDateTime=datetime.fromisoformat(job_data.get("createdDateTime")),
-#             publishedDateTime=datetime.fromisoformat(job_data.get("publishedDateTime")),
-#             renewedDateTime=job_data.get("renewedDateTime"), # Assuming this is already datetime or None
-#             duration=job_data.get("duration"),
-#             durationLabel=job_data.get("durationLabel"),
-#             engagement=job_data.get("engagement"),
-#             recordNumber=job_data.get("recordNumber"),
-#             experienceLevel=job_data.get("experienceLevel"),
-#             freelancersToHire=job_data.get("freelancersToHire"),
-#             enterprise=job_data.get("enterprise"),
-#             totalApplicants=job_data.get("totalApplicants"),
-#             preferredFreelancerLocation=job_data.get("preferredFreelancerLocation"),
-#             preferredFreelancerLocationMandatory=job_data.get("preferredFreelancerLocationMandatory"),
-#             premium=job_data.get("premium"),
-#             client_country=job_data.get("client_country"),
-#             client_total_hires=job_data.get("client_total_hires"),
-#             client_total_posted_jobs=job_data.get("client_total_posted_jobs"),
-#             client_total_spent=job_data.get("client_total_spent"),
-#             client_verification_status=job_data.get("client_verification_status"),
-#             client_location_city=job_data.get("client_location_city"),
-#             client_location_state=job_data.get("client_location_state"),
-#             client_location_timezone=job_data.get("client_location_timezone"),
-#             client_location_offsetToUTC=job_data.get("client_location_offsetToUTC"),
-#             client_total_reviews=job_data.get("client_total_reviews"),
-#             client_total_feedback=job_data.get("client_total_feedback"),
-#             amount=job_data.get("amount"), # Use 'amount' as per new schema
-#             currency=job_data.get("currency"),
-#             team_name=job_data.get("team_name"),
-#             team_rid=job_data.get("team_rid"),
-#             team_id=job_data.get("team_id"),
-#             team_photoUrl=job_data.get("team_photoUrl"),
-#             status=Job.Status.NOT_APPLIED, # Default status
-#             category_id=job_data.get("category_id"),
-#             category_label=job_data.get("category_label"),
-#             subcategory_id=job_data.get("subcategory_id"),
-#             subcategory_label=job_data.get("subcategory_label"),
-#             city=job_data.get("city"),
-#             state=job_data.get("state"),
-#             country=job_data.get("country"),
-#             threeLetterAbbreviation=job_data.get("threeLetterAbbreviation"),
-#             phoneCode=job_data.get("phoneCode"),
-#             avg_rate_bid=job_data.get("avg_rate_bid"),
-#             min_rate_bid=job_data.get("min_rate_bid"),
-#             max_rate_bid=job_data.get("max_rate_bid"),
-#             last_client_activity=job_data.get("last_client_activity"), # Assuming this is already datetime or None
-#             invites_sent=job_data.get("invites_sent"),
-#             total_invited_to_interview=job_data.get("total_invited_to_interview"),
-#             total_hired=job_data.get("total_hired"),
-#             total_unanswered_invites=job_data.get("total_unanswered_invites"),
-#             total_offered=job_data.get("total_offered"),
-#             total_recommended=job_data.get("total_recommended"),
-#             skills=job_data.get("skills"), # Assign skills string directly
-#             ciphertext=job_data.get("ciphertext"),
-#             JobUpdatedDateTime=job_data.get("JobUpdatedDateTime"), # Assuming this is already datetime or None
-#             JobFirstFetchedDateTime=job_data.get("JobFirstFetchedDateTime"), # Assuming this is already datetime or None
-#             contractor_selection=job_data.get("contractor_selection"),
-#             # Keep existing fields not in Supabase schema for now if they exist in input
-#             job_link=job_data.get("link"), # Keep job_link as it's used for checking existing jobs
-#             client_reviews=job_data.get("client_reviews"), # Keep if needed elsewhere
-#             client_avg_hourly_rate=job_data.get("client_avg_hourly_rate"), # Keep if needed elsewhere
-#             from_hourly_range=job_data.get("from_hourly_range"), # Keep if needed elsewhere
-#             to_hourly_range=job_data.get("to_hourly_range"), # Keep if needed elsewhere
-#             has_questions=job_data.get("has_questions", False), # Keep if needed elsewhere
-#             notes=job_data.get("notes"), # Keep if needed elsewhere
-#             # Fields not expected in input but kept in model/schema:
-#             # applying_location_restriction, job_attachments, requires_github_repo, requires_relevant_portfolio, job_search_query
-#         )
-
-#         # Handle questions in job post if present
-#         contractor_selection_str = job_data.get("contractor_selection")
-#         if contractor_selection_str:
-#             try:
-#                 contractor_data = json.loads(contractor_selection_str)
-#                 proposal_req = contractor_data.get("proposalRequirement", {})
-#                 screening_questions = proposal_req.get("screeningQuestions", [])
-
-#                 if screening_questions:
-#                     job.has_questions = True # Keep this flag if still used
-#                     for q_data in screening_questions:
-#                         question_text = q_data.get("question")
-#                         if question_text:
-#                             question = Question(
-#                                 question=question_text,
-#                                 job=job # Link question to job
-#                             )
-#                             db.add(question) # Add question to session
-
-#             except json.JSONDecodeError:
-#                 print(f"Warning: Could not decode contractor_selection JSON for job {job.id}") # Use job.id
-#             except Exception as e:
-#                 print(f"Warning: Error processing contractor_selection for job {job.id}: {e}") # Use job.id
-
-#         # Skills are now stored directly as text, no need for Skill model or relationship
-#         # The 'skills' field is assigned directly during Job object creation above.
-
-#         db.add(job)
-#         jobs_added += 1
-#         job_ids.append(job.id) # Use job.id
-
-#     try:
-#         db.commit()
-#         print(f"[INFO] Successfully committed all jobs to the database. Added: {jobs_added}, Skipped: {jobs_skipped}")
-#     except Exception as e:
-#         print(f"[ERROR] Final commit failed for the batch: {e}")
-#         db.rollback()
-#         raise HTTPException(status_code=500, detail=f"Database commit failed: {str(e)}")
-
-
-# # Here we are creating batches of 3 Jobs at a time and passing it to job_analyzer_batch to check relevance
-#     job_ids_iter = iter(job_ids)
-#     while True:
-#         batch_iterator = islice(job_ids_iter, 3)
-#         job_id_batch_list = list(batch_iterator)
-
-#         if not job_id_batch_list:
-#             break
-
-#         try:
-#             # Pass the list of job IDs to the relevance analysis function
-#             await analyze_job_batch_rag(job_id_batch_list, db=db)
-#             print(f"[INFO] Successfully called RAG-based job analyzer batch endpoint for jobs: {job_id_batch_list}")
-#         except Exception as e:
-#             print(f"[ERROR] Error during initiating RAG-based relevance analysis for job batch {job_id_batch_list}: {e}")
-
-#     print(f"[INFO] Completed batch processing. Added: {jobs_added}, Skipped: {jobs_skipped}")
-#     return jobs_added, jobs_skipped
+"""
+Job feed ingestion: stream-parse the RSS/XML feed and bulk upsert it into jobs.
+
+Items are parsed incrementally with lxml iterparse, so memory stays flat however
+large the feed is, converted a batch at a time with pandas, and written with one
+multi-row INSERT ... ON CONFLICT DO UPDATE per batch instead of a lookup and an
+ORM object per job. Relevance scoring is left to /process_new_jobs_cron, which
+picks up the newly published jobs.
+
+Jobs are fetched again and again with bumped counters. Every row carries a hash
+of its counter columns and one of its other feed columns, and the upsert only
+touches a row whose hashes differ: a counters-only change rewrites the counters
+and keeps the other values as they are, and a changed title or description
+sets rescore_requested_at so the cron scores the job again.
+"""
+import json
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+from lxml import etree
+from sqlalchemy import and_, case, func, or_, select, tuple_
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.models.jobs import Job
+from app.utils.contractor_selection import parse_contractor_selection, selection_summary
+from app.utils.relevance_rollup import dialect_insert
+from app.utils.skills import parse_skills
+
+logger = logging.getLogger(__name__)
+
+JOBS = Job.__table__
+KEY_COLUMNS = ("id", "publishedDateTime")
+# Not taken from the feed: search_vector is generated, skill_list is parsed from
+# skills, the screening question columns from contractor_selection,
+# JobFirstFetchedDateTime keeps its server default (the first insert), updated_at
+# is bumped by every write and the change detection columns are computed here.
+HASH_COLUMNS = ("content_hash", "counters_hash")
+SELECTION_COLUMNS = ("has_questions", "question_count", "required_connects")
+DERIVED_COLUMNS = {
+    "skill_list", *SELECTION_COLUMNS, "JobFirstFetchedDateTime", "updated_at", "rescore_requested_at", *HASH_COLUMNS,
+}
+# Volatile fields that change between fetches of the same posting.
+COUNTER_COLUMNS = {
+    "totalApplicants", "invites_sent", "last_client_activity", "total_invited_to_interview", "total_hired",
+    "total_unanswered_invites", "total_offered", "total_recommended", "avg_rate_bid", "min_rate_bid",
+    "max_rate_bid", "client_total_hires", "client_total_posted_jobs", "client_total_spent",
+    "client_total_reviews", "client_total_feedback", "renewedDateTime", "JobUpdatedDateTime",
+}
+# What the relevance analysis reads from a posting; a change queues the job for re-scoring.
+RESCORE_COLUMNS = ("title", "description")
+# asyncpg allows 32767 bind parameters per statement; psycopg2 has no limit, but stay under it anyway.
+MAX_BIND_PARAMS = 30000
+
+
+def _python_type(column) -> type:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return str
+
+
+FEED_COLUMN_TYPES: Dict[str, type] = {
+    column.name: _python_type(column)
+    for column in JOBS.columns
+    if column.computed is None and column.name not in DERIVED_COLUMNS
+}
+# Hashed in this order whatever columns a batch has, missing ones as nulls, so the
+# same posting hashes the same in a batch where other items carry more fields.
+CONTENT_HASH_COLUMNS = tuple(sorted(
+    name for name in FEED_COLUMN_TYPES if name not in KEY_COLUMNS and name not in COUNTER_COLUMNS
+))
+COUNTERS_HASH_COLUMNS = tuple(sorted(name for name in FEED_COLUMN_TYPES if name in COUNTER_COLUMNS))
+
+
+@dataclass
+class IngestResult:
+    parsed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0 # already stored with the same content and counters
+    skipped: int = 0 # items without an id or a publishedDateTime
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated
+
+    def add(self, other: "IngestResult"):
+        self.parsed += other.parsed
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.skipped += other.skipped
+
+
+def iter_feed_items(source) -> Iterator[Dict[str, str]]:
+    """
+    Yield every <item> of a feed (file path or binary file object) as
+    {child tag: text}, clearing each element once read so the tree never grows.
+    """
+    for _, item in etree.iterparse(source, events=("end",), tag="{*}item", huge_tree=True):
+        yield {
+            etree.QName(child).localname: (child.text or "").strip()
+            for child in item if isinstance(child.tag, str)
+        }
+        item.clear(keep_tail=True)
+        while item.getprevious() is not None:
+            del item.getparent()[0]
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_string_dtype(values) and not pd.api.types.is_object_dtype(values):
+        return values
+    # JSON/Parquet sources can hold numbers, lists or objects in text columns.
+    return values.map(lambda value: value if isinstance(value, str) else
+                      json.dumps(value) if isinstance(value, (list, dict)) else str(value), na_action="ignore")
+
+
+def coerce_job_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep the known Job columns of `frame`, typed like the model (unparseable
+    values become nulls), one row per job, skill_list parsed from skills and
+    contractor_selection decoded into JSON with its screening question columns.
+    Rows without an id or a publishedDateTime are dropped: (id, publishedDateTime)
+    is the upsert key, and a stand-in date would store the job a second time once
+    it arrives with its real one.
+    """
+    frame = frame[[name for name in frame.columns if name in FEED_COLUMN_TYPES]].replace("", None)
+    for name in frame.columns:
+        kind = FEED_COLUMN_TYPES[name]
+        if kind is datetime:
+            # Naive UTC, like the rest of the DateTime columns.
+            frame[name] = pd.to_datetime(frame[name], utc=True, errors="coerce", format="ISO8601").dt.tz_convert(None)
+        elif kind is int:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").round().astype("Int64")
+        elif kind is float:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").astype("float64")
+        elif kind is object:
+            continue # JSON, decoded below once the frame is deduplicated
+        else:
+            frame[name] = _as_text(frame[name])
+
+    if "id" not in frame.columns or "publishedDateTime" not in frame.columns:
+        return frame.iloc[0:0]
+    # One statement cannot upsert the same row twice; the last occurrence wins.
+    frame = frame.dropna(subset=list(KEY_COLUMNS)).drop_duplicates(subset=list(KEY_COLUMNS), keep="last")
+    if "skills" in frame.columns:
+        frame["skill_list"] = frame["skills"].fillna("").map(parse_skills)
+    if "contractor_selection" in frame.columns:
+        selection = frame["contractor_selection"].astype(object).map(parse_contractor_selection)
+        summary = pd.DataFrame.from_records(selection.map(selection_summary).tolist(), index=frame.index)
+        frame["contractor_selection"] = selection
+        frame["has_questions"] = summary["has_questions"].astype("boolean")
+        frame["question_count"] = summary["question_count"].astype("Int64")
+        frame["required_connects"] = summary["required_connects"].astype("Int64")
+    frame["content_hash"] = row_digests(frame, CONTENT_HASH_COLUMNS)
+    frame["counters_hash"] = row_digests(frame, COUNTERS_HASH_COLUMNS)
+    return frame
+
+
+def row_digests(frame: pd.DataFrame, columns: Iterable[str]) -> pd.Series:
+    """md5 per row of `columns` (name=value pairs in the given order, nulls and missing columns as empty strings)."""
+    parts = [
+        name + "=" + (frame[name].astype(object).where(frame[name].notna(), "").astype(str)
+                      if name in frame.columns else pd.Series("", index=frame.index, dtype=object))
+        for name in columns
+    ]
+    if not parts:
+        return pd.Series(None, index=frame.index, dtype=object)
+    joined = parts[0].str.cat(parts[1:], sep="\x1f") if len(parts) > 1 else parts[0]
+    return joined.map(lambda text: hashlib.md5(text.encode()).hexdigest())
+
+
+def jobs_frame(records: List[Dict[str, str]]) -> pd.DataFrame:
+    """Typed DataFrame of the Job columns found in parsed feed items."""
+    return coerce_job_frame(pd.DataFrame.from_records(records))
+
+
+def frame_rows(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Plain Python values (None for nulls) ready to bind."""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def on_conflict_update(stmt, columns: Iterable[str]):
+    """
+    ON CONFLICT (id, publishedDateTime) DO UPDATE for an insert of `columns`:
+    skipped when both hashes match, other columns keep their stored values when
+    only the counters changed, and a new title/description queues a re-score.
+    Every row actually updated gets a new updated_at, so listing ETags and the
+    delta sync see the change.
+    """
+    jobs, excluded = JOBS.c, stmt.excluded
+    columns = list(columns)
+    content_changed = jobs.content_hash.is_distinct_from(excluded.content_hash)
+    set_ = {}
+    for name in columns:
+        if name in KEY_COLUMNS:
+            continue
+        if name in COUNTER_COLUMNS or name in HASH_COLUMNS:
+            set_[name] = excluded[name]
+        else:
+            set_[name] = case((content_changed, excluded[name]), else_=jobs[name])
+    rescore = [jobs[name].is_distinct_from(excluded[name]) for name in RESCORE_COLUMNS if name in columns]
+    if rescore:
+        set_["rescore_requested_at"] = case(
+            (and_(content_changed, or_(*rescore)), func.current_timestamp()), else_=jobs.rescore_requested_at
+        )
+    set_["updated_at"] = func.current_timestamp()
+    return stmt.on_conflict_do_update(
+        index_elements=[jobs[name] for name in KEY_COLUMNS],
+        set_=set_,
+        where=or_(content_changed, jobs.counters_hash.is_distinct_from(excluded.counters_hash)),
+    )
+
+
+def upsert_jobs_statement(dialect_name: str, rows: List[Dict[str, Any]]):
+    """Multi-row INSERT ... ON CONFLICT DO UPDATE for rows with the same keys."""
+    return on_conflict_update(dialect_insert(dialect_name)(JOBS).values(rows), rows[0])
+
+
+def _existing_keys(conn: Connection, rows: List[Dict[str, Any]]) -> Set[Tuple[str, datetime]]:
+    keys = [(row["id"], row["publishedDateTime"]) for row in rows]
+    existing = conn.execute(
+        select(JOBS.c.id, JOBS.c.publishedDateTime).where(tuple_(JOBS.c.id, JOBS.c.publishedDateTime).in_(keys))
+    ).all()
+    return {(job_id, published) for job_id, published in existing}
+
+
+def write_job_rows(conn: Connection, rows: List[Dict[str, Any]]) -> Tuple[int, int, int]:
+    """
+    Upsert rows in as few statements as the bind parameter limit allows;
+    returns (inserted, updated, unchanged).
+    """
+    inserted = updated = 0
+    per_statement = max(1, MAX_BIND_PARAMS // len(rows[0]))
+    for start in range(0, len(rows), per_statement):
+        chunk = rows[start:start + per_statement]
+        new = len(chunk) - len(_existing_keys(conn, chunk))
+        written = conn.execute(upsert_jobs_statement(conn.dialect.name, chunk)).rowcount
+        inserted += new
+        updated += written - new
+    return inserted, updated, len(rows) - inserted - updated
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def ingest_items(items: Iterable[Dict[str, str]], bind: Engine, batch_size: Optional[int] = None) -> IngestResult:
+    """Upsert parsed feed items, one transaction per batch."""
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
+    result = IngestResult()
+    for records in _batches(items, batch_size):
+        rows = frame_rows(jobs_frame(records))
+        result.parsed += len(records)
+        result.skipped += len(records) - len(rows)
+        if not rows:
+            continue
+        with bind.begin() as conn:
+            inserted, updated, unchanged = write_job_rows(conn, rows)
+        result.inserted += inserted
+        result.updated += updated
+        result.unchanged += unchanged
+    if result.skipped:
+        logger.warning(f"Skipped {result.skipped} feed item(s) without an id or a published date.")
+    return result
+
+
+def ingest_feed(source, bind: Engine, batch_size: Optional[int] = None) -> IngestResult:
+    """Parse a feed (file path or binary file object) and upsert its jobs."""
+    return ingest_items(iter_feed_items(source), bind, batch_size)
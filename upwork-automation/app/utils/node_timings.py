@@ -0,0 +1,46 @@
+"""
+Per-node wall-clock timings of the LangGraph proposal pipeline.
+
+Every node of the proposal graph reports how long it took; a run's timings
+travel in the graph state (ProposalState.timings) and are aggregated here for
+/api/metrics, so the fixed overhead before generation starts stays visible.
+"""
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+from app.db.instrumentation import _percentile
+
+RECENT_RUNS = 500
+
+
+class NodeTimings:
+    """Thread-safe count/total/max and recent p50/p95 per node; read with snapshot()."""
+    def __init__(self, recent: int = RECENT_RUNS):
+        self.recent = recent
+        self._lock = threading.Lock()
+        self._nodes: Dict[str, Dict[str, float]] = {}
+        self._recent: Dict[str, Deque[float]] = {}
+
+    def record(self, node: str, seconds: float):
+        with self._lock:
+            stats = self._nodes.get(node)
+            if stats is None:
+                stats = self._nodes[node] = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+                self._recent[node] = deque(maxlen=self.recent)
+            stats["count"] += 1
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            self._recent[node].append(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            nodes = {node: dict(stats) for node, stats in self._nodes.items()}
+            recent = {node: list(values) for node, values in self._recent.items()}
+        for node, stats in nodes.items():
+            stats["p50_seconds"] = _percentile(recent[node], 0.50)
+            stats["p95_seconds"] = _percentile(recent[node], 0.95)
+        return nodes
+
+
+PROPOSAL_NODE_TIMINGS = NodeTimings()
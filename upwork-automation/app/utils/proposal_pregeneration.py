@@ -0,0 +1,197 @@
+"""
+Background pre-generation of proposals for Strong jobs.
+
+We apply to nearly every Strong job, so its proposal is generated as soon as the
+job is scored rather than when someone opens it. The worker looks for recently
+scored Strong jobs without a proposal every `interval_seconds`, and right away
+when the relevance cron scores a Strong job (notify). At most `concurrency`
+proposals are generated at a time, and none is started while a user-requested
+generation is running: interactive requests go first.
+
+The generation itself is registered by the proposal generator (register), so
+this module does not depend on the LangGraph pipeline.
+"""
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import exists, select
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.jobs import JobRelevance, Proposal
+from app.utils.response_cache import invalidate_job_listings
+
+logger = logging.getLogger(__name__)
+
+PREGENERATE_CATEGORY = "Strong"
+# Proposals.status of pre-generated proposals, which nobody has applied with yet.
+PREGENERATED_STATUS = "pre_generated"
+INTERACTIVE_POLL_SECONDS = 0.5
+
+# Generates and stores the proposal of a job; returns False when one already existed.
+GenerateProposal = Callable[[str], Awaitable[bool]]
+
+
+def pregeneration_candidates_select(scored_since: datetime, limit: int, exclude: Iterable[str] = ()):
+    """Strong jobs scored since `scored_since` without a proposal, most recently scored first."""
+    stmt = (
+        select(JobRelevance.id)
+        .where(
+            JobRelevance.category == PREGENERATE_CATEGORY,
+            JobRelevance.updated_at >= scored_since,
+            ~exists().where(Proposal.job_id == JobRelevance.id),
+        )
+        .order_by(JobRelevance.updated_at.desc())
+        .limit(limit)
+    )
+    exclude = list(exclude)
+    if exclude:
+        stmt = stmt.where(JobRelevance.id.not_in(exclude))
+    return stmt
+
+
+class ProposalPregenerator:
+    def __init__(self, concurrency: int = 2, interval_seconds: float = 300.0, lookback_hours: float = 24.0,
+                 batch_size: int = 20, max_attempts: int = 3, session_factory=AsyncSessionLocal):
+        self.concurrency = concurrency
+        self.interval_seconds = interval_seconds
+        self.lookback_hours = lookback_hours
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.session_factory = session_factory
+        self.generate: Optional[GenerateProposal] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._failures: Dict[str, Tuple[int, datetime]] = {} # job id -> (attempts, last failure)
+        self._interactive: Dict[str, int] = {}
+        self._interactive_lock = threading.Lock()
+        self._stats = {"generated": 0, "already_existed": 0, "failed": 0, "waited_for_interactive": 0, "seconds": 0.0}
+
+    def register(self, generate: GenerateProposal):
+        self.generate = generate
+
+    @property
+    def enabled(self) -> bool:
+        return self.concurrency > 0 and self.generate is not None
+
+    @contextmanager
+    def interactive(self, job_id: str):
+        """Mark a user-requested generation; the worker starts nothing new until it ends."""
+        with self._interactive_lock:
+            self._interactive[job_id] = self._interactive.get(job_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._interactive_lock:
+                self._interactive[job_id] -= 1
+                if not self._interactive[job_id]:
+                    del self._interactive[job_id]
+
+    def _interactive_job_ids(self) -> Set[str]:
+        with self._interactive_lock:
+            return set(self._interactive)
+
+    def notify(self):
+        """Wake the worker now, e.g. when a job was just scored Strong."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _wait_for_interactive(self):
+        if self._interactive_job_ids():
+            self._stats["waited_for_interactive"] += 1
+            while self._interactive_job_ids():
+                await asyncio.sleep(INTERACTIVE_POLL_SECONDS)
+
+    async def _pregenerate(self, job_id: str, slots: asyncio.Semaphore) -> bool:
+        async with slots:
+            await self._wait_for_interactive()
+            started = time.perf_counter()
+            try:
+                stored = await self.generate(job_id)
+            except Exception as e:
+                attempts = self._failures.get(job_id, (0, None))[0] + 1
+                self._failures[job_id] = (attempts, datetime.utcnow())
+                self._stats["failed"] += 1
+                logger.error(f"Pre-generating the proposal for job {job_id} failed "
+                             f"(attempt {attempts}/{self.max_attempts}): {e}", exc_info=True)
+                return False
+            finally:
+                self._stats["seconds"] += time.perf_counter() - started
+        self._failures.pop(job_id, None)
+        if not stored:
+            self._stats["already_existed"] += 1
+            return False
+        self._stats["generated"] += 1
+        logger.info(f"Pre-generated the proposal for job {job_id}.")
+        return True
+
+    async def run_once(self) -> int:
+        """Pre-generate proposals for the current candidates; returns how many were stored."""
+        if not self.enabled:
+            return 0
+        scored_since = datetime.utcnow() - timedelta(hours=self.lookback_hours)
+        # A job that last failed before the lookback window is no longer a candidate
+        # (re-scoring makes it one again, with new attempts): forget it.
+        self._failures = {job_id: failure for job_id, failure in self._failures.items() if failure[1] >= scored_since}
+        exhausted = [job_id for job_id, (attempts, _) in self._failures.items() if attempts >= self.max_attempts]
+        async with self.session_factory() as db:
+            job_ids = (await db.execute(
+                pregeneration_candidates_select(scored_since, self.batch_size, exhausted)
+            )).scalars().all()
+        if not job_ids:
+            return 0
+        logger.info(f"Pre-generating proposals for {len(job_ids)} Strong job(s).")
+        slots = asyncio.Semaphore(self.concurrency)
+        stored = sum(await asyncio.gather(*(self._pregenerate(str(job_id), slots) for job_id in job_ids)))
+        if stored:
+            invalidate_job_listings()
+        return stored
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Proposal pre-generation run failed: {e}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        logger.info(f"Pre-generating proposals for Strong jobs, {self.concurrency} at a time.")
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wake = None
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            **self._stats,
+            "running": self._task is not None,
+            "interactive_in_progress": len(self._interactive_job_ids()),
+            "failing_jobs": len(self._failures),
+        }
+
+
+PROPOSAL_PREGENERATOR = ProposalPregenerator(
+    concurrency=settings.PROPOSAL_PREGENERATE_CONCURRENCY,
+    interval_seconds=settings.PROPOSAL_PREGENERATE_INTERVAL_SECONDS,
+    lookback_hours=settings.PROPOSAL_PREGENERATE_LOOKBACK_HOURS,
+)
@@ -0,0 +1,229 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Protocol
+
+import faiss
+import numpy as np
+
+from app.core.config import settings
+from app.utils.bm25 import BM25Index
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RAGIndexSnapshot:
+    """
+    Immutable view of a RAG index: the FAISS index, its chunk metadata and the
+    optional keyword index. Managers publish a new snapshot with a single
+    attribute assignment, so a query that grabbed the old snapshot keeps using a
+    consistent index/metadata pair while a rebuild happens (read-copy-update).
+    """
+    index: Optional[faiss.Index] = None
+    chunks_metadata: List[Dict[str, Any]] = field(default_factory=list)
+    bm25: Optional[BM25Index] = None
+
+
+EMPTY_SNAPSHOT = RAGIndexSnapshot()
+
+
+class SnapshotReloadMixin:
+    """
+    Hot reload for index managers that publish a RAGIndexSnapshot. The manager
+    provides `name`, `_snapshot`, `_reload_lock` (a threading.Lock),
+    `_check_if_rebuild_needed()`, `_build_index(previous=...)` and `_load_stored_hashes()`.
+    """
+    name: str
+    _snapshot: RAGIndexSnapshot
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """
+        Rebuild the index in the calling thread if the markdown sources changed and
+        publish it with a single snapshot swap. Queries running concurrently keep the
+        snapshot they started with. Returns True if a new snapshot was published.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            logger.info("RAG index reload already in progress. Skipping.")
+            return False
+        try:
+            if not force and not self._check_if_rebuild_needed():
+                return False
+            snapshot = self._build_index(previous=self._snapshot)
+            if snapshot is None:
+                logger.error("RAG index reload failed. Keeping the current index.")
+                return False
+            self._snapshot = snapshot
+            logger.info(f"RAG index '{self.name}' reloaded with {len(snapshot.chunks_metadata)} chunks.")
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "name": self.name,
+            "chunks": len(snapshot.chunks_metadata),
+            "vectors": snapshot.index.ntotal if snapshot.index is not None else 0,
+            "source_hashes": self._load_stored_hashes(),
+            "reload_in_progress": self._reload_lock.locked(),
+        }
+
+# Scalar quantizer per storage mode; "float32" keeps exact vectors in an IndexFlatL2.
+INDEX_STORAGE_QUANTIZERS = {
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "sq8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+def index_config_key() -> str:
+    """Identifies the vector layout; stored with the source hashes so a change forces a rebuild."""
+    return f"{settings.EMBEDDING_DIMENSIONS}:{settings.EMBEDDING_INDEX_STORAGE}"
+
+
+def index_storage(index: faiss.Index) -> Optional[str]:
+    """EMBEDDING_INDEX_STORAGE mode an index was built with, None if unknown."""
+    if isinstance(index, faiss.IndexFlat):
+        return "float32"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return next((storage for storage, qtype in INDEX_STORAGE_QUANTIZERS.items() if qtype == index.sq.qtype), None)
+    return None
+
+
+def create_faiss_index(dim: int, storage: Optional[str] = None) -> faiss.Index:
+    """Create an empty L2 index storing vectors as float32, float16 or 8-bit scalar-quantized codes."""
+    storage = storage or settings.EMBEDDING_INDEX_STORAGE
+    if storage == "float32":
+        return faiss.IndexFlatL2(dim)
+    if storage not in INDEX_STORAGE_QUANTIZERS:
+        raise ValueError(f"Unknown EMBEDDING_INDEX_STORAGE '{storage}'. Use float32, float16 or sq8.")
+    return faiss.IndexScalarQuantizer(dim, INDEX_STORAGE_QUANTIZERS[storage], faiss.METRIC_L2)
+
+
+def build_faiss_index(vectors: np.ndarray, dim: int, storage: Optional[str] = None) -> faiss.Index:
+    """Create, train (for quantized storage) and fill an index with vectors."""
+    index = create_faiss_index(dim, storage)
+    if len(vectors):
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+    return index
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    """Write to a temp file in the same directory and rename it into place."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path: str, obj: Any, **dump_kwargs):
+    atomic_write_bytes(path, json.dumps(obj, **dump_kwargs).encode("utf-8"))
+
+
+def atomic_write_index(index: faiss.Index, path: str):
+    atomic_write_bytes(path, faiss.serialize_index(index).tobytes())
+
+
+def embed_with_reuse(previous: RAGIndexSnapshot, text_key: str, texts: List[str],
+                     embed_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+    """
+    Return embeddings for texts, reusing vectors from the previous snapshot for
+    chunks whose text did not change so a reload only embeds edited chunks.
+    """
+    reusable: Dict[str, int] = {}
+    # Quantized vectors come back lossy from reconstruct(), so they are only reused
+    # for the same storage mode; exact float32 vectors can seed any storage.
+    if previous.index is not None and previous.index.ntotal == len(previous.chunks_metadata) \
+            and previous.index.d == settings.EMBEDDING_DIMENSIONS \
+            and index_storage(previous.index) in ("float32", settings.EMBEDDING_INDEX_STORAGE):
+        for position, chunk in enumerate(previous.chunks_metadata):
+            chunk_text = chunk.get(text_key)
+            if chunk_text:
+                reusable.setdefault(text_digest(chunk_text), position)
+
+    missing = [text for text in texts if text_digest(text) not in reusable]
+    fresh_vectors: Dict[str, np.ndarray] = {}
+    if missing:
+        unique_missing = list(dict.fromkeys(missing))
+        embedded = embed_fn(unique_missing)
+        fresh_vectors = {text_digest(text): embedded[i] for i, text in enumerate(unique_missing)}
+
+    logger.info(f"Reusing {len(texts) - len(missing)} stored embeddings, embedding {len(missing)} new/changed chunks.")
+    vectors = []
+    for text in texts:
+        digest = text_digest(text)
+        if digest in fresh_vectors:
+            vectors.append(fresh_vectors[digest])
+        else:
+            vectors.append(previous.index.reconstruct(reusable[digest]))
+    return np.array(vectors).astype("float32")
+
+
+class ReloadableIndex(Protocol):
+    name: str
+
+    def reload_if_changed(self, force: bool = False) -> bool: ...
+
+    def status(self) -> Dict[str, Any]: ...
+
+
+class RAGCorpusWatcher:
+    """Polls registered index managers and rebuilds them in a worker thread when their source files change."""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.managers: List[ReloadableIndex] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, manager: Optional[ReloadableIndex]):
+        if manager is not None and manager not in self.managers:
+            self.managers.append(manager)
+
+    def reload_all(self, force: bool = False) -> Dict[str, bool]:
+        results = {}
+        for manager in self.managers:
+            try:
+                results[manager.name] = manager.reload_if_changed(force=force)
+            except Exception as e:
+                logger.error(f"Reload of RAG index '{manager.name}' failed: {e}", exc_info=True)
+                results[manager.name] = False
+        return results
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await asyncio.to_thread(self.reload_all)
+
+    def start(self):
+        if self.interval_seconds <= 0 or self._task is not None:
+            return
+        logger.info(f"Watching RAG corpora for changes every {self.interval_seconds}s.")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+RAG_WATCHER = RAGCorpusWatcher(settings.RAG_WATCH_INTERVAL_SECONDS)
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, delete, exists, func, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.jobs import JobRelevance, RelevanceRollup
+
+UNKNOWN = ""
+
+RollupKey = Tuple[date, str, str, str]
+
+
+@dataclass(frozen=True)
+class RollupContribution:
+    """What one job_relevance row adds to relevance_daily_rollup."""
+    key: RollupKey
+    score: float
+
+
+def rollup_contribution(relevance: Optional[JobRelevance]) -> Optional[RollupContribution]:
+    """
+    The bucket a scored job counts towards, from the values its job_relevance row
+    copied at scoring time; None if it is unscored or has no published date.
+    """
+    if relevance is None or relevance.category is None or relevance.score is None:
+        return None
+    published = relevance.published_at
+    if published is None:
+        return None
+    day = published.date() if isinstance(published, datetime) else published
+    key = (day, relevance.category, relevance.client_country or UNKNOWN, relevance.subcategory_label or UNKNOWN)
+    return RollupContribution(key, float(relevance.score))
+
+
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+ROLLUP_KEY_COLUMNS = ("day", "category", "client_country", "subcategory_label")
+
+
+def dialect_insert(dialect_name: str):
+    """The INSERT construct with ON CONFLICT support for the dialect (Postgres, or SQLite in tests)."""
+    if dialect_name not in UPSERT_INSERTS:
+        raise ValueError(f"{dialect_name} has no INSERT ... ON CONFLICT; use Postgres or SQLite")
+    return UPSERT_INSERTS[dialect_name]
+
+
+def _portable_bucket_statements(key: RollupKey, count: int, score: float) -> list:
+    """Create the bucket if it is missing, then add to it: for databases without ON CONFLICT."""
+    bucket = and_(*(getattr(RelevanceRollup, name) == value for name, value in zip(ROLLUP_KEY_COLUMNS, key)))
+    missing = select(*(literal(value, getattr(RelevanceRollup, name).type)
+                       for name, value in zip(ROLLUP_KEY_COLUMNS, key))).where(~exists().where(bucket))
+    return [
+        insert(RelevanceRollup).from_select(list(ROLLUP_KEY_COLUMNS), missing),
+        update(RelevanceRollup).where(bucket).values(
+            job_count=RelevanceRollup.job_count + count, score_sum=RelevanceRollup.score_sum + score,
+        ),
+    ]
+
+
+def rollup_change_statements(dialect_name: str, before: Optional[RollupContribution],
+                             after: Optional[RollupContribution]) -> list:
+    """
+    Statements that move a job from its previous bucket to its new one, empty
+    when nothing changed. Run them in the transaction that writes the
+    job_relevance row. One INSERT ... ON CONFLICT where the database has it,
+    otherwise an INSERT of the missing buckets and an UPDATE per bucket.
+    """
+    if before == after:
+        return []
+    deltas: Dict[RollupKey, Tuple[int, float]] = {}
+    for contribution, sign in ((before, -1), (after, 1)):
+        if contribution is not None:
+            count, score = deltas.get(contribution.key, (0, 0.0))
+            deltas[contribution.key] = (count + sign, score + sign * contribution.score)
+
+    # Sorted so concurrent writers lock buckets in the same order.
+    buckets = sorted(deltas.items())
+    if dialect_name not in UPSERT_INSERTS:
+        return [stmt for key, (count, score) in buckets for stmt in _portable_bucket_statements(key, count, score)]
+    rows = [
+        {"day": key[0], "category": key[1], "client_country": key[2], "subcategory_label": key[3],
+         "job_count": count, "score_sum": score}
+        for key, (count, score) in buckets
+    ]
+    stmt = dialect_insert(dialect_name)(RelevanceRollup).values(rows)
+    return [stmt.on_conflict_do_update(
+        index_elements=[RelevanceRollup.day, RelevanceRollup.category,
+                        RelevanceRollup.client_country, RelevanceRollup.subcategory_label],
+        set_={
+            "job_count": RelevanceRollup.job_count + stmt.excluded.job_count,
+            "score_sum": RelevanceRollup.score_sum + stmt.excluded.score_sum,
+        },
+    )]
+
+
+def rollup_rebuild_statements():
+    """Recompute the whole rollup from job_relevance; for the first deploy or to repair drift."""
+    day = func.date(JobRelevance.published_at)
+    country = func.coalesce(JobRelevance.client_country, UNKNOWN)
+    subcategory = func.coalesce(JobRelevance.subcategory_label, UNKNOWN)
+    totals = (
+        select(day, JobRelevance.category, country, subcategory,
+               func.count(), func.sum(JobRelevance.score))
+        .where(JobRelevance.published_at.is_not(None))
+        .group_by(day, JobRelevance.category, country, subcategory)
+    )
+    insert_totals = RelevanceRollup.__table__.insert().from_select(
+        ["day", "category", "client_country", "subcategory_label", "job_count", "score_sum"], totals
+    )
+    return [delete(RelevanceRollup), insert_totals]
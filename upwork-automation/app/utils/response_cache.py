@@ -0,0 +1,197 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A fully rendered response: serialized JSON body plus the headers that go with it."""
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("ETag")
+
+
+@dataclass
+class _Entry:
+    value: CachedResponse
+    generation: int
+    expires_at: float
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[CachedResponse] = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """
+    Small in-process cache of rendered listing responses.
+
+    Entries live for `ttl_seconds` and are dropped early by `invalidate()`, which
+    writers call after committing. Concurrent misses for the same key are
+    single-flighted: one caller renders the response while the others wait for
+    its result instead of running the same query. A response rendered while an
+    invalidation happened is returned to its callers but not stored, so a write
+    is never hidden behind a result computed from the data before it.
+
+    `get_or_compute` serves threads (sync routes); `aget_or_compute` serves
+    coroutines and waits on an asyncio future instead of blocking the event loop.
+    """
+    def __init__(self, ttl_seconds: float, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+        self._async_in_flight: Dict[Hashable, "asyncio.Future[CachedResponse]"] = {}
+        self._generation = 0
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+        }
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], CachedResponse]) -> CachedResponse:
+        if self.ttl_seconds <= 0:
+            return compute()
+
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                in_flight = self._in_flight[key] = _InFlight()
+                self._stats["misses"] += 1
+                leader = True
+            generation = self._generation
+
+        if not leader:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.value
+
+        try:
+            value = compute()
+        except BaseException as e:
+            in_flight.error = e
+            raise
+        else:
+            in_flight.value = value
+            self._store(key, value, generation)
+            return value
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            in_flight.done.set()
+
+    async def aget_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[CachedResponse]]) -> CachedResponse:
+        if self.ttl_seconds <= 0:
+            return await compute()
+
+        while True:
+            with self._lock:
+                cached = self._lookup(key)
+                if cached is not None:
+                    return cached
+
+                in_flight = self._async_in_flight.get(key)
+                if in_flight is not None:
+                    self._stats["coalesced"] += 1
+                    leader = False
+                else:
+                    in_flight = self._async_in_flight[key] = asyncio.get_running_loop().create_future()
+                    # Mark errors as retrieved even if every follower was cancelled.
+                    in_flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+                    self._stats["misses"] += 1
+                    leader = True
+                generation = self._generation
+
+            if leader:
+                break
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. its client disconnected), not this
+                # caller: start over, so the first follower computes the response.
+                if not in_flight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            in_flight.cancel()
+            raise
+        except BaseException as e:
+            in_flight.set_exception(e)
+            raise
+        else:
+            in_flight.set_result(value)
+            self._store(key, value, generation)
+            return value
+        finally:
+            with self._lock:
+                self._async_in_flight.pop(key, None)
+            if not in_flight.done():
+                in_flight.cancel()
+
+    def _lookup(self, key: Hashable) -> Optional[CachedResponse]:
+        """Return a live entry and count the hit; caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None or entry.generation != self._generation or entry.expires_at <= time.monotonic():
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry.value
+
+    def _store(self, key: Hashable, value: CachedResponse, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = _Entry(value, generation, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Drop every cached response; call after committing a write that affects them."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["in_flight"] = len(self._in_flight) + len(self._async_in_flight)
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+
+LISTINGS_CACHE = ResponseCache(settings.LISTINGS_CACHE_TTL_SECONDS)
+
+
+def invalidate_job_listings():
+    LISTINGS_CACHE.invalidate()
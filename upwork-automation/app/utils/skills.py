@@ -0,0 +1,40 @@
+import re
+import json
+from typing import Iterable, List, Optional
+
+# Feeds deliver skills as a JSON list (of names or {"name": ...} objects) or as a delimited string.
+SKILL_SEPARATORS = re.compile(r"[,;|\n]")
+SKILL_NAME_KEYS = ("prettyName", "name", "skill")
+
+
+def normalize_skill(name: str) -> str:
+    """Lower-case, single-spaced key used in jobs.skill_list and in skill filters."""
+    return " ".join(name.split()).lower()
+
+
+def _names_from_json(values: Iterable) -> List[str]:
+    names = []
+    for value in values:
+        if isinstance(value, dict):
+            value = next((value[key] for key in SKILL_NAME_KEYS if value.get(key)), None)
+        if isinstance(value, str):
+            names.append(value)
+    return names
+
+
+def parse_skills(raw: Optional[str]) -> List[str]:
+    """Parse the free-text Job.skills value into unique normalized skill names, in order."""
+    if not raw or not raw.strip():
+        return []
+    text = raw.strip()
+    names: Optional[List[str]] = None
+    if text.startswith("["):
+        try:
+            parsed = json.loads(text)
+            if isinstance(parsed, list):
+                names = _names_from_json(parsed)
+        except ValueError:
+            pass
+    if names is None:
+        names = SKILL_SEPARATORS.split(text)
+    return list(dict.fromkeys(skill for skill in map(normalize_skill, names) if skill))
@@ -0,0 +1,100 @@
+"""
+Move jobs.contractor_selection from JSON text to parsed JSONB and fill the
+screening question columns derived from it.
+
+On Postgres the text column is first converted in place (each value becomes a
+JSON string, so invalid JSON cannot fail the conversion) and the new columns and
+indexes are added if missing. The remaining rows are then walked in batches
+(keyset on the (id, publishedDateTime) primary key) and decoded with
+parse_contractor_selection, like new jobs are on write. Converting the column
+rewrites every partition; run it off-peak.
+
+Usage:
+    python backfill_contractor_selection.py --batch-size 2000
+"""
+import sys
+import argparse
+from pathlib import Path
+
+parent_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(parent_dir))
+
+from sqlalchemy import bindparam, inspect, select, tuple_, update
+
+from app.db.database import engine
+from app.models.jobs import Job
+from app.utils.contractor_selection import parse_contractor_selection, selection_summary
+
+NEW_INDEXES = ("idx_jobs_has_questions_published", "idx_jobs_required_connects", "idx_jobs_contractor_selection")
+
+
+def migrate_columns(conn):
+    """Postgres only: convert contractor_selection to jsonb and add the derived columns and their indexes."""
+    jobs = Job.__table__
+    columns = {column["name"]: column for column in inspect(conn).get_columns(jobs.name)}
+    if str(columns["contractor_selection"]["type"]).upper() == "TEXT":
+        print("Converting contractor_selection to jsonb...")
+        conn.exec_driver_sql(
+            "ALTER TABLE jobs ALTER COLUMN contractor_selection TYPE jsonb USING to_jsonb(contractor_selection)"
+        )
+    conn.exec_driver_sql(
+        "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS has_questions boolean, "
+        "ADD COLUMN IF NOT EXISTS question_count integer, ADD COLUMN IF NOT EXISTS required_connects integer"
+    )
+    for index in jobs.indexes:
+        if index.name in NEW_INDEXES:
+            index.create(conn, checkfirst=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            migrate_columns(conn)
+
+    jobs = Job.__table__
+    fill = (
+        update(jobs)
+        .where(jobs.c.id == bindparam("job_id"), jobs.c.publishedDateTime == bindparam("published"))
+        .values(
+            contractor_selection=bindparam("selection", type_=jobs.c.contractor_selection.type),
+            has_questions=bindparam("has_questions_value"),
+            question_count=bindparam("question_count_value"),
+            required_connects=bindparam("required_connects_value"),
+        )
+    )
+    # The same id can appear in several months, so page on the whole primary key.
+    last_key, total = None, 0
+    while True:
+        with engine.begin() as conn:
+            stmt = (
+                select(jobs.c.id, jobs.c.publishedDateTime, jobs.c.contractor_selection)
+                .where(jobs.c.contractor_selection.is_not(None), jobs.c.has_questions.is_(None))
+            )
+            if last_key is not None:
+                stmt = stmt.where(tuple_(jobs.c.id, jobs.c.publishedDateTime) > tuple_(*last_key))
+            rows = conn.execute(
+                stmt.order_by(jobs.c.id, jobs.c.publishedDateTime).limit(args.batch_size)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                selection = parse_contractor_selection(row.contractor_selection)
+                summary = selection_summary(selection)
+                params.append({
+                    "job_id": row.id, "published": row.publishedDateTime, "selection": selection,
+                    **{f"{name}_value": value for name, value in summary.items()},
+                })
+            conn.execute(fill, params)
+        last_key = (rows[-1].id, rows[-1].publishedDateTime)
+        total += len(rows)
+        print(f"Backfilled {total} jobs...")
+    print(f"Done: {total} jobs updated.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Load a historical job export (JSONL, CSV or Parquet) into the jobs table.
+
+    python backfill_jobs.py jobs_2024.jsonl
+    python backfill_jobs.py export.csv.gz --chunk-size 100000 --map job_uid=id --map posted_on=publishedDateTime
+    python backfill_jobs.py restore.parquet --on-conflict skip
+
+Source columns are matched to Job columns ignoring case and separators
+(published_date_time -> publishedDateTime); --map overrides the matching. On
+Postgres every chunk is COPYed into a staging table and merged, so existing
+jobs are updated (or left alone with --on-conflict skip). Parquet needs pyarrow.
+"""
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+parent_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(parent_dir))
+
+from app.db.database import engine
+from app.utils.job_backfill import ON_CONFLICT_ACTIONS, BackfillResult, backfill_jobs
+
+
+def report(result: BackfillResult):
+    print(f"{result.rows_read:>12,} rows read, {result.rows_loaded:,} loaded, {result.skipped:,} skipped "
+          f"({result.rows_per_second:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["jsonl", "csv", "parquet"], help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="rows read, COPYed and merged per transaction")
+    parser.add_argument("--map", action="append", default=[], metavar="SOURCE=COLUMN",
+                        help="map a source column onto a Job column (repeatable)")
+    parser.add_argument("--on-conflict", choices=ON_CONFLICT_ACTIONS, default="update")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    column_map = {}
+    for mapping in args.map:
+        source, _, column = mapping.partition("=")
+        if not column:
+            sys.exit(f"--map expects SOURCE=COLUMN, got {mapping!r}")
+        column_map[source] = column
+
+    result = backfill_jobs(args.path, engine, chunk_size=args.chunk_size, fmt=args.format,
+                           column_map=column_map, on_conflict=args.on_conflict, progress=report)
+    print(f"Done in {result.seconds:.1f}s.")
+    report(result)
+
+
+if __name__ == "__main__":
+    main()
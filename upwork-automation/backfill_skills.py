@@ -0,0 +1,72 @@
+"""
+Fill jobs.skill_list for rows stored before the column existed.
+
+New and updated jobs get skill_list parsed on write; this walks the remaining
+rows in batches (keyset on the (id, publishedDateTime) primary key) and parses
+their skills text the same way. On Postgres the column and its GIN index are
+added first if missing.
+
+Usage:
+    python backfill_skills.py --batch-size 2000
+"""
+import sys
+import argparse
+from pathlib import Path
+
+parent_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(parent_dir))
+
+from sqlalchemy import bindparam, select, tuple_, update
+
+from app.db.database import engine
+from app.models.jobs import Job
+from app.utils.skills import parse_skills
+
+
+def migrate_columns(conn):
+    """Postgres only: add skill_list and its GIN index if missing."""
+    conn.exec_driver_sql("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS skill_list text[]")
+    for index in Job.__table__.indexes:
+        if index.name == "idx_jobs_skill_list":
+            index.create(conn, checkfirst=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            migrate_columns(conn)
+
+    jobs = Job.__table__
+    fill = (
+        update(jobs)
+        .where(jobs.c.id == bindparam("job_id"), jobs.c.publishedDateTime == bindparam("published"))
+        .values(skill_list=bindparam("parsed"))
+    )
+    # The same id can appear in several months, so page on the whole primary key.
+    last_key, total = None, 0
+    while True:
+        with engine.begin() as conn:
+            stmt = select(jobs.c.id, jobs.c.publishedDateTime, jobs.c.skills).where(jobs.c.skill_list.is_(None))
+            if last_key is not None:
+                stmt = stmt.where(tuple_(jobs.c.id, jobs.c.publishedDateTime) > tuple_(*last_key))
+            rows = conn.execute(
+                stmt.order_by(jobs.c.id, jobs.c.publishedDateTime).limit(args.batch_size)
+            ).all()
+            if not rows:
+                break
+            conn.execute(fill, [
+                {"job_id": row.id, "published": row.publishedDateTime, "parsed": parse_skills(row.skills)}
+                for row in rows
+            ])
+        last_key = (rows[-1].id, rows[-1].publishedDateTime)
+        total += len(rows)
+        print(f"Backfilled {total} jobs...")
+    print(f"Done: {total} jobs updated.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Micro-benchmark of the job listing read path.
+
+Fills an in-memory SQLite database with synthetic jobs (full-size descriptions
+and relevance reasoning) and measures rows/sec from query to JSON bytes for:
+
+  orm       - the previous path: ORM objects with joinedload(Job.relevance),
+              JobResponse.model_validate per row, then FastAPI's response_model
+              re-validation and JSON encoding
+  summary   - Core select of the summary columns, JobSummary models, TypeAdapter.dump_json
+  core      - Core select of the summary columns straight to bytes (what the endpoints serve)
+
+SQLite keeps the numbers about Python-side cost; against Postgres the narrower
+select also saves I/O and transfer.
+
+Usage:
+    python benchmark_listings.py --rows 5000 --page 200 --repeat 20
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+parent_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(parent_dir))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app.db.sqlite_compat import create_sqlite_engine
+from app.models.jobs import Base, Job, JobRelevance, Proposal
+from app.schemas.jobs import JobResponse, JobSummary
+from app.api.routes.job_listings import job_summary_dict, job_summary_select
+
+WORDS = "react django python api backend frontend supabase langgraph agent dashboard integration automation".split()
+
+
+def seed(session, rows: int):
+    now = datetime.utcnow()
+    rng = random.Random(42)
+    for i in range(rows):
+        job_id = f"~02{i:016d}"
+        session.add(Job(
+            id=job_id,
+            title=" ".join(rng.choices(WORDS, k=8)).title(),
+            description=" ".join(rng.choices(WORDS, k=400)),
+            publishedDateTime=now - timedelta(minutes=i),
+            engagement="Less than 30 hrs/week",
+            experienceLevel="EXPERT",
+            durationLabel="1 to 3 months",
+            status="available",
+            amount=float(rng.randint(100, 5000)),
+            currency="USD",
+            client_country="United States",
+            client_total_hires=rng.randint(0, 50),
+            client_total_spent=float(rng.randint(0, 100000)),
+            client_verification_status="VERIFIED",
+            skills=", ".join(rng.choices(WORDS, k=10)),
+            contractor_selection={"proposalRequirement": {"screeningQuestions": [{"question": "Describe a similar project"}] * 5}},
+            team_photoUrl="https://example.com/" + "x" * 120,
+        ))
+        session.add(JobRelevance(
+            id=job_id, score=rng.random(), category=rng.choice(["Strong", "Medium", "Low", "Irrelevant"]),
+            reasoning=" ".join(rng.choices(WORDS, k=150)),
+            technology_match=" ".join(rng.choices(WORDS, k=60)),
+            portfolio_match=" ".join(rng.choices(WORDS, k=60)),
+            project_match=" ".join(rng.choices(WORDS, k=60)),
+            location_match="Good", closest_profile_name="General Company Profile", tags="[]",
+            published_at=now - timedelta(minutes=i),
+        ))
+    session.commit()
+
+
+def orm_path(session, page: int) -> bytes:
+    jobs = session.query(Job).options(joinedload(Job.relevance)) \
+        .order_by(Job.publishedDateTime.desc(), Job.id.desc()).limit(page).all()
+    validated = [JobResponse.model_validate(job) for job in jobs]
+    # What FastAPI does with the returned list for response_model=List[JobResponse]
+    revalidated = TypeAdapter(List[JobResponse]).validate_python(jsonable_encoder(validated))
+    return TypeAdapter(List[JobResponse]).dump_json(revalidated)
+
+
+SUMMARY_LIST = TypeAdapter(List[JobSummary])
+
+
+def summary_path(session, page: int) -> bytes:
+    rows = session.execute(
+        job_summary_select().order_by(Job.publishedDateTime.desc(), Job.id.desc()).limit(page)
+    ).mappings().all()
+    return SUMMARY_LIST.dump_json([JobSummary.model_validate(job_summary_dict(row)) for row in rows])
+
+
+def core_path(session, page: int) -> bytes:
+    rows = session.execute(
+        job_summary_select().order_by(Job.publishedDateTime.desc(), Job.id.desc()).limit(page)
+    ).mappings().all()
+    return to_json([job_summary_dict(row) for row in rows])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="synthetic jobs to insert")
+    parser.add_argument("--page", type=int, default=200, help="rows per listing request")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine()
+    Base.metadata.create_all(engine, tables=[Job.__table__, JobRelevance.__table__, Proposal.__table__])
+    session = sessionmaker(bind=engine)()
+    print(f"Seeding {args.rows} synthetic jobs...")
+    seed(session, args.rows)
+
+    print(f"\n{'path':>8} {'rows/sec':>10} {'ms/page':>9} {'bytes/page':>11}")
+    baseline = None
+    for name, path in [("orm", orm_path), ("summary", summary_path), ("core", core_path)]:
+        path(session, args.page)  # warm up
+        session.expunge_all()
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            body = path(session, args.page)
+            session.expunge_all()
+        elapsed = time.perf_counter() - started
+        rows_per_sec = args.page * args.repeat / elapsed
+        baseline = baseline or rows_per_sec
+        print(f"{name:>8} {rows_per_sec:>10.0f} {elapsed * 1000 / args.repeat:>9.1f} {len(body):>11} "
+              f"({rows_per_sec / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
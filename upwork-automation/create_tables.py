@@ -13,7 +13,8 @@ from sqlalchemy import create_engine, inspect
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
-from app.models.jobs import Base, Job, Skill, Category, SubCategory, JobType, ClientInfo, Location, Timezone
+from app.db.partitions import ensure_partitions_on
+from app.models.jobs import Base
 
 def create_all_tables():
     try:
@@ -31,6 +32,10 @@ def create_all_tables():
         
         print(f"Creating all tables in database: {settings.POSTGRES_DB}")
         Base.metadata.create_all(engine)
+        # jobs/job_relevance are partitioned on Postgres and need their partitions before inserts.
+        created = ensure_partitions_on(engine)
+        if created:
+            print(f"Created partitions: {', '.join(created)}")
         inspector = inspect(engine)
         tables_after = inspector.get_table_names()
         print(f"Tables after creation: {tables_after}")
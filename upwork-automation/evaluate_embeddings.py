@@ -0,0 +1,123 @@
+"""
+Measure the retrieval-quality cost of smaller and quantized embeddings.
+
+Replays historical relevance queries (title + description of jobs that already
+have a JobRelevance row) against either the relevance RAG corpus or the jobs
+published before them. Everything is embedded once at the native 1536 dimensions; smaller
+sizes are derived locally by truncation + re-normalization, which is what the
+API's `dimensions` parameter returns. Exact float32 search at 1536 dimensions is
+the ground truth, and each configuration reports recall@k against it together
+with bytes per vector and search latency.
+
+Usage:
+    python evaluate_embeddings.py --corpus rag --queries 200 --k 6
+    python evaluate_embeddings.py --corpus jobs --queries 200 --k 10 --dims 1536 512 256
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+parent_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(parent_dir))
+
+import numpy as np
+from sqlalchemy.orm import load_only
+
+from app.db.database import SessionLocal
+from app.models.jobs import Job, JobRelevance
+from app.utils.embeddings import NATIVE_EMBEDDING_DIM, EmbeddingService, truncate_embeddings
+from app.utils.rag_index import build_faiss_index
+
+RAG_METADATA_PATH = parent_dir / "app" / "api" / "routes" / "rag_data" / "metadata.json"
+STORAGE_MODES = ["float32", "float16", "sq8"]
+
+
+def load_job_texts(limit: int):
+    db = SessionLocal()
+    try:
+        jobs = (
+            db.query(Job)
+            .join(Job.relevance)
+            .options(load_only(Job.id, Job.title, Job.description))
+            .order_by(Job.publishedDateTime.desc())
+            .limit(limit)
+            .all()
+        )
+        return [f"{job.title or ''}\n{job.description or ''}" for job in jobs]
+    finally:
+        db.close()
+
+
+def load_rag_chunk_texts():
+    if not RAG_METADATA_PATH.exists():
+        sys.exit(f"{RAG_METADATA_PATH} not found. Start the API once so the relevance index is built.")
+    with open(RAG_METADATA_PATH) as f:
+        return [chunk["text"] for chunk in json.load(f)]
+
+
+def bytes_per_vector(index) -> int:
+    return index.sa_code_size() if hasattr(index, "sa_code_size") else index.d * 4
+
+
+def recall_at_k(results: np.ndarray, ground_truth: np.ndarray) -> float:
+    hits = sum(len(set(row) & set(truth)) for row, truth in zip(results, ground_truth))
+    return hits / ground_truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", choices=["rag", "jobs"], default="rag",
+                        help="rag: relevance RAG chunks; jobs: job texts (the job-embedding store use case)")
+    parser.add_argument("--queries", type=int, default=200, help="number of historical jobs to replay")
+    parser.add_argument("--corpus-size", type=int, default=5000,
+                        help="jobs to index when --corpus jobs, the ones published before the query jobs")
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--dims", type=int, nargs="+", default=[1536, 1024, 512, 256])
+    args = parser.parse_args()
+
+    api_key = os.getenv("OPEN_AI_KEY")
+    if not api_key:
+        sys.exit("OPEN_AI_KEY is not set.")
+    import openai
+    service = EmbeddingService(openai.OpenAI(api_key=api_key), cache_size=0)
+
+    if args.corpus == "jobs":
+        # The newest jobs are the queries and the older ones the corpus, as when a new
+        # job is compared with the stored ones: no query can find itself.
+        job_texts = load_job_texts(args.queries + args.corpus_size)
+        query_texts, corpus_texts = job_texts[:args.queries], job_texts[args.queries:]
+    else:
+        corpus_texts = load_rag_chunk_texts()
+        query_texts = load_job_texts(args.queries)
+    if not corpus_texts or not query_texts:
+        sys.exit("Nothing to evaluate: corpus or query set is empty.")
+
+    print(f"Embedding {len(corpus_texts)} corpus texts and {len(query_texts)} queries at {NATIVE_EMBEDDING_DIM} dims...")
+    corpus_full = service.embed(corpus_texts)
+    queries_full = service.embed(query_texts)
+    k = min(args.k, len(corpus_texts))
+
+    baseline = build_faiss_index(corpus_full, NATIVE_EMBEDDING_DIM, "float32")
+    _, ground_truth = baseline.search(queries_full, k)
+
+    print(f"\nrecall@{k} vs exact float32/{NATIVE_EMBEDDING_DIM} search ({len(query_texts)} queries, {len(corpus_texts)} vectors)")
+    print(f"{'dims':>6} {'storage':>8} {'recall':>8} {'bytes/vec':>10} {'memory x':>9} {'us/query':>10}")
+    baseline_bytes = NATIVE_EMBEDDING_DIM * 4
+    for dim in args.dims:
+        corpus = truncate_embeddings(corpus_full, dim) if dim < NATIVE_EMBEDDING_DIM else corpus_full
+        queries = truncate_embeddings(queries_full, dim) if dim < NATIVE_EMBEDDING_DIM else queries_full
+        for storage in STORAGE_MODES:
+            index = build_faiss_index(corpus, dim, storage)
+            started = time.perf_counter()
+            _, results = index.search(queries, k)
+            elapsed_us = (time.perf_counter() - started) * 1e6 / len(queries)
+            code_size = bytes_per_vector(index)
+            print(f"{dim:>6} {storage:>8} {recall_at_k(results, ground_truth):>8.3f} {code_size:>10} "
+                  f"{baseline_bytes / code_size:>8.1f}x {elapsed_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
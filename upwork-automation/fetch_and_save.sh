@@ -1,7 +1,7 @@
 #!/bin/bash
 LOG_FILE="/var/log/fetch_and_save.log"
 TIMESTAMP=$(date "+%Y-%m-%d %H:%M:%S")
-RESPONSE=$(curl -s -X POST -d 'page=1&limit=50' http://44.196.92.103:8001/fetch-and-save/)
+RESPONSE=$(curl -s -X POST 'http://44.196.92.103:8001/fetch-and-save/?page=1&limit=50')
 if [ $? -eq 0 ]; then
   echo "$TIMESTAMP - Success: $RESPONSE" >> "$LOG_FILE"
 else
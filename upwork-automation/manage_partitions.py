@@ -0,0 +1,84 @@
+"""
+Manage the monthly partitions of jobs and job_relevance (Postgres).
+
+    python manage_partitions.py status
+    python manage_partitions.py convert               # one-time: partition existing tables
+    python manage_partitions.py ensure --months-ahead 3
+    python manage_partitions.py archive --older-than-months 12 [--dry-run]
+
+The API runs `ensure` on startup; schedule it monthly (cron) for long-running
+deployments. `archive` detaches old months into the archive schema, where they
+can be dumped (pg_dump -Fc -t 'archive.jobs_y2024m*') and dropped.
+
+`convert` changes the primary keys to (id, publishedDateTime) / (id, published_at),
+so jobs.id is no longer unique on its own, and drops the foreign keys from
+proposals and job_relevance to jobs. Columns the old tables lack start out
+empty; afterwards run upgrade_schema.py, backfill_skills.py,
+backfill_contractor_selection.py and POST /api/stats/relevance/rebuild (see
+"Upgrading an existing database" in documentation.md).
+"""
+import sys
+import argparse
+from pathlib import Path
+
+parent_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(parent_dir))
+
+from app.core.config import settings
+from app.db.database import engine
+from app.db.partitions import (
+    PARTITIONED_TABLES, archive_partitions, convert_to_partitioned, ensure_partitions, is_partitioned, list_partitions
+)
+
+
+def status(conn):
+    for table, key in PARTITIONED_TABLES:
+        if not is_partitioned(conn, table):
+            print(f"{table.name}: not partitioned (run `convert`)")
+            continue
+        print(f"{table.name}: partitioned by {key.name}")
+        for partition in list_partitions(conn, table):
+            rows = conn.exec_driver_sql(f'SELECT count(*) FROM "{partition.name}"').scalar()
+            bounds = "DEFAULT" if partition.is_default else f"{partition.lower:%Y-%m-%d} .. {partition.upper:%Y-%m-%d}"
+            print(f"  {partition.name:<32} {bounds:<26} {rows:>10} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="list partitions and their row counts")
+    convert = commands.add_parser("convert", help="partition existing unpartitioned tables")
+    convert.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    ensure = commands.add_parser("ensure", help="create upcoming monthly partitions")
+    ensure.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    archive = commands.add_parser("archive", help="detach old partitions into the archive schema")
+    archive.add_argument("--older-than-months", type=int, default=settings.PARTITION_ARCHIVE_AFTER_MONTHS)
+    archive.add_argument("--schema", default=settings.PARTITION_ARCHIVE_SCHEMA)
+    archive.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("Partitioning needs Postgres; DATABASE_URL points at " + engine.dialect.name)
+
+    with engine.begin() as conn:
+        if args.command == "status":
+            status(conn)
+        elif args.command == "convert":
+            renamed = convert_to_partitioned(conn, months_ahead=args.months_ahead)
+            if not renamed:
+                print("Nothing to convert: tables are already partitioned.")
+            else:
+                print(f"Partitioned. Old tables kept as {', '.join(renamed)}; compare row counts, then drop them. "
+                      "Then run upgrade_schema.py, backfill_skills.py, backfill_contractor_selection.py "
+                      "and POST /api/stats/relevance/rebuild.")
+        elif args.command == "ensure":
+            created = ensure_partitions(conn, months_ahead=args.months_ahead)
+            print(f"Created: {', '.join(created)}" if created else "All partitions exist.")
+        elif args.command == "archive":
+            archived = archive_partitions(conn, args.older_than_months, args.schema, dry_run=args.dry_run)
+            verb = "Would archive" if args.dry_run else f"Archived into schema {args.schema}"
+            print(f"{verb}: {', '.join(archived)}" if archived else "No partitions old enough to archive.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Add columns introduced after the tables were created (Postgres), with their indexes.
+
+Safe to re-run: columns are added with ADD COLUMN IF NOT EXISTS and indexes only
+when missing. See app/db/schema_upgrades.py for the list. Run it after
+`manage_partitions.py convert`; the full order is in documentation.md
+("Upgrading an existing database").
+
+Usage:
+    python upgrade_schema.py
+"""
+import sys
+from pathlib import Path
+
+parent_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(parent_dir))
+
+from app.db.database import engine
+from app.db.schema_upgrades import upgrade_schema
+
+
+def main():
+    if engine.dialect.name != "postgresql":
+        print("Nothing to do: create_all builds the full schema on this database.")
+        return
+    with engine.begin() as conn:
+        added = upgrade_schema(conn)
+    print(f"Added: {', '.join(added)}" if added else "Schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()